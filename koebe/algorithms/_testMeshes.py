@@ -0,0 +1,42 @@
+#
+# Meshes shared by the unit tests of the packing modules.
+#
+
+import math
+
+from ..geometries.euclidean3 import PointE3
+from .randomizedConvexHull import randomizedConvexHull
+from .tiling import TilingRules, starTriangulateAllFaces
+
+def sphere(n):
+    # A triangulated sphere: the convex hull of n golden spiral points on the unit sphere.
+    golden = math.pi * (3.0 - math.sqrt(5.0))
+    points = []
+    for i in range(n):
+        z = 1.0 - 2.0 * (i + 0.5) / n
+        r = math.sqrt(1.0 - z * z)
+        points.append(PointE3(r * math.cos(golden * i), r * math.sin(golden * i), z))
+    return randomizedConvexHull(points, seed = 0)
+
+def sphereDisk(n):
+    # A triangulated disk: sphere(n) with one vertex removed.
+    dcel = sphere(n)
+    dcel.outerFace = dcel.verts[-1].remove()
+    return dcel
+
+def pentagonTiling(depth):
+    # The pentagon subdivision tiling, each pentagon split into five pentagons per level.
+    rules = TilingRules()
+    pent = rules.createPrototile("pent", tuple("ABCDE"))
+    pent.addSplitEdgeRules(((("A","B"), ("a", "b")), (("B","C"), ("c", "d")), (("C","D"), ("e", "f")),
+                            (("D","E"), ("g", "h")), (("E","A"), ("i", "j"))))
+    pent.addNewVertexRules(("k"))
+    for subtile in ["Aabkj", "Bcdkb", "Cefkd", "Dghkf", "Eijkh"]:
+        pent.addSubtile("pent", tuple(subtile))
+    return rules.generateTiling("pent", depth = depth)
+
+def starTriangulated(tiling):
+    # A duplicate of tiling with every face star triangulated.
+    duplicate = tiling.duplicate()
+    starTriangulateAllFaces(duplicate)
+    return duplicate
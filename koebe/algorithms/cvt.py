@@ -8,7 +8,8 @@ bottom left hand corner of the grid. The grid size is fixed, and thus no extra s
 occurs if sites shrink to zero size, which is a possibility based on the input. Should
 this occur, you will get an error, most likely in the computation of dir_j in the
 voronoi_polygons funtion. Should this occur, your best bet is to increase the resolution
-of your grid. 
+of your grid, or to use method = PIXELS, which labels every pixel with its nearest site
+instead of computing polygons and simply keeps sites whose region is empty in place. 
 
 The main function for computing the CVT is weightedCVT, which takes three parameters, 
 the initial point sites, the density grid, and the number of iterations of Lloyd's 
@@ -75,11 +76,35 @@ References:
 """
 
 from collections import defaultdict
-from scipy.spatial import Voronoi
-from shapely.geometry import Polygon
+from itertools import chain
+from dataclasses import dataclass
+from scipy.spatial import Voronoi, cKDTree
 import numpy as np
+import time
 
-def weightedCVT(pts, rho, num_iterations = 50):
+# How weightedCVT computes the Voronoi regions clipped to the grid
+MIRROR = "mirror"   # One Voronoi diagram of the sites and their mirror images (see bounded_voronoi_polygons)
+SHAPELY = "shapely" # Unbounded regions clipped one at a time with shapely (requires shapely)
+PIXELS = "pixels"   # Every pixel labeled with its nearest site, no polygons (see pixel_centroids)
+
+@dataclass
+class CVTIterationStats:
+    """Timings and progress of one iteration of Lloyd's algorithm in weightedCVT. 
+    
+    Attributes:
+        iteration: The number of iterations performed so far, starting at 1. 
+        seconds: The wall time of the iteration. 
+        voronoiSeconds: The time spent computing the clipped Voronoi regions. 
+        centroidSeconds: The time spent integrating the centroids. 
+        maxMove: The largest distance a site moved in the iteration. 
+    """
+    iteration: int
+    seconds: float
+    voronoiSeconds: float
+    centroidSeconds: float
+    maxMove: float
+
+def weightedCVT(pts, rho, num_iterations = 50, method = MIRROR, callback = None):
     """Computes a weighted centroidal voronoi diagram of a set of points with a given 
     density function. 
     
@@ -90,35 +115,170 @@ def weightedCVT(pts, rho, num_iterations = 50):
             zero density it's centroid is calculated as the average of its neighbors.
         num_iterations: OPTIONAL Change the number of iterations of Lloyd's algorithm.
             Default is 50. 
+        method: OPTIONAL How the Voronoi regions are computed: MIRROR (the default) computes 
+            the regions clipped to the grid directly with one Voronoi diagram, SHAPELY clips 
+            each unbounded region with shapely, and PIXELS assigns every pixel to its nearest 
+            site instead. PIXELS does not fail on regions that shrink to zero size (their 
+            sites stay in place) and its cost is linear in the number of pixels. 
+        callback: OPTIONAL Called with a CVTIterationStats after every iteration. Returning 
+            True stops the iterations. 
+    Raises:
+        ValueError if method is unknown. 
     Returns:
         The final location of the sites as an N x 2 matrix where N is the number of input
         points. 
     """
+    if method not in (MIRROR, SHAPELY, PIXELS):
+        raise ValueError(f"Unknown Voronoi method {method}.")
     w, h = rho.shape
     
-    diameter = max(w, h) * 1.414214
-    
-    # Compute the helper matrices used for fast computation of the 
-    # CVT integrals (See [Secord 02])
-    P = np.cumsum(rho, axis = 0)
-    Q = np.cumsum(P, axis = 0)
+    if method == PIXELS:
+        # Only pixels of positive density contribute to the centroids
+        pixels = np.argwhere(rho > 0)
+        weights = rho[pixels[:, 0], pixels[:, 1]]
+        pixels = pixels.astype(float)
+    else:
+        # Compute the helper matrices used for fast computation of the 
+        # CVT integrals (See [Secord 02])
+        P = np.cumsum(rho, axis = 0)
+        Q = np.cumsum(P, axis = 0)
     
-    boundary_polygon = Polygon(np.array([[0,0],[w,0],[w,h],[0, h]]))
-
-    current_sites = pts
+    current_sites = np.asarray(pts, dtype = float)
     
     # Lloyd's algorithm 
-    for _ in range(num_iterations):
-        polys = list(voronoi_polygons(Voronoi(current_sites), diameter))
-        polygons = [Polygon(p).intersection(boundary_polygon) for p in polys]
-        centroids = []
-        for p in polygons:
-            c = wcvt_centroid(intCoords(list(p.exterior.coords)[:-1]), P, Q)
-            centroids.append(c)
-        current_sites = np.array(centroids)
+    for iteration in range(num_iterations):
+        start = time.perf_counter()
+        if method == PIXELS:
+            labels = nearest_site_labels(current_sites, pixels)
+        elif method == MIRROR:
+            polys = bounded_voronoi_polygons(current_sites, w, h)
+        else:
+            polys = clipped_voronoi_polygons(current_sites, w, h)
+        voronoiSeconds = time.perf_counter() - start
+        
+        if method == PIXELS:
+            new_sites = pixel_centroids(current_sites, pixels, weights, labels)
+        else:
+            corners = [np.rint(p).astype(int) for p in polys]
+            new_sites = wcvt_centroids(corners, P, Q)
+        end = time.perf_counter()
+        
+        stats = CVTIterationStats(iteration + 1, 
+                                  end - start, 
+                                  voronoiSeconds, 
+                                  end - start - voronoiSeconds, 
+                                  float(np.max(np.linalg.norm(new_sites - current_sites, axis = 1))))
+        current_sites = new_sites
+        if callback is not None and callback(stats):
+            break
     
     return current_sites
 
+def bounded_voronoi_polygons(sites, w, h):
+    """Computes the Voronoi regions of sites in the rectangle [0, w] x [0, h]. 
+    
+    Sites are mirrored across the sides of the rectangle. Inside the rectangle a mirror image 
+    is never closer than the site it mirrors, so in the Voronoi diagram of the sites and their 
+    images the region of each site is its region clipped to the rectangle, and no clipping is 
+    needed. Only the sites whose region crosses a side need their image across that side, so 
+    these are found first from the Voronoi diagram of the sites alone. 
+    
+    Args:
+        sites: An N x 2 array of sites in the rectangle. Sites on (or outside) the sides are 
+            moved slightly inside. 
+        w: The width of the rectangle. 
+        h: The height of the rectangle. 
+    
+    Returns:
+        A list with the corners of each site's region as a K x 2 array, in order around the 
+        region. 
+    """
+    sites = np.asarray(sites, dtype = float)
+    n = len(sites)
+    eps = 1e-6 * max(w, h)
+    inside = np.clip(sites, eps, [w - eps, h - eps])
+    
+    # Which regions reach past which side (unbounded regions reach past all of them)
+    voronoi = Voronoi(inside)
+    regions = [voronoi.regions[r] for r in voronoi.point_region]
+    lengths = np.array([len(r) for r in regions], dtype = np.int64)
+    corners = np.fromiter(chain.from_iterable(regions), dtype = np.int64, count = lengths.sum())
+    owner = np.repeat(np.arange(n), lengths)
+    unbounded = np.zeros(n, dtype = bool)
+    unbounded[owner[corners < 0]] = True
+    owner, corners = owner[corners >= 0], voronoi.vertices[corners[corners >= 0]]
+    
+    images = [inside]
+    x, y = inside[:, 0], inside[:, 1]
+    for outside, image in ((corners[:, 0] < 0, np.column_stack([-x, y])), 
+                           (corners[:, 0] > w, np.column_stack([2 * w - x, y])), 
+                           (corners[:, 1] < 0, np.column_stack([x, -y])), 
+                           (corners[:, 1] > h, np.column_stack([x, 2 * h - y]))):
+        crossing = unbounded.copy()
+        crossing[owner[outside]] = True
+        images.append(image[crossing])
+    
+    voronoi = Voronoi(np.concatenate(images))
+    return [voronoi.vertices[voronoi.regions[r]] for r in voronoi.point_region[:n]]
+
+def nearest_site_labels(sites, pixels):
+    """Labels every pixel with the index of its nearest site. 
+    
+    Args:
+        sites: An N x 2 array of sites. 
+        pixels: An M x 2 array of pixel coordinates. 
+    
+    Returns:
+        An array of M site indices. 
+    """
+    _, labels = cKDTree(sites).query(pixels, workers = -1)
+    return labels
+
+def pixel_centroids(sites, pixels, weights, labels = None):
+    """Computes the weighted centroids of the discrete Voronoi regions of sites. 
+    
+    The region of a site is the set of pixels nearest to it, and its centroid is the 
+    average of those pixels weighted by the density. This is a discrete version of the 
+    integrals of wcvt_centroid(). 
+    
+    Args:
+        sites: An N x 2 array of sites. 
+        pixels: An M x 2 array of pixel coordinates. 
+        weights: The density at each pixel. 
+        labels: OPTIONAL The nearest site of each pixel, if already computed (see 
+            nearest_site_labels()). 
+    
+    Returns:
+        An N x 2 array with the centroid of each region. Sites whose region has no mass stay 
+        where they are. 
+    """
+    sites = np.asarray(sites, dtype = float)
+    if labels is None:
+        labels = nearest_site_labels(sites, pixels)
+    n = len(sites)
+    mass = np.bincount(labels, weights, minlength = n)
+    centroids = sites.copy()
+    massive = mass > 0
+    for axis in range(2):
+        moment = np.bincount(labels, weights * pixels[:, axis], minlength = n)
+        centroids[massive, axis] = moment[massive] / mass[massive]
+    return centroids
+
+def clipped_voronoi_polygons(sites, w, h):
+    """Computes the Voronoi regions of sites in the rectangle [0, w] x [0, h] by clipping the 
+    regions of voronoi_polygons() one at a time with shapely. 
+    
+    Returns:
+        A list with the corners of each site's region as a K x 2 array. 
+    """
+    from shapely.geometry import Polygon
+    
+    diameter = max(w, h) * 1.414214
+    boundary_polygon = Polygon(np.array([[0,0],[w,0],[w,h],[0, h]]))
+    polygons = [Polygon(p).intersection(boundary_polygon) 
+                for p in voronoi_polygons(Voronoi(sites), diameter)]
+    return [np.asarray(p.exterior.coords)[:-1] for p in polygons]
+
 def worldToImgPixelCoords(world_x, 
                           world_y, 
                           img_x, 
@@ -367,6 +527,112 @@ def wcvt_centroid(pts, P, Q):
         return (wcvt_xnumerator(spts, P, Q) * inv_denom, 
                 wcvt_ynumerator(spts, P) * inv_denom)
 
+def scanSpans(polygons, w, h):
+    """Computes the scanline spans of many convex polygons at once. 
+    
+    The vectorized counterpart of scanPoints: instead of rasterizing the boundary pixel by 
+    pixel, the pixels that rasterizeSegment() draws in each row are found in closed form 
+    for all edges at once, and the extremes over the edges of a polygon give its span in 
+    the row. 
+    
+    Args:
+        polygons: List[List[(int, int)]]. The integer vertices of each convex polygon, 
+            without repeating the first vertex. 
+        w: The width of the grid. 
+        h: The height of the grid. 
+    
+    Returns:
+        Arrays (cells, ys, x1s, x2s) with one entry per span: the span of polygon cells[i] 
+        in row ys[i] goes from x1s[i] to x2s[i]. Coordinates are truncated to the grid (see 
+        trunc()). 
+    """
+    counts = np.array([len(p) for p in polygons], dtype = np.int64)
+    if counts.sum() == 0:
+        empty = np.zeros(0, dtype = np.int64)
+        return empty, empty, empty, empty
+    a = np.concatenate([np.asarray(p, dtype = np.int64).reshape(-1, 2) for p in polygons])
+    starts = np.cumsum(counts) - counts
+    cellOfVertex = np.repeat(np.arange(len(polygons)), counts)
+    nextVertex = np.arange(len(a)) + 1
+    nonempty = counts > 0
+    nextVertex[starts[nonempty] + counts[nonempty] - 1] = starts[nonempty]
+    b = a[nextVertex]
+    
+    # One entry per edge and row k = 0, ..., dy of the edge, counted from its start
+    dx = np.abs(b[:, 0] - a[:, 0])
+    dy = np.abs(b[:, 1] - a[:, 1])
+    sx = np.where(b[:, 0] < a[:, 0], -1, 1)
+    sy = np.where(b[:, 1] < a[:, 1], -1, 1)
+    edge = np.repeat(np.arange(len(a)), dy + 1)
+    k = np.arange(len(edge)) - np.repeat(np.cumsum(dy + 1) - (dy + 1), dy + 1)
+    dx, dy, sx = dx[edge], dy[edge], sx[edge]
+    
+    # rasterizeSegment moves k steps along a steep edge (dx <= dy) to x offset 
+    # ceil(k dx / dy - 1/2). Along a shallow edge, the x offsets j in row k are those with 
+    # ceil(j dy / dx - 1/2) = k, so (k - 1/2) dx / dy < j <= (k + 1/2) dx / dy. 
+    steep = dx <= dy
+    safeDy = np.maximum(dy, 1)
+    steepOffset = -((dy - 2 * k * dx) // (2 * safeDy))
+    jmin = np.where(dy == 0, 0, np.clip(((2 * k - 1) * dx) // (2 * safeDy) + 1, 0, dx))
+    jmax = np.where(dy == 0, dx, np.clip(((2 * k + 1) * dx) // (2 * safeDy), 0, dx))
+    jmin = np.where(steep, steepOffset, jmin)
+    jmax = np.where(steep, steepOffset, jmax)
+    x0 = a[edge, 0]
+    xmin = np.where(sx > 0, x0 + jmin, x0 - jmax)
+    xmax = np.where(sx > 0, x0 + jmax, x0 - jmin)
+    y = a[edge, 1] + sy[edge] * k
+    
+    # Reduce to the extremes over all edges of a polygon in each of its rows
+    cells = cellOfVertex[edge]
+    ymin = y.min()
+    key = cells * (y.max() - ymin + 1) + (y - ymin)
+    order = np.argsort(key, kind = "stable")
+    key = key[order]
+    groups = np.flatnonzero(np.concatenate([[True], key[1:] != key[:-1]]))
+    x1s = np.minimum.reduceat(xmin[order], groups)
+    x2s = np.maximum.reduceat(xmax[order], groups)
+    cells = cells[order][groups]
+    ys = y[order][groups]
+    return (cells, 
+            np.clip(ys, 0, h - 1), 
+            np.clip(x1s, 0, w - 1), 
+            np.clip(x2s, 0, w - 1))
+
+def wcvt_centroids(polygons, P, Q):
+    """Computes the weighted centroids of many Voronoi regions at once. 
+    
+    Evaluates the same integrals as wcvt_centroid for all regions with NumPy, using the 
+    spans of scanSpans(). 
+    
+    Args:
+        polygons: List[List[(int, int)]] The integer corners of each region with no repeated 
+            end vertex. 
+        P: The pre-computed partial integral from [Secord 02] (Note it is simply the 
+            cumulative sum of rho across the x axis.)
+        Q: The second pre-computed partial integral from [Secord 02] (Note it is simply the 
+            cumulative sum of P across the x axis.)
+    
+    Returns: 
+        An N x 2 array with the weighted centroid of each region. Regions of zero mass get 
+        the average of their corners. 
+    """
+    n = len(polygons)
+    w, h = P.shape
+    cells, ys, x1s, x2s = scanSpans(polygons, w, h)
+    P1, P2 = P[x1s, ys], P[x2s, ys]
+    mass = P2 - P1
+    denom = np.bincount(cells, mass, minlength = n)
+    xnum = np.bincount(cells, (x2s * P2 - Q[x2s, ys]) - (x1s * P1 - Q[x1s, ys]), minlength = n)
+    ynum = np.bincount(cells, ys * mass, minlength = n)
+    
+    centroids = np.empty((n, 2))
+    massive = denom != 0
+    centroids[massive, 0] = xnum[massive] / denom[massive]
+    centroids[massive, 1] = ynum[massive] / denom[massive]
+    for i in np.flatnonzero(~massive):
+        centroids[i] = avg_point([tuple(pt) for pt in polygons[i]])
+    return centroids
+
 def voronoi_polygons(voronoi, diameter):
     """Generate shapely.geometry.Polygon objects corresponding to the
     regions of a scipy.spatial.Voronoi object, in the order of the
@@ -0,0 +1,117 @@
+import unittest
+
+import numpy as np
+from scipy.spatial import ConvexHull
+
+from .cvt import (scanPoints, scanSpans, trunc, wcvt_centroid, wcvt_centroids, weightedCVT,
+                  bounded_voronoi_polygons, clipped_voronoi_polygons, pixel_centroids,
+                  CVTIterationStats, SHAPELY, PIXELS)
+
+def _convexPolygons(count, w, h, seed = 0):
+    rng = np.random.default_rng(seed)
+    polygons = []
+    for _ in range(count):
+        center = rng.uniform(0, [w, h])
+        pts = np.rint(center + rng.normal(scale = rng.uniform(1, 30), size = (8, 2))).astype(int)
+        hull = ConvexHull(pts)
+        polygons.append([tuple(pt) for pt in pts[hull.vertices]])
+    return polygons
+
+class TestCVT(unittest.TestCase):
+
+    def test_scanSpans(self):
+        w, h = 120, 90
+        polygons = _convexPolygons(60, w, h)
+        cells, ys, x1s, x2s = scanSpans(polygons, w, h)
+        for i, p in enumerate(polygons):
+            spts = scanPoints(p)
+            expected = sorted((trunc(*spts[j], w, h)[1], trunc(*spts[j], w, h)[0], trunc(*spts[j + 1], w, h)[0])
+                              for j in range(0, len(spts), 2))
+            found = sorted((y, x1, x2) for y, x1, x2 in zip(ys[cells == i], x1s[cells == i], x2s[cells == i])
+                           if x1 != x2)
+            self.assertEqual([s for s in expected if s[1] != s[2]], found)
+
+    def test_centroids(self):
+        w, h = 120, 90
+        rng = np.random.default_rng(1)
+        rho = rng.uniform(0.0, 1.0, (w, h))
+        rho[:20, :20] = 0.0
+        P = np.cumsum(rho, axis = 0)
+        Q = np.cumsum(P, axis = 0)
+        polygons = _convexPolygons(80, w, h, seed = 2) + [[(2, 2), (10, 2), (10, 10), (2, 10)]]
+        expected = [wcvt_centroid(p, P, Q) for p in polygons]
+        np.testing.assert_allclose(wcvt_centroids(polygons, P, Q), expected, rtol = 1e-12)
+        np.testing.assert_allclose(wcvt_centroids(polygons, P, Q)[-1], (6.0, 6.0))
+
+    def test_weightedCVT(self):
+        w, h = 200, 100
+        rng = np.random.default_rng(3)
+        sites = rng.uniform(0, [w, h], (50, 2))
+        result = weightedCVT(sites, np.ones((w, h)), num_iterations = 20)
+        self.assertEqual(result.shape, (50, 2))
+        self.assertTrue(np.all((result >= 0) & (result <= [w, h])))
+        # Lloyd's algorithm spreads the sites out
+        def closest(pts):
+            d = np.linalg.norm(pts[:, None] - pts[None], axis = 2)
+            return d[~np.eye(len(pts), dtype = bool)].min()
+        self.assertGreater(closest(result), closest(sites))
+
+    def test_boundedVoronoi(self):
+        w, h = 300, 200
+        rng = np.random.default_rng(4)
+        sites = np.concatenate([rng.uniform(0, [w, h], (500, 2)), [[0.0, 0.0], [w, 50.0]]])
+        regions = bounded_voronoi_polygons(sites, w, h)
+        self.assertEqual(len(regions), len(sites))
+        areas = [ConvexHull(r).volume for r in regions]
+        self.assertAlmostEqual(sum(areas), w * h, places = 6)
+        for region in regions:
+            self.assertTrue(np.all((region > -1e-9) & (region < np.array([w, h]) + 1e-9)))
+        # The same regions as clipping with shapely (up to moving the sites on the sides inside)
+        for region, clipped in zip(regions, clipped_voronoi_polygons(sites, w, h)):
+            self.assertAlmostEqual(ConvexHull(region).volume, ConvexHull(clipped).volume, delta = 1e-2)
+
+    def test_callback(self):
+        w, h = 100, 100
+        sites = np.random.default_rng(5).uniform(0, [w, h], (30, 2))
+        stats = []
+        weightedCVT(sites, np.ones((w, h)), num_iterations = 50, callback = lambda s : stats.append(s) or len(stats) == 4)
+        self.assertEqual([s.iteration for s in stats], [1, 2, 3, 4])
+        for s in stats:
+            self.assertIsInstance(s, CVTIterationStats)
+            self.assertAlmostEqual(s.seconds, s.voronoiSeconds + s.centroidSeconds)
+        self.assertLess(stats[-1].maxMove, stats[0].maxMove)
+        mirrored = weightedCVT(sites, np.ones((w, h)), num_iterations = 3)
+        clipped = weightedCVT(sites, np.ones((w, h)), num_iterations = 3, method = SHAPELY)
+        np.testing.assert_allclose(mirrored, clipped, atol = 1.0)
+        with self.assertRaises(ValueError):
+            weightedCVT(sites, np.ones((w, h)), method = "qhull")
+
+    def test_pixelCentroids(self):
+        w, h = 40, 30
+        pixels = np.argwhere(np.ones((w, h))).astype(float)
+        weights = np.ones(len(pixels))
+        np.testing.assert_allclose(pixel_centroids([[5.0, 5.0]], pixels, weights), [[19.5, 14.5]])
+        # Two sites split the grid at x = 20
+        centroids = pixel_centroids([[9.9, 15.0], [29.9, 15.0]], pixels, weights)
+        np.testing.assert_allclose(centroids, [[9.5, 14.5], [29.5, 14.5]])
+        # A site without pixels (here a duplicate) stays in place
+        centroids = pixel_centroids([[10.0, 15.0], [10.0, 15.0], [500.0, 500.0]], pixels, weights)
+        np.testing.assert_allclose(centroids[1:], [[10.0, 15.0], [500.0, 500.0]])
+
+    def test_pixelCVT(self):
+        w, h = 120, 80
+        rng = np.random.default_rng(6)
+        sites = rng.uniform(0, [w, h], (40, 2))
+        rho = np.ones((w, h))
+        rho[:, :10] = 0.0
+        pixelSites = weightedCVT(sites, rho, num_iterations = 30, method = PIXELS)
+        self.assertTrue(np.all(pixelSites[:, 1] >= 10))
+        polygonSites = weightedCVT(sites, rho, num_iterations = 30)
+        # Both converge to a centroidal diagram of the same density: compare the mean spacing
+        def spacing(pts):
+            d = np.linalg.norm(pts[:, None] - pts[None], axis = 2) + np.eye(len(pts)) * 1e9
+            return d.min(axis = 1).mean()
+        self.assertAlmostEqual(spacing(pixelSites), spacing(polygonSites), delta = 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,316 @@
+#
+# Euclidean circle packings computed over flat NumPy arrays.
+#
+# The euclidean counterpart of hypPackerNumpy. Radii are plain euclidean radii,
+# and the face angle at a circle of radius r1 tangent to circles of radii r2 and
+# r3 follows from the law of cosines in the triangle of centers:
+#
+#     sin^2(angle / 2) = g = r2 r3 / ((r1 + r2) (r1 + r3)).
+#
+# The boundary is given either by its radii (the boundary vertices are not
+# packed, like the horocycles of a hyperbolic maximal packing) or by target
+# angle sums at the boundary vertices. In the second case every vertex is
+# packed and the packing is only determined up to scale, so one vertex keeps
+# its radius. The iterations, the Newton solver and the independent set
+# schedule are those of hypPackerNumpy.ArrayPacker.
+#
+# References:
+#     Collins, C. R. and Stephenson, K. "A circle packing algorithm."
+#         Computational Geometry 25, pp. 233-256, 2003.
+#
+
+import math
+
+from typing import Callable, Optional
+
+import numpy as np
+
+from ..datastructures.dcel import DCEL
+from ..datastructures.arrayDCEL import ArrayDCEL
+from ..geometries.euclidean2 import PointE2, CircleE2
+from .packingArrays import PackingCorners
+from .packingLayout import PackingLayout
+from .hypPacker import PackingError
+from .packingMonitor import PassStats
+from .hypPackerNumpy import ArrayPacker, GAUSS_SEIDEL, ITERATIVE, NEWTON, METHODS
+
+def cosFaceAngles(r1: np.ndarray, r2: np.ndarray, r3: np.ndarray) -> np.ndarray:
+    """Computes the cosines of the face angles at the r1 circles of triples of tangent circles.
+
+    Args:
+        r1: The radii of the circles at which to compute the cosine face angles.
+        r2: The radii of the second circles.
+        r3: The radii of the third circles.
+
+    Returns:
+        The cosines of the face angles at the r1 circles.
+    """
+    g = r2 * r3 / ((r1 + r2) * (r1 + r3))
+    return np.clip(1.0 - 2.0 * g, -1.0, 1.0)
+
+def angleSums(corners: PackingCorners, r: np.ndarray) -> np.ndarray:
+    """Computes the angle sum at every vertex.
+
+    Args:
+        corners: The corners of the triangulation.
+        r: The radius of every vertex.
+
+    Returns:
+        The angle sums, 0 for vertices without corners.
+    """
+    angles = np.arccos(cosFaceAngles(r[corners.origin], r[corners.dest], r[corners.third]))
+    return corners.cornerSums(angles)
+
+def cornerAngleDerivatives(r1: np.ndarray,
+                           r2: np.ndarray,
+                           r3: np.ndarray) -> (np.ndarray, np.ndarray, np.ndarray):
+    """Computes the derivatives of the face angles at r1 with respect to the log-radii.
+
+    Returns:
+        (d1, d2, d3), the derivatives of the angles at the r1 circles with respect to
+        log r1, log r2 and log r3.
+    """
+    # angle = 2 asin(sqrt(g)) so d angle = tan(angle / 2) d log g, and
+    #     d log g = d log r2 + d log r3 - d log(r1 + r2) - d log(r1 + r3).
+    g = np.clip(r2 * r3 / ((r1 + r2) * (r1 + r3)), 0.0, 1.0)
+    tanHalf = np.sqrt(g / np.maximum(1.0 - g, 1e-24))
+    t2 = r1 / (r1 + r2)
+    t3 = r1 / (r1 + r3)
+    return -tanHalf * (t2 + t3), tanHalf * t2, tanHalf * t3
+
+def uniformNeighborRadii(r: np.ndarray,
+                         angleSum: np.ndarray,
+                         aim: np.ndarray,
+                         degree: np.ndarray) -> np.ndarray:
+    """Computes new radii with the euclidean uniform neighbor model.
+
+    Args:
+        r: The current radii.
+        angleSum: The current angle sums.
+        aim: The target angle sums.
+        degree: The number of corners at each vertex.
+
+    Returns:
+        The new radii.
+    """
+    # k neighbors of radius p give the angle sum 2k asin(p / (r + p)), so the current angle
+    # sum fixes p = r β / (1 - β) with β = sin(θ / 2k), and the aim is met by the radius
+    # p (1 - δ) / δ with δ = sin(aim / 2k).
+    beta = np.sin(angleSum / (2.0 * degree))
+    delta = np.sin(aim / (2.0 * degree))
+    return r * beta / (1.0 - beta) * (1.0 - delta) / delta
+
+class EuclideanArrayPacker(ArrayPacker):
+    """A euclidean packing problem in array form.
+
+    Like hypPackerNumpy.ArrayPacker, with euclidean radii. Vertices with aim <= 0 keep their
+    radii. If every vertex has an aim the packing is only determined up to scale: the
+    first vertex (pinned) then keeps its radius and is not packed.
+
+    Attributes:
+        pinned: The vertex keeping its radius when all vertices have aims, else None.
+
+    Raises:
+        PackingError if every vertex has an aim but the aims do not add up to pi times the
+        number of triangles, which every euclidean packing of the triangulation does.
+    """
+
+    def __init__(self, corners: PackingCorners, aim: np.ndarray, schedule: str = GAUSS_SEIDEL):
+        super().__init__(corners, aim, schedule)
+        self.pinned = None
+        if len(self.packed) == corners.numVerts:
+            total = math.pi * corners.numCorners / 3
+            if abs(np.sum(self.aim) - total) > 1e-9 * corners.numVerts:
+                raise PackingError(f"The aims add up to {np.sum(self.aim)} instead of {total}.")
+            self.pinned = int(self.packed[0])
+            self.packed = self.packed[1:]
+
+    def _angleSums(self, corners: PackingCorners, r: np.ndarray) -> np.ndarray:
+        return angleSums(corners, r)
+
+    def _newRadii(self, r, angleSum, aim, degree) -> np.ndarray:
+        return uniformNeighborRadii(r, angleSum, aim, degree)
+
+    def _angleDerivatives(self, r1, r2, r3):
+        return cornerAngleDerivatives(r1, r2, r3)
+
+    def _logRadii(self, r: np.ndarray) -> np.ndarray:
+        return np.log(r)
+
+    def _radiiFromLog(self, u: np.ndarray) -> np.ndarray:
+        return np.exp(u)
+# END EuclideanArrayPacker
+
+def thirdCenters(za: np.ndarray,
+                 zb: np.ndarray,
+                 ra: np.ndarray,
+                 rb: np.ndarray,
+                 rc: np.ndarray) -> (np.ndarray, np.ndarray):
+    """Places the third circles of counterclockwise triangles of tangent circles (a, b, c).
+
+    Returns:
+        (zc, rc) the centers and radii of the c circles.
+    """
+    alpha = np.arccos(cosFaceAngles(ra, rb, rc))
+    direction = np.exp(1j * (np.angle(zb - za) + alpha))
+    return za + (ra + rc) * direction, rc
+
+class EuclideanPackingLayout(PackingLayout):
+    """The placed circles of a euclidean packing (see packingLayout.PackingLayout)."""
+
+    def _thirdCenters(self, za, zb, ra, rb, rc):
+        return thirdCenters(za, zb, ra, rb, rc)
+# END EuclideanPackingLayout
+
+def layoutCircles(corners: PackingCorners,
+                  r: np.ndarray,
+                  centerOrigin: int,
+                  centerDest: int,
+                  average: bool = False) -> EuclideanPackingLayout:
+    """Places the circles of a euclidean packing, a breadth first generation at a time.
+
+    Args:
+        corners: The corners of the triangulation.
+        r: The radius of each vertex.
+        centerOrigin: The vertex placed at the origin.
+        centerDest: A neighbor of centerOrigin, placed on the positive x-axis.
+        average: If True a vertex placed by several triangles in the same generation is put
+            at the average of those placements, else at the first.
+
+    Returns:
+        The EuclideanPackingLayout.
+    """
+    r = np.asarray(r, dtype = float)
+    centers = np.zeros(corners.numVerts, dtype = np.complex128)
+    placed = np.zeros(corners.numVerts, dtype = bool)
+    centers[centerDest] = r[centerOrigin] + r[centerDest]
+    placed[centerOrigin] = placed[centerDest] = True
+
+    o, d, t = corners.origin, corners.dest, corners.third
+    generations = 0
+    while True:
+        ready = np.flatnonzero(placed[o] & placed[d] & ~placed[t])
+        if len(ready) == 0:
+            break
+        generations += 1
+        targets = t[ready]
+        zc, _ = thirdCenters(centers[o[ready]], centers[d[ready]], r[o[ready]], r[d[ready]], r[targets])
+        if average:
+            count = np.bincount(targets, minlength = corners.numVerts)
+            total = np.zeros(corners.numVerts, dtype = np.complex128)
+            np.add.at(total, targets, zc)
+            verts = np.flatnonzero(count)
+            centers[verts] = total[verts] / count[verts]
+        else:
+            verts, first = np.unique(targets, return_index = True)
+            centers[verts] = zc[first]
+        placed[verts] = True
+    return EuclideanPackingLayout(centers, r.copy(), placed, generations)
+
+def _vertexValues(values, verts: np.ndarray, numVerts: int) -> np.ndarray:
+    # The entries of values (a number, a sequence indexed by vertex or a dict from vertex
+    # index to value) for the given vertices.
+    if isinstance(values, dict):
+        return np.array([values[i] for i in verts], dtype = float)
+    elif np.ndim(values) == 0:
+        return np.full(len(verts), float(values))
+    values = np.asarray(values, dtype = float)
+    if len(values) != numVerts:
+        raise ValueError(f"Expected {numVerts} values, one per vertex, got {len(values)}.")
+    return values[verts]
+
+def euclideanPacking(diskDcel: DCEL,
+                     boundaryRadii = None,
+                     boundaryAngles = None,
+                     num_passes: int = 1000,
+                     tolerance: float = 3e-10,
+                     centerDartIdx: int = -1,
+                     placeCircles: bool = True,
+                     schedule: str = GAUSS_SEIDEL,
+                     method: str = ITERATIVE,
+                     averagePlacements: bool = False,
+                     callback: Optional[Callable[[PassStats], bool]] = None) -> (DCEL, int):
+    """Computes a euclidean circle packing of a triangulated disk.
+
+    The interior vertices get angle sum 2 pi. The boundary is given either by boundaryRadii
+    or by boundaryAngles; if neither is given all boundary radii are 1.
+
+    Args:
+        diskDcel: The input DCEL. Should be a triangulated disk with all boundary vertices
+            incident to the outerFace.
+        boundaryRadii: The radii of the boundary circles: a number, a sequence indexed like
+            diskDcel.verts (interior entries are ignored) or a dict from vertex index to radius.
+        boundaryAngles: The angle sums of the boundary vertices, given like boundaryRadii. For
+            a packing to exist the sum of pi - angle over the boundary must be 2 pi (pi for a
+            straight side, pi / 2 for a right angled corner). The packing is scaled so that the
+            first vertex has radius 1.
+        num_passes: maximum number of sweeps (or Newton steps) to perform. Default is 1000.
+        tolerance: the tolerance for which the average angle sum error must fall below.
+        centerDartIdx: The index of the dart to lay out from the origin, -1 to pick one.
+        placeCircles: If False only the radii are computed.
+        schedule: JACOBI or GAUSS_SEIDEL (the default).
+        method: ITERATIVE (the default) or NEWTON.
+        averagePlacements: Whether to average multiple placements (see layoutCircles).
+        callback: Called with a packingMonitor.PassStats after every sweep (or Newton step).
+            Returning True stops the packing.
+
+    Raises:
+        ValueError if both boundaryRadii and boundaryAngles are given, or method is unknown.
+        PackingError if the boundary angles can not be met (see EuclideanArrayPacker) or
+        there is nothing to pack.
+
+    Returns:
+        A tuple (dcel, loopCount) where dcel is a new DCEL structure where each vertex
+        stores a CircleE2 as its .data object (or [z, r] if placeCircles is False) and
+        loopCount is the number of sweeps (or Newton steps) performed. The largest placement
+        error is recorded as dcel.maxPlacementError.
+    """
+    if boundaryRadii is not None and boundaryAngles is not None:
+        raise ValueError("Give either boundaryRadii or boundaryAngles, not both.")
+    if method not in METHODS:
+        raise ValueError(f"Unknown packing method {method}.")
+    dcel = diskDcel.duplicate(
+               vdata_transform = (lambda v : None),
+               edata_transform = (lambda e : None),
+               fdata_transform = (lambda f : None)
+           )
+    adcel = ArrayDCEL.fromDCEL(dcel)
+    corners = PackingCorners.fromArrayDCEL(adcel)
+    n = len(dcel.verts)
+    boundary = np.unique(adcel.dart_origin[adcel.dart_face == adcel.outer_face])
+
+    aim = np.full(n, 2.0 * math.pi)
+    r = np.ones(n)
+    if boundaryAngles is None:
+        aim[boundary] = -1.0
+        r[boundary] = _vertexValues(1.0 if boundaryRadii is None else boundaryRadii, boundary, n)
+    else:
+        aim[boundary] = _vertexValues(boundaryAngles, boundary, n)
+
+    packer = EuclideanArrayPacker(corners, aim, schedule)
+    if method == NEWTON:
+        loopIdx = packer.newton(r, num_passes, tolerance, callback)
+    else:
+        loopIdx = packer.repack(r, num_passes, tolerance, callback)
+
+    sums = angleSums(corners, r)
+    for i, v in enumerate(dcel.verts):
+        v.aim = float(aim[i])
+        v.data = [0j, float(r[i])]
+        if v.aim > 0:
+            v.angleSum = float(sums[i])
+            v.angleSumError = v.angleSum - v.aim
+
+    if placeCircles:
+        if centerDartIdx < 0:
+            start = packer.packed[0] if len(packer.packed) > 0 else 0
+            centerDartIdx = adcel.vert_adart[start]
+        centerOrigin = adcel.dart_origin[centerDartIdx]
+        centerDest = adcel.dart_origin[adcel.dart_next[centerDartIdx]]
+        layout = layoutCircles(corners, r, centerOrigin, centerDest, averagePlacements)
+        for i, v in enumerate(dcel.verts):
+            z = layout.centers[i]
+            v.data = CircleE2(PointE2(z.real, z.imag), float(r[i]))
+        dcel.maxPlacementError = layout.maxPlacementError(corners)
+
+    return dcel, loopIdx
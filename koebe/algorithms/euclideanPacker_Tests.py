@@ -0,0 +1,75 @@
+import unittest
+import math
+
+import numpy as np
+
+from ..geometries.euclidean2 import CircleE2
+from .hypPacker import PackingError
+from .hypPackerNumpy import NEWTON, JACOBI
+from ._testMeshes import sphereDisk
+from .euclideanPacker import cornerAngleDerivatives, cosFaceAngles, euclideanPacking
+
+def _maxTangencyError(packing):
+    errors = []
+    for e in packing.edges:
+        u, w = e.aDart.origin.data, e.aDart.dest.data
+        distance = math.hypot(u.center.x - w.center.x, u.center.y - w.center.y)
+        errors.append(abs(distance - u.radius - w.radius))
+    return max(errors)
+
+class TestEuclideanPacker(unittest.TestCase):
+
+    def test_cornerAngleDerivatives(self):
+        rng = np.random.default_rng(0)
+        r1, r2, r3 = rng.uniform(0.1, 3.0, (3, 50))
+        derivatives = cornerAngleDerivatives(r1, r2, r3)
+        h = 1e-6
+        for i, d in enumerate(derivatives):
+            up, down = [r1, r2, r3], [r1, r2, r3]
+            up[i], down[i] = up[i] * math.exp(h), down[i] * math.exp(-h)
+            numeric = (np.arccos(cosFaceAngles(*up)) - np.arccos(cosFaceAngles(*down))) / (2 * h)
+            np.testing.assert_allclose(d, numeric, rtol = 1e-5, atol = 1e-8)
+
+    def test_boundaryRadii(self):
+        disk = sphereDisk(80)
+        boundary = {disk.verts.index(v) for v in disk.outerFace.vertices()}
+        radii = {i: 1.0 + 0.01 * i for i in boundary}
+        for method in ("iterative", NEWTON):
+            packing, _ = euclideanPacking(disk, boundaryRadii = radii, tolerance = 1e-12,
+                                          num_passes = 5000, method = method)
+            self.assertTrue(all(isinstance(v.data, CircleE2) for v in packing.verts))
+            for i in boundary:
+                self.assertEqual(packing.verts[i].data.radius, radii[i])
+            self.assertLess(max(abs(v.angleSumError) for v in packing.verts if v.aim > 0), 1e-10)
+            self.assertLess(packing.maxPlacementError, 1e-8)
+            self.assertLess(_maxTangencyError(packing), 1e-8)
+
+    def test_boundaryAngles(self):
+        disk = sphereDisk(60)
+        boundary = list(disk.outerFace.vertices())
+        angle = math.pi - 2 * math.pi / len(boundary)
+        packing, _ = euclideanPacking(disk, boundaryAngles = angle, tolerance = 1e-12,
+                                      method = NEWTON)
+        self.assertEqual(packing.verts[0].data.radius, 1.0)
+        self.assertLess(max(abs(v.angleSumError) for v in packing.verts if v.aim > 0), 1e-10)
+        self.assertLess(_maxTangencyError(packing), 1e-8)
+        with self.assertRaises(PackingError):
+            euclideanPacking(disk, boundaryAngles = angle + 0.1)
+
+    def test_schedulesAgree(self):
+        disk = sphereDisk(40)
+        labels, _ = euclideanPacking(disk, tolerance = 1e-12, placeCircles = False, method = NEWTON)
+        jacobi, _ = euclideanPacking(disk, tolerance = 1e-12, placeCircles = False,
+                                     schedule = JACOBI, num_passes = 20000)
+        np.testing.assert_allclose([v.data[1] for v in jacobi.verts],
+                                   [v.data[1] for v in labels.verts], rtol = 1e-8)
+
+    def test_arguments(self):
+        disk = sphereDisk(20)
+        with self.assertRaises(ValueError):
+            euclideanPacking(disk, boundaryRadii = 1.0, boundaryAngles = 1.0)
+        with self.assertRaises(ValueError):
+            euclideanPacking(disk, boundaryRadii = [1.0, 2.0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,19 +1,29 @@
 # Thurston style hyperbolic circle packings. 
 # Adapted from Ken Stephenson's CirclePack program. 
+#
+# The arithmetic is done by a numeric backend (see packingBackends): the
+# functions below take a backend argument, which defaults to ExtendedComplex
+# points and floats. hypPackerComplex is this code with builtin complex numbers.
 
 import math
+import time
+import warnings
 
 from ..datastructures.dcel import Vertex, Dart, DCEL
 from ..geometries.extendedComplex import ExtendedComplex, Mobius
 from ..geometries.hyperbolic2 import PointH2, CircleH2
+from .packingBackends import EXTENDED, ExtendedComplexBackend, getBackend
+from .packingMonitor import PassStats, runPasses
 
 from collections import deque
 
-from typing import Optional
+from typing import Callable, Iterator, Optional
 
 OKERR = 1e-9 # Some other tolerance from CirclePack
 MOB_TOLER = 1e-12 # Tolerance for Mobius transformations to consider points too close
 
+_EXTENDED = ExtendedComplexBackend()
+
     
 
 # Computes the cosine of the face angle at x1 given a triangle
@@ -52,7 +62,7 @@ def _cosFaceAngle(x1: float, x2: float, x3: float) -> float:
             return ans
 
 # Computes the hyperbolic face angle at the origin of outDart
-def _faceAngleForOriginOf(outDart: Dart, withRadius: Optional[float] = None) -> float:
+def _faceAngleForOriginOf(outDart: Dart, withRadius: Optional[float] = None, backend = _EXTENDED) -> float:
     """Computes the face angle at the origin of a given dart.
     
     This function computes the face angle at the origin of parameter outDart
@@ -65,11 +75,12 @@ def _faceAngleForOriginOf(outDart: Dart, withRadius: Optional[float] = None) ->
         outDart: The outgoing dart from the face angle. 
         withRadius: If not None (which is the default), the radius to use for 
             the origin of outDart. 
+        backend: The numeric backend. 
     
     Returns:
         The face angle at the origin of outDart. 
     """
-    return math.acos(
+    return backend.acos(
                _cosFaceAngle(
                     outDart.origin.data[1] if withRadius == None else withRadius, 
                     outDart.dest.data[1], 
@@ -80,7 +91,7 @@ def _faceAngleForOriginOf(outDart: Dart, withRadius: Optional[float] = None) ->
 # if vRad is None, uses the stored label radius for vert. 
 # otherwise uses vRad as vert's radius. 
 # PackData.h_anglesum_overlap in CirclePack
-def _angleSumFor(vertex: Vertex, withRadius: Optional[float] = None) -> float:
+def _angleSumFor(vertex: Vertex, withRadius: Optional[float] = None, backend = _EXTENDED) -> float:
     """Computes the angle sum at a given vertex. 
     
     Note that if optional parameter withRadius is set to None (the default) then 
@@ -90,15 +101,16 @@ def _angleSumFor(vertex: Vertex, withRadius: Optional[float] = None) -> float:
     Args:
         vertex: The vertex to compute the angle sum for. 
         withRadius: The radius to use for vertex (None is default, and uses vertex.data[1] instead.)
+        backend: The numeric backend. 
         
     Returns:
         The angle sum at vertex.
     """
-    return sum([_faceAngleForOriginOf(dart, withRadius) for dart in vertex.outDarts()])
+    return sum([_faceAngleForOriginOf(dart, withRadius, backend) for dart in vertex.outDarts()])
 
 # Computes the new radius for a vertex
 # PackData.h_radcalc in CirclePack
-def _newRadiusEstimate(vertex: Vertex, guessRadius: float, aim: float, num_iterations: int = 3) -> float:
+def _newRadiusEstimate(vertex: Vertex, guessRadius: float, aim: float, num_iterations: int = 3, backend = _EXTENDED) -> float:
     """Computes a new radius for a vertex that moves its angle sum closer to aim. 
     
     Args:
@@ -106,23 +118,24 @@ def _newRadiusEstimate(vertex: Vertex, guessRadius: float, aim: float, num_itera
         guessRadius: A guess at what radius to use (usually the current radius.)
         aim: The goal angle sum. 
         num_iterations: The total number of iterations to use in modifying from guessRadius (default is 3). 
+        backend: The numeric backend. 
     
     Returns:
         A new radius that brings vertex's angle sum closer to aim. 
     """
-    global OKERR
+    okerr = OKERR if backend.okerr is None else backend.okerr
     
     lower, upper, factor = 0.5, 0.5, 0.5
-    bestcurv = lowcurv = upcurv = _angleSumFor(vertex, withRadius=guessRadius)
+    bestcurv = lowcurv = upcurv = _angleSumFor(vertex, guessRadius, backend)
     
-    if bestcurv > (aim + OKERR):
+    if bestcurv > (aim + okerr):
         lower = 1.0 - factor + guessRadius * factor
-        lowcurv = _angleSumFor(vertex, withRadius=lower)
+        lowcurv = _angleSumFor(vertex, lower, backend)
         if lowcurv > aim:
             return lower
-    elif bestcurv < (aim - OKERR):
+    elif bestcurv < (aim - okerr):
         upper = guessRadius * factor
-        upcurv = _angleSumFor(vertex, withRadius=upper)
+        upcurv = _angleSumFor(vertex, upper, backend)
         if upcurv < aim:
             return upper
     else:
@@ -131,17 +144,17 @@ def _newRadiusEstimate(vertex: Vertex, guessRadius: float, aim: float, num_itera
     r = guessRadius
     
     for _ in range(num_iterations):
-        if bestcurv > (aim + OKERR):
+        if bestcurv > (aim + okerr):
             upper = r
             upcurv = bestcurv
             r -= (bestcurv - aim) * (lower - r) / (lowcurv - bestcurv)
-        elif bestcurv < (aim - OKERR):
+        elif bestcurv < (aim - okerr):
             lower = r
             lowcurv = bestcurv
             r += (aim - bestcurv) * (upper - r) / (upcurv - bestcurv)
         else:
             return r
-        bestcurv = _angleSumFor(vertex, withRadius=r)
+        bestcurv = _angleSumFor(vertex, r, backend)
 
     return r
             
@@ -149,32 +162,27 @@ class PackingError(Exception):
     """A class for any exceptions encountered during circle packing."""
     pass
 
-def repack(dcel: DCEL, num_passes: int = 1000, tolerance: float = 3e-10) -> (DCEL, int):
-    """Computes a hyperbolic maximal packing label of the given DCEL. 
-    
-    This function assumes that the DCEL is a triangulated disk with the boundary given
-    by the vertices and darts incident to diskDcel.outerFace. 
-    
-    It also assumes that at each vertex, the .data attribute is a list [z, r] where
-    z is the current circle center and r is the current hyperbolic radius if not a boundary
-    circle, or r is negative otherwise. 
+class PackingWarning(UserWarning):
+    """Warns of circles that could not be laid out (see _place_circles)."""
+    pass
+
+def repackPasses(dcel: DCEL, num_passes: int = 1000, tolerance: float = 3e-10, backend = EXTENDED) -> Iterator[PassStats]:
+    """The packing loop of repack as a generator. 
     
-    It also assumes that v.aim is set to 2*math.pi for any interior vertex and -1 for any
-    boundary vertex. 
+    Makes the same assumptions on dcel as repack. Yields a PassStats after every pass 
+    over the interior vertices; between passes v.data[1], v.angleSum and v.angleSumError 
+    hold the intermediate labels. Stop iterating to abort the packing. 
     
     Args:
-        diskDcel: The input DCEL. Should be a triangulated disk with all boundary vertices 
-            incident to the outerFace. 
-        numPasses: maximum number of iterations to perform. Default is 1000.
+        dcel: The input DCEL, a triangulated disk. 
+        num_passes: maximum number of passes to perform. Default is 1000.
         tolerance: the tolerance for which the average_error must fall below
+        backend: The numeric backend (see repack). 
     Raises:
-        PackingError if there are no vertices to repack. 
-        
-    Returns:
-        (dcel, loopCount) where dcel is a new dcel with the packing data stored on the vertices, 
-        and loopCount is the number of iterations performed before the packing  procedure hit an 
-        average error below the tolerance.
+        PackingError (on the first next()) if there are no vertices to repack. 
     """
+    backend = getBackend(backend)
+    
     # Which vertices to repack? 
     repack_verts = [v for v in dcel.verts if v.aim > 0]
     
@@ -183,7 +191,7 @@ def repack(dcel: DCEL, num_passes: int = 1000, tolerance: float = 3e-10) -> (DCE
     
     # Get the initial angleSum and error:
     for v in repack_verts: 
-        v.angleSum = _angleSumFor(v)
+        v.angleSum = _angleSumFor(v, None, backend)
         v.angleSumError = v.angleSum - v.aim
     
     loopIdx = 0
@@ -191,35 +199,78 @@ def repack(dcel: DCEL, num_passes: int = 1000, tolerance: float = 3e-10) -> (DCE
     average_error = sum([abs(v.angleSumError) for v in repack_verts]) * recip_repack_v_len
     
     while loopIdx < num_passes and average_error > tolerance:
+        start = time.perf_counter()
+        updated = 0
         
         # Loop over all non boundary vertices
         for v in repack_verts:
             # Compute the current angle sum and error for the vertex. 
-            v.angleSum = _angleSumFor(v)
+            v.angleSum = _angleSumFor(v, None, backend)
             v.angleSumError = v.angleSum - v.aim # aim is TWO_PI if non-boundary, o/w its -1
             
             # If the error is greater than the average error, then compute a new radius
             # for the vertex and update its angle sum and angle sum error. 
             if abs(v.angleSumError) >= average_error - tolerance:
-                v.data[1] = _newRadiusEstimate(v, v.data[1], v.aim, 5)
-                v.angleSum = _angleSumFor(v)
+                r = _newRadiusEstimate(v, v.data[1], v.aim, 5, backend)
+                if r != v.data[1]:
+                    updated += 1
+                v.data[1] = r
+                v.angleSum = _angleSumFor(v, None, backend)
                 v.angleSumError = v.angleSum - v.aim
         
         # Compute the average error on the vertices and update the loopIdx
-        average_error = sum([abs(v.angleSumError) for v in repack_verts]) * recip_repack_v_len
+        errors = [abs(v.angleSumError) for v in repack_verts]
+        average_error = sum(errors) * recip_repack_v_len
         loopIdx += 1
+        yield PassStats(loopIdx, float(average_error), float(max(errors)), updated, 
+                        time.perf_counter() - start)
+
+def repack(dcel: DCEL, num_passes: int = 1000, tolerance: float = 3e-10, backend = EXTENDED, 
+           callback: Optional[Callable[[PassStats], bool]] = None) -> (DCEL, int):
+    """Computes a hyperbolic maximal packing label of the given DCEL. 
+    
+    This function assumes that the DCEL is a triangulated disk with the boundary given
+    by the vertices and darts incident to diskDcel.outerFace. 
+    
+    It also assumes that at each vertex, the .data attribute is a list [z, r] where
+    z is the current circle center and r is the current hyperbolic radius if not a boundary
+    circle, or r is negative otherwise. 
+    
+    It also assumes that v.aim is set to 2*math.pi for any interior vertex and -1 for any
+    boundary vertex. 
+    
+    Args:
+        diskDcel: The input DCEL. Should be a triangulated disk with all boundary vertices 
+            incident to the outerFace. 
+        numPasses: maximum number of iterations to perform. Default is 1000.
+        tolerance: the tolerance for which the average_error must fall below
+        backend: The numeric backend (see packingBackends), a name or a backend object. 
+            The radii should be reals of the backend. Default is EXTENDED. 
+        callback: Called with a packingMonitor.PassStats after every pass. Returning True 
+            stops the packing (see packingMonitor.PackingMonitor). 
+    Raises:
+        PackingError if there are no vertices to repack. 
         
-    return dcel, loopIdx
+    Returns:
+        (dcel, loopCount) where dcel is a new dcel with the packing data stored on the vertices, 
+        and loopCount is the number of iterations performed before the packing  procedure hit an 
+        average error below the tolerance.
+    """
+    return dcel, runPasses(repackPasses(dcel, num_passes, tolerance, backend), callback)
 
-def _place_circles(dcel: DCEL, centerDartIdx: int) -> None:
+def _place_circles(dcel: DCEL, centerDartIdx: int, backend = _EXTENDED) -> None:
     """Computes and stores the centers for each vertex in dcel. 
     
     Args:
         dcel: A DCEL that is a triangulated disk with each Vertex's .data field set to [ctr, rad] where rad is the radius for the circle at that vertex in a computed packing label and ctr is a dummy tuple to be replaced by this computation.
         centerDartIdx: The index of the dart to place at the origin of the disk. The dart's .origin vertex is placed directly on the origin and the dart's .dest vertex is placed along the positive x-axis. This must not be a boundary dart. 
+        backend: The numeric backend. 
 
     Raises:
         PackingError if all vertices are incident to the outer face or if the selected dart at index centerDartIdx is a boundary dart. 
+    
+    Vertices whose circle can not be computed get .data None, are listed in 
+    dcel.unplacedVerts and are reported with a PackingWarning. 
     """
     if centerDartIdx < 0:
         # Then we need to find a dart that is not a boundary dart. 
@@ -237,7 +288,7 @@ def _place_circles(dcel: DCEL, centerDartIdx: int) -> None:
         if center_dart.origin.aim < 0:
             raise PackingError("Can't start layout from a horocycle. Select a vertex of finite radius to center at the origin.")
             
-    _place_dart_at_origin(center_dart)
+    _place_dart_at_origin(center_dart, backend)
     
     # BFS the dual graph of the dcel to place each face
     # in our BFS queue we add the dart incident to an unplaced face
@@ -246,6 +297,7 @@ def _place_circles(dcel: DCEL, centerDartIdx: int) -> None:
     # remaining vertex to place is dart.next.dest. This may have already 
     # been placed, of course, so we need to keep track of both what
     # faces we have visited and what vertices we have placed. 
+    dcel.unplacedVerts = []
     for vert in dcel.verts:
         vert._is_placed = False
     center_dart.origin._is_placed = True
@@ -266,10 +318,14 @@ def _place_circles(dcel: DCEL, centerDartIdx: int) -> None:
                                                    next_dart.dest.data[0], 
                                                    next_dart.origin.data[1], 
                                                    next_dart.dest.data[1],
-                                                   vertex_to_place.data[1])
-            except: 
-                print("Error: most likely a circle shrunk to zero radius.")
+                                                   vertex_to_place.data[1],
+                                                   backend)
+            except Exception as error: 
+                warnings.warn(f"Could not place the circle of vertex {vertex_to_place.idx} "
+                              f"(most likely a circle shrunk to zero radius): {error!r}", 
+                              PackingWarning)
                 vertex_to_place.data = None
+                dcel.unplacedVerts.append(vertex_to_place)
             vertex_to_place.placing_dart = next_dart
             vertex_to_place._is_placed = True
             #TODO We could here compute the maximum error in placement by how different the
@@ -285,7 +341,10 @@ def maximalPacking(diskDcel: DCEL,
                    num_passes: int = 1000, 
                    tolerance: float = 3e-10, 
                    centerDartIdx: int = -1, 
-                   placeCircles: bool = True) -> (DCEL, int):
+                   placeCircles: bool = True, 
+                   method: str = "iterative", 
+                   backend = EXTENDED, 
+                   callback: Optional[Callable[[PassStats], bool]] = None) -> (DCEL, int):
     """Computes a hyperbolic maximal packing of the given DCEL. 
     
     This function assumes that the DCEL is a triangulated disk with the boundary given
@@ -296,20 +355,42 @@ def maximalPacking(diskDcel: DCEL,
             incident to the outerFace. 
         numPasses: maximum number of iterations to perform. Default is 1000.
         tolerance: 
+        method: "iterative" (the default) to repack with the uniform neighbor iteration of 
+            repack, or "newton" to solve for the log-radii with Newton's method and sparse 
+            linear solves (see hypPackerNumpy). With "newton", num_passes bounds the number
+            of Newton steps. 
+        backend: The numeric backend (see packingBackends), either a name (EXTENDED, the 
+            default, COMPLEX, MPMATH or NUMPY) or a backend object such as MpmathBackend(50). 
+            NUMPY packs and lays out with hypPackerNumpy.maximalPacking. With MPMATH the 
+            "newton" radii are only computed to double precision, and the CircleH2s hold 
+            doubles (use placeCircles = False to keep the full precision labels). 
+        callback: Called with a packingMonitor.PassStats after every pass (or Newton step). 
+            Returning True stops the packing. 
+    Raises:
+        ValueError if method is not "iterative" or "newton", or backend is unknown. 
     Returns:
         A tuple (dcel, loopCount) where dcel is a new DCEL structure where each vertex 
-        stores a list [z, r] as its .data object where z is a complex specifying the 
-        center of the circle for the vertex and r is its radius; and loopCount is the
-        number of iterations performed before the packing procedure hit an average error
-        below the tolerance.
+        stores a CircleH2 as its .data object (or a list [z, r] where z is the center of the 
+        circle for the vertex and r is its radius if placeCircles is False); and loopCount 
+        is the number of iterations performed before the packing procedure hit an average 
+        error below the tolerance.
     """
-    TWO_PI = 2.0 * math.pi
+    backend = getBackend(backend)
+    if method not in ("iterative", "newton"):
+        raise ValueError(f"Unknown packing method {method}.")
+    if backend.vectorized:
+        # Imported here since hypPackerNumpy builds on hypPacker
+        from .hypPackerNumpy import maximalPacking as arrayPacking
+        return arrayPacking(diskDcel, num_passes, tolerance, centerDartIdx, placeCircles, 
+                            method = method, callback = callback)
+    
+    TWO_PI = 2.0 * backend.pi
     # Following the convention in CirclePack we will store at each vertex a pair [c, r] where c
     # is the complex number for the center of the circle and r is the radius. If r is positive than 
     # the radius is finite, and the euclidean radius is gi ven by x = 1 - exp(-2r). If r is negative
     # then the circle is a horocycle (infinite radius) and the euclidean radius is -r
     dcel = diskDcel.duplicate(
-                vdata_transform = (lambda v : [ExtendedComplex(0,1), 1]), # centered at 0j with radius 1
+                vdata_transform = (lambda v : [backend.point(0, 1), 1]), # centered at 0j with radius 1
                 edata_transform = (lambda e : None),
                 fdata_transform = (lambda f : None)
              )
@@ -318,22 +399,31 @@ def maximalPacking(diskDcel: DCEL,
     
     # From PackData.set_aim_default():
     for v in dcel.verts:
-        v.data = [ExtendedComplex.ZERO, 0.5]
+        v.data = [backend.point(0), backend.real(0.5)]
         v.aim = TWO_PI
     for b in bdryVerts:
-        b.data = [ExtendedComplex.ZERO, -5]
+        b.data = [backend.point(0), backend.real(-5)]
         b.aim = -1.0
     
-    repack_iterations = repack(dcel, num_passes, tolerance)
+    if method == "iterative":
+        _, repack_iterations = repack(dcel, num_passes, tolerance, backend, callback)
+    else:
+        # Imported here since hypPackerNumpy builds on hypPacker
+        from .hypPackerNumpy import repack as arrayRepack, NEWTON
+        _, repack_iterations = arrayRepack(dcel, num_passes, tolerance, method = NEWTON, 
+                                           callback = callback)
+        for v in dcel.verts:
+            v.data[1] = backend.real(v.data[1])
     
     if placeCircles:
-        _place_circles(dcel, centerDartIdx)
+        _place_circles(dcel, centerDartIdx, backend)
 
         # Finally, let's convert the ((x+iy), r) data to CircleH2 types
         for v in dcel.verts:
             data = v.data
             if data:
-                v.data = CircleH2(PointH2(data[0]), data[1])
+                v.data = CircleH2(PointH2(ExtendedComplex(backend.toComplex(data[0]))), 
+                                  float(data[1]))
                 
     return dcel, repack_iterations
 
@@ -342,36 +432,38 @@ def _set_center(v: Vertex, z: ExtendedComplex) -> None:
     
     Args: 
         v: The Vertex to set the .data[0] on. 
-        z: The new center. 
+        z: The new center (a point of the numeric backend). 
     """
     absz = abs(z)
     if (absz > 1.0):
-        v.data[0] = ExtendedComplex(z.z, z.w * absz)#z * (1.0 / absz)
+        v.data[0] = z * (1.0 / absz)
     else:
-        v.data[0] = ExtendedComplex(z)
+        v.data[0] = z
         
-def _set_radius(v: Vertex, rad: float) -> None:
+def _set_radius(v: Vertex, rad: float, backend = _EXTENDED) -> None:
     """Sets the radius data of Vertex v.
     
     Args:
         v: The Vertex to set the radius data on. 
         rad: The hypberolic radius to set. (Note: will be stored as an x-radius.)
+        backend: The numeric backend. 
     """
     # converts rad from hyperbolic radius to x-radius. 
     if rad > 0.0:
-        v.data[1] = (1 - math.exp(-2.0 * rad) 
+        v.data[1] = (1 - backend.exp(-2.0 * rad) 
                      if rad > 1e-4 
                      else 2.0 * rad * (1.0 - rad * (1.0 - 2.0 * rad / 3.0)))
     elif rad <= 0.0:
         v.data[1] = rad
 
-def _place_dart_at_origin(aDart: Dart) -> ExtendedComplex:
+def _place_dart_at_origin(aDart: Dart, backend = _EXTENDED) -> ExtendedComplex:
     """Places the origin of aDart at the origin and the destination along the positive x-axis.
     
     Assumes that the origin of aDart does not have infinite radius. 
     
     Args:
         aDart: The dart to lay down starting at the origin along the positive x-axis. 
+        backend: The numeric backend. 
     
     """
     a = aDart.origin
@@ -379,40 +471,41 @@ def _place_dart_at_origin(aDart: Dart) -> ExtendedComplex:
     
     x1 = a.data[1]
     x2 = k.data[1]
-    s1 = _x_to_s_rad(x1)
-    s2 = _x_to_s_rad(x2)
+    s1 = _x_to_s_rad(x1, backend)
+    s2 = _x_to_s_rad(x2, backend)
     
-    _set_center(a, ExtendedComplex.ZERO)
+    _set_center(a, backend.point(0))
     
     if s2 <= 0: # If the second has infinite radius
-        _set_center(k, ExtendedComplex.ONE)
+        _set_center(k, backend.point(1))
         erad = x1 / ((1.0 + s1) * (1.0 + s1))
-        _set_radius(k, -1.0 * (1.0 - erad * erad) / (2.0 + 2.0 * erad))
+        _set_radius(k, -1.0 * (1.0 - erad * erad) / (2.0 + 2.0 * erad), backend)
     else:
         x12 = x1 * x2
         x1p2 = x1 + x2
         s12 = s1 * s2
         x = (x1p2 - x12) / (s12 * (1 + s12)) - (2 * x1p2 - 2 * x12) / (4 * s12)
-        s = x + math.sqrt(x * (x + 2))
-        _set_center(k, ExtendedComplex(s / (s + 2)))
+        s = x + backend.sqrt(x * (x + 2))
+        _set_center(k, backend.point(s / (s + 2)))
 
 # (a - z) / (1 - z * conj(a))
 # = (-z + a) / (-z * conj(a) + 1)
 # Mobius.mob_trans in CirclePack
-def _mob_trans(z: ExtendedComplex, a: ExtendedComplex) -> ExtendedComplex: 
+def _mob_trans(z: ExtendedComplex, a: ExtendedComplex, backend = _EXTENDED) -> ExtendedComplex: 
     """Convenience function for applying a mobius transformation that fixes the disk to a complex number z.
     
     Args:
         z: The complex number to apply the Mobius transformation to. 
         a: The parameter for the transformation. 
+        backend: The numeric backend. 
     
     Returns: 
         (-z + a) / (-z * conjugate(a) + 1)
     """
-    return z.applyMobius(ExtendedComplex(-1), a, -a.conjugate(), ExtendedComplex.ONE)
+    return backend.mobius(z, backend.point(-1), a, -a.conjugate(), backend.point(1))
 
 # Mobius.mobDiscInvValue in CirclePack
-def _mobDiskInvValue(w: ExtendedComplex, a: ExtendedComplex, b: ExtendedComplex) -> ExtendedComplex:
+def _mobDiskInvValue(w: ExtendedComplex, a: ExtendedComplex, b: ExtendedComplex, backend = _EXTENDED) -> ExtendedComplex:
     """Convenience routine: computes the preimage of w under mobius transformation of the disk that
     maps a to zero and b to the positive x-axis. 
     
@@ -420,27 +513,29 @@ def _mobDiskInvValue(w: ExtendedComplex, a: ExtendedComplex, b: ExtendedComplex)
         w: The point to invert.
         a: the point to send to 0. 
         b: the point to place on the positive x-axis. 
+        backend: The numeric backend. 
     
     Returns:
         The preimage of w under the appropriate Mobius transformation.
     """
     global MOB_TOLER
-    z = _mob_trans(b, a)
+    z = _mob_trans(b, a, backend)
     # Check if b is very close to a:
     c = abs(z)
     if c < MOB_TOLER:
         return a
     else:
         z = z * (1.0 / c)
-        return _mob_trans(z * w, a)
+        return _mob_trans(z * w, a, backend)
 
-def _eucl_circle_3(z1: ExtendedComplex, z2: ExtendedComplex, z3: ExtendedComplex) -> (ExtendedComplex, float):
+def _eucl_circle_3(z1: ExtendedComplex, z2: ExtendedComplex, z3: ExtendedComplex, backend = _EXTENDED) -> (ExtendedComplex, float):
     """Find the euclidean center/radius for circle through 3 points in the euclidean plane.
     
     Args:
         z1: ExtendedComplex  
         z2: ExtendedComplex 
         z3: ExtendedComplex
+        backend: The numeric backend the points belong to. 
     Returns:
         A tuple (c, r) where c is the euclidean center and r is the euclidean radius of the
         circle passing through z1, z2, and z3. 
@@ -468,11 +563,11 @@ def _eucl_circle_3(z1: ExtendedComplex, z2: ExtendedComplex, z3: ExtendedComplex
     
     c_real = (b2 * c1 - b1 * c2) / det
     c_imag = (a1 * c2 - a2 * c1) / det
-    c_rad = math.sqrt((c_real-z1.real)*(c_real-z1.real)+(c_imag-z1.imag)*(c_imag-z1.imag))
-    return (ExtendedComplex(complex(c_real, c_imag)), c_rad)
+    c_rad = backend.sqrt((c_real-z1.real)*(c_real-z1.real)+(c_imag-z1.imag)*(c_imag-z1.imag))
+    return (backend.point(c_real, c_imag), c_rad)
     
 # HyperbolicMath.h_compcenter in CirclePack
-def _compute_center(z1: ExtendedComplex, z2: ExtendedComplex, x1: float, x2: float, x3:float) -> (ExtendedComplex, float):
+def _compute_center(z1: ExtendedComplex, z2: ExtendedComplex, x1: float, x2: float, x3:float, backend = _EXTENDED) -> (ExtendedComplex, float):
     """Computes the Poincare disk center of a circle given its two tangent neighbors. 
     
     Places the circle in counterclockwise orientation from the first two. 
@@ -483,18 +578,15 @@ def _compute_center(z1: ExtendedComplex, z2: ExtendedComplex, x1: float, x2: flo
         x1: The x-radius of circle 1. 
         x2: The x-radius of circle 2. 
         x3: The x-radius of the circle to place. 
+        backend: The numeric backend. 
     
     Returns:
         A tuple (ctr, rad) where ctr is the center of the third circle given as a point in the Poincare disk and rad is the x-radius of the point. 
     """
-    # Hack for now. We need to run a pylint to find the type bugs
-    if isinstance(z1, complex):
-        z1 = ExtendedComplex(z1)
-    
-    if isinstance(z2, complex):
-        z2 = ExtendedComplex(z2)
+    z1 = backend.fromComplex(z1)
+    z2 = backend.fromComplex(z2)
     
-    s1, s2, s3 = _x_to_s_rad(x1), _x_to_s_rad(x2), _x_to_s_rad(x3)
+    s1, s2, s3 = _x_to_s_rad(x1, backend), _x_to_s_rad(x2, backend), _x_to_s_rad(x3, backend)
     sgn = 1.0
     
     if s1 <= -1.0 or s2 <= -1.0:
@@ -515,58 +607,60 @@ def _compute_center(z1: ExtendedComplex, z2: ExtendedComplex, x1: float, x2: flo
             x1p3 = x1 + x3
             s13 = s1 * s3
             acstuff = (x1p3 - x13) / (s13 * (1 + s13)) - (2 * x1p3 - 2 * x13) / (4 * s13)
-            side_p1 = acstuff + math.sqrt(acstuff * (acstuff + 2))
+            side_p1 = acstuff + backend.sqrt(acstuff * (acstuff + 2))
             ahc = side_p1 / (side_p1 + 2) # abs value of hyp center
             #center as if z1 is at the origin. 
             if a == b:
-                z3 = ExtendedComplex(complex(cc*ahc*ahc, sgn*math.sqrt(1-cc*cc)*ahc))
+                z3 = backend.point(cc*ahc*ahc, sgn*backend.sqrt(1-cc*cc)*ahc)
             else:
-                z3 = ExtendedComplex(complex(cc*ahc, sgn*math.sqrt(1-cc*cc)*ahc))
-            z3 = _mobDiskInvValue(z3, a, b) # move to the right place
+                z3 = backend.point(cc*ahc, sgn*backend.sqrt(1-cc*cc)*ahc)
+            z3 = _mobDiskInvValue(z3, a, b, backend) # move to the right place
             return (z3, x3)
         else: 
             r = (1 - s1) / (1 + s1)
             sc = (r * r + 1 + 2 * r) / (2 * (1 + r))
             cc2 = cc * cc
-            c = ExtendedComplex(complex(sc * cc, sc * sgn * math.sqrt(1-cc2)))
+            c = backend.point(sc * cc, sc * sgn * backend.sqrt(1-cc2))
             rad = 1 - sc
             w1 = c - rad
             w2 = c + rad
-            w3 = c + ExtendedComplex(rad*1j)
-            w1 = _mobDiskInvValue(w1, a, b)
-            w2 = _mobDiskInvValue(w2, a, b)
-            w3 = _mobDiskInvValue(w3, a, b)
-            ctr, rad = _eucl_circle_3(w1, w2, w3)
+            w3 = c + backend.point(0, rad)
+            w1 = _mobDiskInvValue(w1, a, b, backend)
+            w2 = _mobDiskInvValue(w2, a, b, backend)
+            w3 = _mobDiskInvValue(w3, a, b, backend)
+            ctr, rad = _eucl_circle_3(w1, w2, w3, backend)
             return (ctr * (1.0 / abs(ctr)), -rad)
     elif s3 > 0: # first two horocycles, third infinite
         erad = (1.0 - s3) / (1.0 + s3)
         hororad = (1.0 - erad * erad) / (2.0 * (1 + erad))
-        dist12 = math.sqrt(2*hororad*hororad)
+        dist12 = backend.sqrt(2*hororad*hororad)
         d = 1.0 - hororad
-        theta = math.acos((2.0*d*d - dist12*dist12)/(2.0*d*d))
+        theta = backend.acos((2.0*d*d - dist12*dist12)/(2.0*d*d))
         
         d1 = 1.0 - 2.0 * hororad
         d2 = 1.0 + 2.0 * s1
         
         t = (d2 - d1) / (d2 * d1 - 1.0)
-        newZ = ExtendedComplex.ZERO.applyMobius(
-            ExtendedComplex.ONE, 
-            ExtendedComplex(-t), 
-            ExtendedComplex(-t), 
-            ExtendedComplex.ONE)
-        theta = ExtendedComplex(complex(0,theta)).apply(1, -t, -t, 1).arg()
-        origTheta = (z2 / z1).arg()
-        t = (math.sin(theta) / (1.0 - math.cos(theta)) 
-             - math.sin(origTheta) / (1.0 - math.cos(origTheta)))
-        nextZ = newZ.applyMobius(
-            ExtendedComplex(complex(2,t)), 
-            ExtendedComplex(complex(0,-t)), 
-            ExtendedComplex(complex(0,t)), 
-            ExtendedComplex(complex(2,-t))
+        One = backend.point(1)
+        newZ = backend.mobius(backend.point(0), One, backend.point(-t), backend.point(-t), One)
+        theta = backend.arg(backend.mobius(backend.point(0, theta), 
+                                           One, backend.point(-t), backend.point(-t), One))
+        origTheta = backend.arg(z2 / z1)
+        t = (backend.sin(theta) / (1.0 - backend.cos(theta)) 
+             - backend.sin(origTheta) / (1.0 - backend.cos(origTheta)))
+        nextZ = backend.mobius(newZ, 
+            backend.point(2, t), 
+            backend.point(0, -t), 
+            backend.point(0, t), 
+            backend.point(2, -t)
         )
         return (nextZ * z1, x3)
     else:
-        return _h_horo_center(z1, z2, -s2, 1, 1, 1)
+        # Done with ExtendedComplex Mobius transformations in every backend
+        ctr, rad = _h_horo_center(ExtendedComplex(backend.toComplex(z1)), 
+                                  ExtendedComplex(backend.toComplex(z2)), 
+                                  -s2, 1, 1, 1)
+        return (backend.fromComplex(ctr.toComplex()), backend.real(rad))
     
 # Comment from Ken's code: 
 # TODO: some confusion on what this does and whether there's an error.
@@ -679,8 +773,8 @@ def _h_to_x_rad(h: float) -> float:
 def _s_to_x_rad(s: float) -> float:
     return s if s <= 0.0 else (1.0 - s * s)
 
-def _x_to_s_rad(x: float) -> float:
-    return x if x <= 0.0 else math.sqrt(1.0 - x)
+def _x_to_s_rad(x: float, backend = _EXTENDED) -> float:
+    return x if x <= 0.0 else backend.sqrt(1.0 - x)
 
 def _x_to_h_rad(x: float) -> float:
     if x > 0.0:
@@ -719,8 +813,8 @@ def euclidean_circle_to_hyperbolic(e_center: ExtendedComplex, e_rad: float) -> (
     else:
         c2 = aec * aec
         r2 = e_rad * e_rad
-        if aec < 1e-13: # at the origin
-            h_center = ExtendedComplex.ZERO
+        if aec < 1e-13: # at the origin, keeping the number type of e_center
+            h_center = e_center * 0.0
         else:
             b = math.sqrt((1.0 + 2.0*aec + c2 - r2) / (1.0 - 2.0 * aec + c2 - r2))
             ahc = (b - 1) / (b + 1)
@@ -0,0 +1,619 @@
+# Thurston style hyperbolic circle packings computed over flat NumPy arrays.
+#
+# This is the packing of hypPacker.maximalPacking, but instead of visiting the
+# vertices one at a time from Python, the face angles at all corners of the
+# triangulation (see packingArrays.PackingCorners) are computed at once and
+# summed per vertex with np.add.reduceat. Radii are then updated for many
+# vertices at once with the uniform neighbor model of Collins and Stephenson:
+# each vertex pretends its k neighbors all share one radius, chosen so that its
+# current angle sum is reproduced, and takes the radius that would give it its
+# target angle sum among such neighbors.
+#
+# Radii are stored as x-radii like in hypPacker: x = 1 - exp(-2r) for a circle
+# of hyperbolic radius r, and x <= 0 for a horocycle (x = -euclidean radius).
+#
+# The NEWTON method instead solves angleSum(u) = aim for the log-radii u = log r
+# of the packed vertices with Newton's method. The Jacobian of the angle sums is
+# a sparse matrix with the sparsity of the graph Laplacian, so each step is one
+# sparse LU solve, and a backtracking line search keeps the steps safe far from
+# the solution.
+#
+# References:
+#     Collins, C. R. and Stephenson, K. "A circle packing algorithm."
+#         Computational Geometry 25, pp. 233-256, 2003.
+
+import math
+import time
+
+from typing import Callable, Iterator, Optional
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.linalg import spsolve
+
+from ..datastructures.dcel import DCEL
+from ..datastructures.arrayDCEL import ArrayDCEL
+from ..geometries.extendedComplex import ExtendedComplex
+from ..geometries.hyperbolic2 import CircleH2
+from .packingArrays import PackingCorners, independentSets
+from .hypPacker import PackingError
+from .packingMonitor import PassStats, runPasses
+
+JACOBI = "jacobi"
+GAUSS_SEIDEL = "gauss-seidel"
+
+ITERATIVE = "iterative"
+NEWTON = "newton"
+METHODS = (ITERATIVE, NEWTON)
+
+# Smallest sine of a face angle used in the Jacobian (degenerate triangles)
+_MIN_SIN = 1e-12
+# Smallest step length tried by the Newton line search
+_MIN_STEP = 2.0 ** -20
+
+def cosFaceAngles(x1: np.ndarray, x2: np.ndarray, x3: np.ndarray) -> np.ndarray:
+    """Vectorized hypPacker._cosFaceAngle.
+
+    Args:
+        x1: The x-radii of the circles at which to compute the cosine face angles.
+        x2: The x-radii of the second circles.
+        x3: The x-radii of the third circles.
+
+    Returns:
+        The cosines of the face angles at the x1 circles.
+    """
+    # A horocycle neighbor behaves like a circle with x-radius 1, which turns the
+    # general formula into each of the special cases of _cosFaceAngle.
+    y2 = np.where(x2 <= 0, 1.0, x2)
+    y3 = np.where(x3 <= 0, 1.0, x3)
+    ans = (x1 * (x1 + (1.0 - x1) * (y2 + y3 - y2 * y3))
+           / ((x1 + y3 - x1 * y3) * (x1 + y2 - x1 * y2)))
+    cos = np.clip(2.0 * ans - 1.0, -1.0, 1.0)
+    return np.where(x1 <= 0, 1.0, cos)
+
+def angleSums(corners: PackingCorners, x: np.ndarray) -> np.ndarray:
+    """Computes the angle sum at every vertex.
+
+    Args:
+        corners: The corners of the triangulation.
+        x: The x-radius of every vertex.
+
+    Returns:
+        The angle sums, 0 for vertices without corners.
+    """
+    angles = np.arccos(cosFaceAngles(x[corners.origin], x[corners.dest], x[corners.third]))
+    return corners.cornerSums(angles)
+
+def cornerAngleDerivatives(x1: np.ndarray,
+                            x2: np.ndarray,
+                            x3: np.ndarray) -> (np.ndarray, np.ndarray, np.ndarray):
+    """Computes the derivatives of the face angles at x1 with respect to the log-radii.
+
+    Args:
+        x1: The (finite, positive) x-radii of the circles at which the angles are taken.
+        x2: The x-radii of the second circles.
+        x3: The x-radii of the third circles.
+
+    Returns:
+        (d1, d2, d3), the derivatives of the angles at the x1 circles with respect to
+        log r1, log r2 and log r3. Derivatives for horocycles are 0.
+    """
+    # With a = exp(-2 r1) = 1 - x1, and b, d likewise for x2, x3 (0 for horocycles)
+    #     cos(angle) = 2F - 1,  F = (1 - a)(1 - abd) / ((1 - ad)(1 - ab)),
+    # so d angle = -2F d log F / sin(angle) where sin(angle) = 2 sqrt(F (1 - F)), and
+    # d log a / d log r1 = -2 r1 = log a.
+    a = 1.0 - x1
+    b = np.where(x2 <= 0, 0.0, 1.0 - x2)
+    d = np.where(x3 <= 0, 0.0, 1.0 - x3)
+    ab, ad = a * b, a * d
+    abd = ab * d
+    F = (1.0 - a) * (1.0 - abd) / ((1.0 - ad) * (1.0 - ab))
+    F = np.clip(F, 0.0, 1.0)
+    sin = np.maximum(2.0 * np.sqrt(F * (1.0 - F)), _MIN_SIN)
+    scale = 2.0 * F / sin # -d angle / d log F
+
+    tAbd = abd / (1.0 - abd)
+    tAb = ab / (1.0 - ab)
+    tAd = ad / (1.0 - ad)
+    dlogFa = -a / (1.0 - a) - tAbd + tAb + tAd
+    dlogFb = tAb - tAbd
+    dlogFd = tAd - tAbd
+
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        d1 = -scale * dlogFa * np.log(a)
+        d2 = np.where(x2 <= 0, 0.0, -scale * dlogFb * np.log(b))
+        d3 = np.where(x3 <= 0, 0.0, -scale * dlogFd * np.log(d))
+    return d1, d2, d3
+
+def uniformNeighborRadii(x: np.ndarray,
+                         angleSum: np.ndarray,
+                         aim: np.ndarray,
+                         degree: np.ndarray) -> np.ndarray:
+    """Computes new x-radii with the uniform neighbor model.
+
+    Args:
+        x: The current (finite, positive) x-radii.
+        angleSum: The current angle sums.
+        aim: The target angle sums.
+        degree: The number of corners at each vertex.
+
+    Returns:
+        The new x-radii.
+    """
+    # With s = exp(-r) the current angle sum θ = 2k asin(sinh ρ / sinh(r + ρ)) fixes
+    # the uniform neighbor radius ρ through P^2 = exp(2ρ) = s (1 - βs) / (s - β) with
+    # β = sin(θ / 2k). The new radius R = exp(r') solves the same equation for the aim,
+    # R = ((P^2 - 1) + sqrt((P^2 - 1)^2 + 4 δ^2 P^2)) / (2 δ P^2) with δ = sin(aim / 2k).
+    # When β >= s the neighbors would have to be horocycles (P = inf) and R = 1 / δ.
+    s = np.sqrt(1.0 - x)
+    beta = np.sin(angleSum / (2.0 * degree))
+    delta = np.sin(aim / (2.0 * degree))
+    finite = beta < s
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        P2 = s * (1.0 - beta * s) / (s - beta)
+        R = (((P2 - 1.0) + np.sqrt((P2 - 1.0) * (P2 - 1.0) + 4.0 * delta * delta * P2))
+             / (2.0 * delta * P2))
+    newS = np.where(finite, 1.0 / R, delta)
+    return 1.0 - newS * newS
+
+class ArrayPacker:
+    """A hyperbolic maximal packing problem in array form.
+
+    The geometry enters only through the _angleSums, _newRadii, _angleDerivatives,
+    _logRadii and _radiiFromLog methods, which subclasses for other geometries override
+    (see euclideanPacker.EuclideanArrayPacker).
+
+    Attributes:
+        corners: The PackingCorners of the triangulation.
+        aim: The target angle sum at each vertex, negative for boundary (horocycle) vertices.
+        packed: The indices of the vertices whose radii are computed (aim > 0).
+        degree: The number of corners at each vertex.
+        schedule: JACOBI to update all radii at once, or GAUSS_SEIDEL (the default) to update
+            the sets of an independent set partition one after the other.
+    """
+
+    def __init__(self, corners: PackingCorners, aim: np.ndarray, schedule: str = GAUSS_SEIDEL):
+        if schedule not in (JACOBI, GAUSS_SEIDEL):
+            raise ValueError(f"Unknown schedule {schedule}.")
+        self.corners  = corners
+        self.aim      = np.asarray(aim, dtype = float)
+        self.packed   = np.flatnonzero(self.aim > 0)
+        self.degree   = corners.degrees()
+        self.schedule = schedule
+        if len(self.packed) == 0:
+            raise PackingError("Nothing to repack (all boundary vertices).")
+        self._setCorners = None
+
+    def _independentSetCorners(self):
+        if self._setCorners == None:
+            sets = independentSets(self.corners, self.packed)
+            self._setCorners = [(verts, self.corners.subset(verts)) for verts in sets]
+        return self._setCorners
+
+    def _angleSums(self, corners: PackingCorners, x: np.ndarray) -> np.ndarray:
+        return angleSums(corners, x)
+
+    def _newRadii(self, x, angleSum, aim, degree) -> np.ndarray:
+        return uniformNeighborRadii(x, angleSum, aim, degree)
+
+    def _angleDerivatives(self, x1, x2, x3):
+        return cornerAngleDerivatives(x1, x2, x3)
+
+    def _logRadii(self, x: np.ndarray) -> np.ndarray:
+        # The log of the hyperbolic radii
+        return np.log(-0.5 * np.log1p(-x))
+
+    def _radiiFromLog(self, u: np.ndarray) -> np.ndarray:
+        return -np.expm1(-2.0 * np.exp(u))
+
+    def _errors(self, x: np.ndarray) -> np.ndarray:
+        sums = self._angleSums(self.corners, x)
+        return np.abs(sums[self.packed] - self.aim[self.packed])
+
+    def averageError(self, x: np.ndarray) -> float:
+        """The average absolute angle sum error over the packed vertices."""
+        return float(np.mean(self._errors(x)))
+
+    def sweep(self, x: np.ndarray) -> None:
+        """Updates the radii of all packed vertices once, in place."""
+        if self.schedule == JACOBI:
+            verts = self.packed
+            sums = self._angleSums(self.corners, x)
+            x[verts] = self._newRadii(x[verts], sums[verts], self.aim[verts], self.degree[verts])
+        else:
+            for verts, setCorners in self._independentSetCorners():
+                sums = self._angleSums(setCorners, x)
+                x[verts] = self._newRadii(x[verts], sums[verts], self.aim[verts], self.degree[verts])
+
+    def _passStats(self, loopIdx: int, x: np.ndarray, previous: np.ndarray, start: float) -> PassStats:
+        errors = self._errors(x)
+        return PassStats(loopIdx, float(np.mean(errors)), float(np.max(errors)),
+                         int(np.count_nonzero(x[self.packed] != previous)), time.perf_counter() - start)
+
+    def repackPasses(self, x: np.ndarray, num_passes: int = 1000, tolerance: float = 3e-10) -> Iterator[PassStats]:
+        """The sweeps of repack as a generator yielding a PassStats after each sweep.
+
+        Between sweeps x holds the intermediate radii. Stop iterating to abort the packing.
+        """
+        loopIdx = 0
+        average_error = self.averageError(x)
+        while loopIdx < num_passes and average_error > tolerance:
+            start = time.perf_counter()
+            previous = x[self.packed]
+            self.sweep(x)
+            loopIdx += 1
+            stats = self._passStats(loopIdx, x, previous, start)
+            average_error = stats.averageError
+            yield stats
+
+    def repack(self,
+               x: np.ndarray,
+               num_passes: int = 1000,
+               tolerance: float = 3e-10,
+               callback: Optional[Callable[[PassStats], bool]] = None) -> int:
+        """Iterates sweeps until the average error falls below tolerance.
+
+        Args:
+            x: The x-radii, updated in place. Boundary entries are left as they are.
+            num_passes: The maximum number of sweeps.
+            tolerance: The average error to reach.
+            callback: Called with a packingMonitor.PassStats after every sweep. Returning
+                True stops the packing.
+
+        Returns:
+            The number of sweeps performed.
+        """
+        return runPasses(self.repackPasses(x, num_passes, tolerance), callback)
+
+    def jacobian(self, x: np.ndarray):
+        """The Jacobian of the packed angle sums with respect to the packed log-radii.
+
+        Returns:
+            A scipy.sparse CSC matrix whose row and column i belong to vertex packed[i].
+        """
+        corners = self.corners
+        n = len(self.packed)
+        position = np.full(corners.numVerts, -1, dtype = np.int64)
+        position[self.packed] = np.arange(n)
+
+        keep = position[corners.origin] >= 0
+        origin, dest, third = corners.origin[keep], corners.dest[keep], corners.third[keep]
+        d1, d2, d3 = self._angleDerivatives(x[origin], x[dest], x[third])
+
+        rows = np.concatenate([position[origin]] * 3)
+        cols = position[np.concatenate([origin, dest, third])]
+        vals = np.concatenate([d1, d2, d3])
+        inside = cols >= 0 # Boundary radii are fixed
+        return coo_matrix((vals[inside], (rows[inside], cols[inside])), shape = (n, n)).tocsc()
+
+    def newtonPasses(self, x: np.ndarray, num_passes: int = 100, tolerance: float = 3e-10) -> Iterator[PassStats]:
+        """The steps of newton as a generator yielding a PassStats after each step.
+
+        Between steps x holds the intermediate radii. Stop iterating to abort the packing.
+        """
+        packed, aim = self.packed, self.aim[self.packed]
+
+        def residualFor(u):
+            x[packed] = self._radiiFromLog(u)
+            return self._angleSums(self.corners, x)[packed] - aim
+
+        u = self._logRadii(x[packed])
+        residual = residualFor(u)
+        loopIdx = 0
+        while loopIdx < num_passes and np.mean(np.abs(residual)) > tolerance:
+            start = time.perf_counter()
+            previous = x[packed]
+            step = spsolve(self.jacobian(x), -residual)
+            norm = np.linalg.norm(residual)
+            t = 1.0
+            while True:
+                trialResidual = residualFor(u + t * step)
+                if np.linalg.norm(trialResidual) <= (1.0 - 1e-4 * t) * norm:
+                    u, residual = u + t * step, trialResidual
+                    break
+                if t < _MIN_STEP:
+                    # No progress along the Newton direction, take an iterative sweep instead
+                    residualFor(u)
+                    self.sweep(x)
+                    u = self._logRadii(x[packed])
+                    residual = residualFor(u)
+                    break
+                t *= 0.5
+            loopIdx += 1
+            errors = np.abs(residual)
+            yield PassStats(loopIdx, float(np.mean(errors)), float(np.max(errors)),
+                            int(np.count_nonzero(x[packed] != previous)), time.perf_counter() - start)
+
+    def newton(self,
+               x: np.ndarray,
+               num_passes: int = 100,
+               tolerance: float = 3e-10,
+               callback: Optional[Callable[[PassStats], bool]] = None) -> int:
+        """Newton's method on the log-radii until the average error falls below tolerance.
+
+        Args:
+            x: The x-radii, updated in place. Boundary entries are left as they are.
+            num_passes: The maximum number of Newton steps.
+            tolerance: The average error to reach.
+            callback: Called with a packingMonitor.PassStats after every step. Returning
+                True stops the packing.
+
+        Returns:
+            The number of Newton steps performed.
+        """
+        return runPasses(self.newtonPasses(x, num_passes, tolerance), callback)
+# END ArrayPacker
+
+def repack(dcel: DCEL,
+           num_passes: int = 1000,
+           tolerance: float = 3e-10,
+           schedule: str = GAUSS_SEIDEL,
+           method: str = ITERATIVE,
+           callback: Optional[Callable[[PassStats], bool]] = None) -> (DCEL, int):
+    """Array version of hypPacker.repack.
+
+    Makes the same assumptions on dcel: v.data is [z, r] with r the x-radius (negative for
+    boundary circles) and v.aim is 2*math.pi for interior vertices and -1 for boundary vertices.
+
+    Args:
+        dcel: The input DCEL, a triangulated disk.
+        num_passes: maximum number of sweeps (or Newton steps) to perform. Default is 1000.
+        tolerance: the tolerance for which the average error must fall below.
+        schedule: JACOBI or GAUSS_SEIDEL (the default).
+        method: ITERATIVE (the default) for uniform neighbor sweeps or NEWTON.
+        callback: Called with a packingMonitor.PassStats after every sweep (or Newton step).
+            Returning True stops the packing.
+
+    Raises:
+        PackingError if there are no vertices to repack.
+
+    Returns:
+        (dcel, loopCount) where dcel holds the new radii in v.data[1] and loopCount is the
+        number of sweeps (or Newton steps) performed.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown packing method {method}.")
+    corners = PackingCorners.fromDCEL(dcel)
+    packer = ArrayPacker(corners, [v.aim for v in dcel.verts], schedule)
+    x = np.array([v.data[1] for v in dcel.verts], dtype = float)
+
+    if method == NEWTON:
+        loopIdx = packer.newton(x, num_passes, tolerance, callback)
+    else:
+        loopIdx = packer.repack(x, num_passes, tolerance, callback)
+
+    sums = angleSums(corners, x)
+    for i, v in enumerate(dcel.verts):
+        v.data[1] = float(x[i])
+        if v.aim > 0:
+            v.angleSum = float(sums[i])
+            v.angleSumError = v.angleSum - v.aim
+
+    return dcel, loopIdx
+
+def maximalPacking(diskDcel: DCEL,
+                   num_passes: int = 1000,
+                   tolerance: float = 3e-10,
+                   centerDartIdx: int = -1,
+                   placeCircles: bool = True,
+                   schedule: str = GAUSS_SEIDEL,
+                   method: str = ITERATIVE,
+                   averagePlacements: bool = False,
+                   callback: Optional[Callable[[PassStats], bool]] = None) -> (DCEL, int):
+    """Computes a hyperbolic maximal packing of the given DCEL.
+
+    A drop in replacement for hypPacker.maximalPacking that computes the radii with the
+    array engine and lays out the circles with packingLayout.layoutPacking, which also
+    records the largest placement error as dcel.maxPlacementError.
+
+    Args:
+        diskDcel: The input DCEL. Should be a triangulated disk with all boundary vertices
+            incident to the outerFace.
+        num_passes: maximum number of sweeps to perform. Default is 1000.
+        tolerance: the tolerance for which the average angle sum error must fall below.
+        centerDartIdx: The index of the dart to lay out from the origin (see
+            hypPacker._place_circles), -1 to pick one.
+        placeCircles: If False only the radii are computed.
+        schedule: JACOBI or GAUSS_SEIDEL (the default).
+        method: ITERATIVE (the default) or NEWTON.
+        averagePlacements: If True circles placed by several triangles at once are put at
+            the average of those placements (see packingLayout.layoutCircles).
+        callback: Called with a packingMonitor.PassStats after every sweep (or Newton step).
+            Returning True stops the packing.
+
+    Returns:
+        A tuple (dcel, loopCount) where dcel is a new DCEL structure where each vertex
+        stores a CircleH2 as its .data object (or [z, r] if placeCircles is False) and
+        loopCount is the number of sweeps (or Newton steps) performed.
+    """
+    dcel = _labeledDuplicate(diskDcel)
+
+    _, loopIdx = repack(dcel, num_passes, tolerance, schedule, method, callback)
+
+    if placeCircles:
+        _layoutCircles(dcel, centerDartIdx, averagePlacements)
+
+    return dcel, loopIdx
+
+def warmStartPacking(diskDcel: DCEL,
+                     previous,
+                     changed = None,
+                     num_passes: int = 1000,
+                     tolerance: float = 3e-10,
+                     centerDartIdx: int = -1,
+                     placeCircles: bool = True,
+                     schedule: str = GAUSS_SEIDEL,
+                     method: str = ITERATIVE,
+                     averagePlacements: bool = False) -> (DCEL, int):
+    """Computes a hyperbolic maximal packing of diskDcel starting from a previous packing.
+
+    Meant for packing again after a local edit (subdividing some tiles, flipping some
+    edges, ...). Interior vertices keep their previous radii and only a growing neighborhood
+    of the changed vertices is repacked (see localRepack), so the work is proportional to
+    the size of the edit rather than the size of diskDcel.
+
+    Args:
+        diskDcel: The input DCEL. Should be a triangulated disk with all boundary vertices
+            incident to the outerFace.
+        previous: The previous labels. Either a packing DCEL returned by maximalPacking (or
+            warmStartPacking) whose vertex i corresponds to vertex i of diskDcel, a sequence of
+            x-radii indexed like diskDcel.verts, or a dict from vertex index to x-radius.
+            Missing entries and None mean the vertex has no previous radius.
+        changed: The indices of the vertices whose neighborhoods changed. If None these are the
+            interior vertices without a previous radius and, when previous is a DCEL, the
+            vertices whose neighbors differ from those in previous.
+        num_passes: maximum total number of sweeps (or Newton steps) to perform.
+        tolerance: the tolerance for which the average angle sum error must fall below.
+        centerDartIdx: The index of the dart to lay out from the origin, -1 to pick one.
+        placeCircles: If False only the radii are computed.
+        schedule: JACOBI or GAUSS_SEIDEL (the default).
+        method: ITERATIVE (the default) or NEWTON.
+        averagePlacements: Passed on to the layout, see maximalPacking.
+
+    Returns:
+        A tuple (dcel, loopCount) like maximalPacking.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown packing method {method}.")
+    dcel = _labeledDuplicate(diskDcel)
+    numVerts = len(dcel.verts)
+
+    if isinstance(previous, DCEL):
+        oldRadii = [_xRadiusOf(v.data) for v in previous.verts]
+    elif isinstance(previous, dict):
+        oldRadii = [previous.get(i) for i in range(numVerts)]
+    else:
+        oldRadii = list(previous)
+    oldRadii = oldRadii[:numVerts] + [None] * (numVerts - len(oldRadii))
+
+    seeded = np.zeros(numVerts, dtype = bool)
+    for i, v in enumerate(dcel.verts):
+        if v.aim > 0 and oldRadii[i] != None and oldRadii[i] > 0:
+            v.data[1] = oldRadii[i]
+            seeded[i] = True
+
+    adcel = ArrayDCEL.fromDCEL(dcel)
+    corners = PackingCorners.fromArrayDCEL(adcel)
+    aim = np.array([v.aim for v in dcel.verts], dtype = float)
+    x = np.array([v.data[1] for v in dcel.verts], dtype = float)
+
+    if changed is None:
+        changedMask = (aim > 0) & ~seeded
+        if isinstance(previous, DCEL):
+            changedMask[_neighborsChanged(adcel, ArrayDCEL.fromDCEL(previous))] = True
+        changed = np.flatnonzero(changedMask)
+
+    loopIdx = localRepack(corners, x, aim, changed, num_passes, tolerance, schedule, method)
+
+    sums = angleSums(corners, x)
+    for i, v in enumerate(dcel.verts):
+        v.data[1] = float(x[i])
+        if v.aim > 0:
+            v.angleSum = float(sums[i])
+            v.angleSumError = v.angleSum - v.aim
+
+    if placeCircles:
+        _layoutCircles(dcel, centerDartIdx, averagePlacements)
+
+    return dcel, loopIdx
+
+def localRepack(corners: PackingCorners,
+                x: np.ndarray,
+                aim: np.ndarray,
+                changed,
+                num_passes: int = 1000,
+                tolerance: float = 3e-10,
+                schedule: str = GAUSS_SEIDEL,
+                method: str = ITERATIVE) -> int:
+    """Repacks a growing neighborhood of the changed vertices, in place.
+
+    The changed vertices and their neighbors are repacked with all other radii held fixed.
+    If the vertices just outside the repacked region are then off by more than tolerance on
+    average the region is grown (by 1, 2, 4, ... rings of neighbors) and repacked again,
+    until the error outside is small or the region covers all interior vertices.
+
+    Args:
+        corners: The corners of the triangulation.
+        x: The x-radii, updated in place.
+        aim: The target angle sums, negative for boundary vertices.
+        changed: The indices of the vertices to start from.
+        num_passes: maximum total number of sweeps (or Newton steps) to perform.
+        tolerance: the tolerance for which the average error must fall below.
+        schedule: JACOBI or GAUSS_SEIDEL (the default).
+        method: ITERATIVE (the default) or NEWTON.
+
+    Returns:
+        The total number of sweeps (or Newton steps) performed.
+    """
+    interior = aim > 0
+    u, w = corners.neighborPairs()
+
+    def grow(mask):
+        grown = mask.copy()
+        grown[w[mask[u]]] = True
+        return grown & interior
+
+    active = np.zeros(corners.numVerts, dtype = bool)
+    active[np.asarray(changed, dtype = np.int64)] = True
+    active &= interior
+    if not active.any():
+        return 0
+
+    loopIdx = 0
+    rings = 1
+    while True:
+        for _ in range(rings):
+            active = grow(active)
+        packer = ArrayPacker(corners.subset(active), np.where(active, aim, -1.0), schedule)
+        if method == NEWTON:
+            loopIdx += packer.newton(x, num_passes - loopIdx, tolerance)
+        else:
+            loopIdx += packer.repack(x, num_passes - loopIdx, tolerance)
+
+        frontier = grow(active) & ~active
+        if not frontier.any() or loopIdx >= num_passes:
+            break
+        sums = angleSums(corners.subset(frontier), x)
+        if np.mean(np.abs(sums[frontier] - aim[frontier])) <= tolerance:
+            break
+        rings *= 2
+    return loopIdx
+
+def _labeledDuplicate(diskDcel: DCEL) -> DCEL:
+    # A duplicate of diskDcel labeled for packing as in hypPacker.maximalPacking
+    TWO_PI = 2.0 * math.pi
+    dcel = diskDcel.duplicate(
+                vdata_transform = (lambda v : [ExtendedComplex(0,1), 1]),
+                edata_transform = (lambda e : None),
+                fdata_transform = (lambda f : None)
+             )
+
+    bdryVerts = set(dcel.outerFace.vertices())
+
+    for v in dcel.verts:
+        v.data = [ExtendedComplex.ZERO, 0.5]
+        v.aim = TWO_PI
+    for b in bdryVerts:
+        b.data = [ExtendedComplex.ZERO, -5]
+        b.aim = -1.0
+    return dcel
+
+def _layoutCircles(dcel: DCEL, centerDartIdx: int, average: bool = False) -> None:
+    # Places the circles and converts the [z, r] labels to CircleH2s
+    from .packingLayout import layoutPacking
+    layoutPacking(dcel, centerDartIdx, average)
+
+def _xRadiusOf(data):
+    if data is None:
+        return None
+    return data.xRadius if isinstance(data, CircleH2) else data[1]
+
+def _neighborsChanged(adcel: ArrayDCEL, previous: ArrayDCEL) -> np.ndarray:
+    # The indices of the vertices of adcel whose neighbor indices differ from those of the
+    # vertex with the same index in previous.
+    base = max(adcel.numVerts, previous.numVerts)
+    def edgeKeys(a):
+        return a.dart_origin.astype(np.int64) * base + a.dart_origin[a.dart_next]
+    differing = np.setxor1d(edgeKeys(adcel), edgeKeys(previous))
+    verts = np.unique(differing // base)
+    return verts[verts < adcel.numVerts]
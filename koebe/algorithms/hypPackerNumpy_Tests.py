@@ -0,0 +1,124 @@
+import unittest
+import math
+import random
+
+import numpy as np
+
+from ..geometries.hyperbolic2 import CircleH2
+from ._testMeshes import sphereDisk
+from .packingArrays import PackingCorners, independentSets
+from . import hypPacker, hypPackerComplex
+from .hypPacker import _cosFaceAngle, _angleSumFor
+from .hypPackerNumpy import (cosFaceAngles, cornerAngleDerivatives, angleSums, maximalPacking,
+                             warmStartPacking, JACOBI, GAUSS_SEIDEL, NEWTON)
+
+class TestHypPackerNumpy(unittest.TestCase):
+
+    def test_cosFaceAngles(self):
+        values = [-5.0, -0.5, 0.0, 1e-6, 0.1, 0.5, 0.9, 0.999999]
+        triples = [(x1, x2, x3) for x1 in values for x2 in values for x3 in values]
+        x1, x2, x3 = (np.array(column) for column in zip(*triples))
+        expected = [_cosFaceAngle(*t) for t in triples]
+        np.testing.assert_allclose(cosFaceAngles(x1, x2, x3), expected, rtol = 0, atol = 1e-12)
+
+    def test_angleSums(self):
+        dcel = sphereDisk(60)
+        rng = random.Random(3)
+        bdry = set(dcel.outerFace.vertices())
+        for v in dcel.verts:
+            v.data = [None, -1.0 if v in bdry else rng.uniform(0.05, 0.95)]
+        x = np.array([v.data[1] for v in dcel.verts])
+        corners = PackingCorners.fromDCEL(dcel)
+        self.assertEqual(corners.numCorners, 3 * (len(dcel.faces) - 1))
+        sums = angleSums(corners, x)
+        for i, v in enumerate(dcel.verts):
+            if not v in bdry:
+                self.assertAlmostEqual(sums[i], _angleSumFor(v), places = 12)
+
+    def test_independentSets(self):
+        dcel = sphereDisk(100)
+        corners = PackingCorners.fromDCEL(dcel)
+        verts = np.arange(len(dcel.verts))
+        sets = independentSets(corners, verts)
+        self.assertEqual(sorted(np.concatenate(sets).tolist()), verts.tolist())
+        color = np.empty(len(verts), dtype = int)
+        for c, s in enumerate(sets):
+            color[s] = c
+        u, w = corners.neighborPairs()
+        self.assertTrue(np.all(color[u] != color[w]))
+
+    def test_schedulesConverge(self):
+        dcel = sphereDisk(120)
+        radii = {}
+        for schedule in (JACOBI, GAUSS_SEIDEL):
+            packing, passes = maximalPacking(dcel, num_passes = 5000, tolerance = 1e-11,
+                                             placeCircles = False, schedule = schedule)
+            self.assertLess(passes, 5000)
+            interior = [v for v in packing.verts if v.aim > 0]
+            self.assertLess(max(abs(v.angleSum - v.aim) for v in interior), 1e-9)
+            self.assertTrue(all(v.data[1] == -5 for v in packing.verts if v.aim < 0))
+            radii[schedule] = np.array([v.data[1] for v in packing.verts])
+        np.testing.assert_allclose(radii[JACOBI], radii[GAUSS_SEIDEL], rtol = 0, atol = 1e-9)
+
+    def test_placeCircles(self):
+        dcel = sphereDisk(80)
+        packing, _ = maximalPacking(dcel)
+        self.assertEqual(len(packing.verts), len(dcel.verts))
+        self.assertTrue(all(isinstance(v.data, CircleH2) for v in packing.verts))
+
+    def test_cornerAngleDerivatives(self):
+        rng = np.random.default_rng(5)
+        r = rng.uniform(0.05, 4.0, (3, 40))
+        r[1, :8] = np.inf
+        r[2, 4:12] = np.inf
+        def angles(r):
+            x = np.where(np.isinf(r), -1.0, -np.expm1(-2.0 * r))
+            return np.arccos(cosFaceAngles(*x))
+        derivatives = cornerAngleDerivatives(*np.where(np.isinf(r), -1.0, -np.expm1(-2.0 * r)))
+        h = 1e-6
+        for k in range(3):
+            up, down = r.copy(), r.copy()
+            up[k] *= math.exp(h)
+            down[k] *= math.exp(-h)
+            difference = np.nan_to_num((angles(up) - angles(down)) / (2.0 * h))
+            np.testing.assert_allclose(derivatives[k], difference, rtol = 0, atol = 1e-7)
+
+    def test_newton(self):
+        dcel = sphereDisk(120)
+        iterative, _ = maximalPacking(dcel, num_passes = 5000, tolerance = 1e-11, placeCircles = False)
+        newton, steps = maximalPacking(dcel, tolerance = 1e-11, placeCircles = False, method = NEWTON)
+        self.assertLess(steps, 20)
+        np.testing.assert_allclose([v.data[1] for v in newton.verts],
+                                   [v.data[1] for v in iterative.verts], rtol = 0, atol = 1e-9)
+
+    def test_newtonMethodOfMaximalPacking(self):
+        dcel = sphereDisk(80)
+        for module in (hypPacker, hypPackerComplex):
+            packing, _ = module.maximalPacking(dcel, method = "newton")
+            self.assertTrue(all(isinstance(v.data, CircleH2) for v in packing.verts))
+            with self.assertRaises(ValueError):
+                module.maximalPacking(dcel, method = "secant")
+
+    def test_warmStartPacking(self):
+        dcel = sphereDisk(150)
+        packing, _ = maximalPacking(dcel, num_passes = 5000, tolerance = 1e-11)
+
+        _, passes = warmStartPacking(dcel, packing, tolerance = 1e-11, placeCircles = False)
+        self.assertEqual(passes, 0)
+
+        edited = dcel.duplicate()
+        bdry = set(edited.outerFace.vertices())
+        interiorFaces = [f for f in edited.faces
+                         if f != edited.outerFace and bdry.isdisjoint(f.vertices())]
+        interiorFaces[0].starTriangulate()
+        for method in ("iterative", NEWTON):
+            warm, _ = warmStartPacking(edited, packing, num_passes = 5000, tolerance = 1e-11,
+                                       placeCircles = False, method = method)
+            cold, _ = maximalPacking(edited, num_passes = 5000, tolerance = 1e-11,
+                                     placeCircles = False, method = method)
+            self.assertEqual(len(warm.verts), len(dcel.verts) + 1)
+            np.testing.assert_allclose([v.data[1] for v in warm.verts],
+                                       [v.data[1] for v in cold.verts], rtol = 0, atol = 1e-8)
+
+if __name__ == '__main__':
+    unittest.main()
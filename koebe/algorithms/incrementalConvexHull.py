@@ -1,34 +1,55 @@
 from ..datastructures.dcel import DCEL, Vertex, Dart, Face, Edge
 from ..geometries.commonOps import determinant4
 from ..geometries.euclidean3 import PointE3
+from ..geometries.batch import orientation4Batch, orientation4Signs, isPlainFloat
+from ..geometries.robust import robustDeterminant4, robustOrientationDiskS2
 
 import math
 from random import uniform
 
+import numpy as np
+
 #
 # Compute the 3D convex hull of a list of points. This method also needs
 # an orientation test for tetrahedra of the given point type. A point is
 # considered inside the convex hull if it has positive orientation with respect
 # to each triangle of teh hull. 
 #
-# This code currently assumes no four points are collinear (i.e. for no four
-# points) does orientation(p1, p2, p3, p4) return 0. 
-# TODO Remove the need for this assumption
+# By default this code assumes no four points are coplanar (i.e. for no four
+# points does orientation(p1, p2, p3, p4) return 0); a point on a face or edge
+# of the current hull is dropped. With keepCoplanar = True and one of the exact 
+# robust orientation functions (robustOrientationPointE3, robustOrientationPointOP3, 
+# robustOrientationDiskS2) every input point on the boundary of the hull becomes 
+# a hull vertex, so degenerate input needs no perturbation. Flat parts of the 
+# hull are then triangulated by more than one face. The points must be distinct 
+# and the first four must not be coplanar. 
 #
 # Parameters:
 # * points: PointT - The list of points in some 3D point type
 # * orientation: (PointT, PointT, PointT, PointT) -> float an orientation function
+# * useBatch: bool - If True (the default) and orientation is one of the built in
+#   predicates and the point coordinates are plain floats, the visible faces are
+#   found with one vectorized predicate call per point (see FacetArrays).
+# * keepCoplanar: bool - If True, points on the boundary of the hull are kept as
+#   hull vertices. Use with an exact orientation function. 
 #
 # Returns: the convex hull of the points as a DCEL
-def incrConvexHull(points, orientation):
+#
+# See randomizedConvexHull.randomizedConvexHull for an expected O(n log n) 
+# version of this algorithm for large inputs. 
+def incrConvexHull(points, orientation, useBatch = True, keepCoplanar = False):
     if len(points) < 2:
         return DCEL()
     elif len(points) == 3:
         return incrConvexHullOfThreePoints(points[0], points[1], points[2])
     else:
         ch = incrConvexHullOfFourPoints(points[0], points[1], points[2], points[3], orientation)
+        coordinatesOf = batchCoordinates(points, orientation) if useBatch else None
+        facets = (FacetArrays(ch, coordinatesOf, exact = orientation in ROBUST_ORIENTATIONS) 
+                  if coordinatesOf != None else None)
         for point in points[4:]:
-            addPoint(ch, point, orientation)
+            addPoint(ch, point, orientation, facets, keepCoplanar)
+        ch.compact()
         return ch
 
 #### SOME CONVEX HULL GENERATORS
@@ -53,8 +74,9 @@ def randomConvexHullE3(numPoints):
                       1.01 * math.cos(phi))
               for (theta, phi) in samples]
     
-    # Compute the convex hull of the samples
-    return incrConvexHull(points, orientationPointE3)
+    # Compute the convex hull of the samples with the randomized O(n log n) engine
+    from .randomizedConvexHull import randomizedConvexHull
+    return randomizedConvexHull(points, orientationPointE3)
 
 def randomConvexHullE3WithHighDegreeVertex(numPoints, highDegree):
     
@@ -91,8 +113,9 @@ def randomConvexHullE3WithHighDegreeVertex(numPoints, highDegree):
                           z)
                   for (theta, z) in samplesOnEq]
     
-    return incrConvexHull(points + pointsOnEq + [PointE3(0, 0, -1.1)], 
-                          orientationPointE3)
+    from .randomizedConvexHull import randomizedConvexHull
+    return randomizedConvexHull(points + pointsOnEq + [PointE3(0, 0, -1.1)], 
+                                orientationPointE3)
 
 def tetrahedron(size = 1):
     points = [PointE3(size, -size / math.sqrt(3), -size / math.sqrt(6)), 
@@ -108,11 +131,52 @@ def isVisible(face, p, orientation):
     p1, p2, p3 = [c.origin.data for c in corners[0:3]]
     return orientation(p1, p2, p3, p) < 0.0
 
-def addPoint(ch, p, orientation):
+def isCoplanar(face, p, orientation):
+    corners = face.darts()
+    p1, p2, p3 = [c.origin.data for c in corners[0:3]]
+    return orientation(p1, p2, p3, p) == 0
+
+def facesContaining(ch, faces, p, orientation):
+    """Returns the set of the faces whose closed triangle contains p. 
+    
+    Args:
+        ch: The convex hull DCEL. 
+        faces: Faces of ch that are coplanar with p. 
+        p: The point. 
+        orientation: The orientation function of the hull. 
+    
+    Returns:
+        One face if p is inside a triangle, the faces sharing an edge or vertex if p is
+        on it. 
+    """
+    containing = set()
+    for face in faces:
+        a, b, c = [d.origin.data for d in face.darts()[0:3]]
+        # The plane through an edge and a hull vertex off the plane of the face cuts the
+        # face's plane along the line of that edge. 
+        apex = next(v.data for v in ch.verts if orientation(a, b, c, v.data) != 0)
+        if all(orientation(u, w, apex, p) * orientation(u, w, apex, x) >= 0
+               for u, w, x in ((a, b, c), (b, c, a), (c, a, b))):
+            containing.add(face)
+    return containing
+
+def addPoint(ch, p, orientation, facets = None, keepCoplanar = False):
     # First let's filter the faces to obtain a set of all faces that are visible from the
-    # insertion point p
-    visibleFaces = set([f for f in ch.faces if isVisible(f, p, orientation)])
-    # visibleFaces = set(filter(lambda f: isVisible(f, p, orientation), ch.faces))
+    # insertion point p. If the faces are also kept in a FacetArrays this is a single
+    # batch predicate call. 
+    if facets == None:
+        visibleFaces = set([f for f in ch.faces if isVisible(f, p, orientation)])
+    else:
+        visibleFaces = facets.visibleFrom(p)
+    
+    # A point that sees no face is inside the hull or on its boundary. To keep a 
+    # boundary point, the faces containing it are replaced by a cone to it instead. 
+    if len(visibleFaces) == 0 and keepCoplanar:
+        if facets == None:
+            coplanarFaces = [f for f in ch.faces if isCoplanar(f, p, orientation)]
+        else:
+            coplanarFaces = facets.coplanarWith(p)
+        visibleFaces = facesContaining(ch, coplanarFaces, p, orientation)
     
     # Next, check if there are any visible faces, because if there are 
     # not, then this point is already inside the convex hull, so there 
@@ -120,42 +184,165 @@ def addPoint(ch, p, orientation):
     if len(visibleFaces) == 0:
         return
     
-    # Otherwise, we need to get the set of shadowFaces as well as the 
-    # darts that are visible and in shadow.
-    shadowFaces  = set([f for f in ch.faces if not isVisible(f, p, orientation)])
-    visibleDarts = set([d for d in ch.darts if d.face in visibleFaces])
-    shadowDarts = set([d for d in ch.darts if d.face in shadowFaces])
+    shadowBoundaryDarts = removeVisibleRegion(ch, visibleFaces)
+    _, newFaces = coneToHorizon(ch, p, shadowBoundaryDarts)
+    
+    if facets != None:
+        for face in visibleFaces:
+            facets.remove(face)
+        for face in newFaces:
+            facets.add(face)
 
-    # shadowFaces  = set(filter(lambda f: not isVisible(f, p, orientation), ch.faces))
-    # visibleDarts = set(filter(lambda d: d.face in visibleFaces, ch.darts))
-    # shadowDarts  = set(filter(lambda d: d.face in shadowFaces, ch.darts))
+class FacetArrays:
+    """The corners of the faces of a triangulated hull packed into NumPy arrays. 
     
-    # Retain only faces that are not visible to point p
-    ch.faces = [face for face in ch.faces if not face in visibleFaces]
+    This lets the faces visible from a point be found with one call to 
+    geometries.batch.orientation4Batch instead of one orientation call per face. Faces 
+    are kept in slots; the slots of removed faces are reused by added faces. 
     
-    # Retain only vertices incident to a shadow face: 
-    ch.verts = [vertex for vertex in ch.verts
-                       if not shadowFaces.isdisjoint(vertex.faces())]
+    Attributes:
+        coordinatesOf: Maps a vertex .data to its homogeneous coordinates 
+            (see BATCH_COORDINATES). 
+        exact: If True, the signs are computed exactly with orientation4Signs.
+    """
     
-    # Remove all visible darts
-    ch.darts = [dart for dart in ch.darts if not dart in visibleDarts]
+    def __init__(self, ch, coordinatesOf, exact = False):
+        """Packs the faces of ch.
+        
+        Args:
+            ch: A triangulated DCEL.
+            coordinatesOf: Maps a vertex .data to its homogeneous coordinates.
+            exact: If True, use the exact orientation4Signs instead of orientation4Batch.
+        """
+        self.coordinatesOf = coordinatesOf
+        self.exact = exact
+        self._corners = np.zeros((max(16, 2 * len(ch.faces)), 3, 4))
+        self._alive = np.zeros(len(self._corners), dtype = bool)
+        self._faces = []
+        self._slotOf = {}
+        self._freeSlots = []
+        for face in ch.faces:
+            self.add(face)
+    
+    def add(self, face):
+        if self._freeSlots:
+            slot = self._freeSlots.pop()
+            self._faces[slot] = face
+        else:
+            slot = len(self._faces)
+            if slot == len(self._corners):
+                self._corners = np.concatenate([self._corners, np.zeros_like(self._corners)])
+                self._alive = np.concatenate([self._alive, np.zeros_like(self._alive)])
+            self._faces.append(face)
+        self._corners[slot] = faceCorners(face, self.coordinatesOf)
+        self._alive[slot] = True
+        self._slotOf[face] = slot
+    
+    def remove(self, face):
+        slot = self._slotOf.pop(face)
+        self._faces[slot] = None
+        self._alive[slot] = False
+        self._freeSlots.append(slot)
+    
+    def _orientations(self, p):
+        n = len(self._faces)
+        corners = self._corners[:n]
+        batchOrientation = orientation4Signs if self.exact else orientation4Batch
+        return batchOrientation(corners[:, 0], corners[:, 1], corners[:, 2], 
+                                self.coordinatesOf(p))
+    
+    def visibleFrom(self, p):
+        """Returns the set of faces visible from p, the batch version of isVisible."""
+        hits = (self._orientations(p) < 0) & self._alive[:len(self._faces)]
+        return set(self._faces[slot] for slot in np.flatnonzero(hits))
+    
+    def coplanarWith(self, p):
+        """Returns the list of faces coplanar with p, the batch version of isCoplanar."""
+        hits = (self._orientations(p) == 0) & self._alive[:len(self._faces)]
+        return [self._faces[slot] for slot in np.flatnonzero(hits)]
+# END FacetArrays
+
+def faceCorners(face, coordinatesOf):
+    """The homogeneous coordinates of the first three corners of face (the corners used
+    by isVisible) as a 3x4 array."""
+    return np.array([coordinatesOf(d.origin.data) for d in face.darts()[0:3]], dtype = float)
+
+def batchCoordinates(points, orientation):
+    """Returns the function mapping points to the homogeneous coordinates used by the batch
+    version of orientation, or None if there is no batch version or if the coordinates of
+    some point are not plain floats (e.g. exact or symbolic numbers)."""
+    coordinatesOf = BATCH_COORDINATES.get(orientation)
+    if coordinatesOf == None:
+        return None
+    for p in points:
+        if not all(isPlainFloat(x) for x in coordinatesOf(p)):
+            return None
+    return coordinatesOf
+
+def removeVisibleRegion(ch, visibleFaces):
+    """Removes the faces visible from a new point together with the darts, edges and
+    vertices that are only incident to visible faces. 
+    
+    Args:
+        ch: The convex hull DCEL. 
+        visibleFaces: A non-empty set of the faces of ch that are visible from the new point. 
+    
+    Returns:
+        The shadow boundary darts (the horizon), i.e. each remaining dart whose twin was 
+        a visible dart. 
+    """
+    # We need the darts that are visible and the darts on the 
+    # boundary of the visible region, meaning each shadow dart whose twin is a 
+    # visible dart. Both are found locally from the visible faces, so we never
+    # scan the whole hull here. 
+    visibleDarts = set([d for f in visibleFaces for d in f.darts()])
+    shadowBoundaryDarts = [d.twin for d in visibleDarts if not d.twin.face in visibleFaces]
+    
+    # Retain only vertices incident to a shadow face. Vertices of visible faces 
+    # that are not on the boundary of the visible region are incident to visible
+    # faces only. 
+    boundaryVerts = set([dart.origin for dart in shadowBoundaryDarts])
+    visibleVerts  = set([dart.origin for dart in visibleDarts]) - boundaryVerts
     
     # Remove all visible edges (an edge is visible if both its darts are)
-    ch.edges = [edge for edge in ch.edges
-                     if not (edge.aDart in visibleDarts and 
-                             edge.aDart.twin in visibleDarts)]
+    visibleEdges = set([dart.edge for dart in visibleDarts if dart.twin in visibleDarts])
+    
+    # Removal from the DCEL element stores is O(1) per element. 
+    for face in visibleFaces:
+        ch.faces.remove(face)
+    for vertex in visibleVerts:
+        ch.verts.remove(vertex)
+    for dart in visibleDarts:
+        ch.darts.remove(dart)
+    for edge in visibleEdges:
+        ch.edges.remove(edge)
+    
+    return shadowBoundaryDarts
+
+def coneToHorizon(ch, p, shadowBoundaryDarts):
+    """Adds a vertex for point p and a triangle from p to each horizon dart. 
+    
+    Args:
+        ch: The convex hull DCEL after removeVisibleRegion. 
+        p: The point to add. 
+        shadowBoundaryDarts: The horizon darts returned by removeVisibleRegion. 
     
-    # Next, let's collect the darts that are on the boundary, meaning each shadow dart whose twin is a visible dart.
-    shadowBoundaryDarts = [dart for dart in shadowDarts if dart.twin in visibleDarts]
+    Returns:
+        (v, newFaces) where v is the new Vertex and newFaces[i] is the new triangle
+        incident to the twin of shadowBoundaryDarts[i]. 
+    """
+    shadowBoundarySet = set(shadowBoundaryDarts)
     
     v = Vertex(ch, data = p) # Create the new vertex
     
+    newFaces = []
     for dart in shadowBoundaryDarts:
         a = dart.dest
         b = dart.origin
         c = v
         
         abc = Face(ch)
+        newFaces.append(abc)
         
         eab = dart.edge
         
@@ -169,7 +356,7 @@ def addPoint(ch, p, orientation):
         while True:
             if curDart == None:
                 return None
-            elif curDart.prev in shadowBoundaryDarts:
+            elif curDart.prev in shadowBoundarySet:
                 return curDart.prev
             else:
                 curDart = curDart.prev.twin
@@ -192,6 +379,8 @@ def addPoint(ch, p, orientation):
         
         if curr == start:
             break
+    
+    return v, newFaces
             
 def incrConvexHullOfFourPoints(p1, p2, p3, p4, orientation):
     
@@ -278,3 +467,41 @@ def orientationPointOP3(p1, p2, p3, p4):
 
 def orientationDiskS2(d1, d2, d3, d4):
         return orientationPointOP3(d1.dualPointOP3, d2.dualPointOP3, d3.dualPointOP3, d4.dualPointOP3)
+
+### EXACT VERSIONS OF THE BUILT IN ORIENTATION FUNCTIONS
+# These return the exact sign (-1, 0, or 1) of the orientation, see geometries.robust.
+
+def robustOrientationPointE3(p1, p2, p3, p4):
+    return robustDeterminant4(
+            p1.x, p1.y, p1.z, 1.0,
+            p2.x, p2.y, p2.z, 1.0,
+            p3.x, p3.y, p3.z, 1.0,
+            p4.x, p4.y, p4.z, 1.0
+    )
+
+def robustOrientationPointOP3(p1, p2, p3, p4):
+    return robustDeterminant4(
+            p1.hx, p1.hy, p1.hz, p1.hw,
+            p2.hx, p2.hy, p2.hz, p2.hw,
+            p3.hx, p3.hy, p3.hz, p3.hw,
+            p4.hx, p4.hy, p4.hz, p4.hw
+    )
+
+# robustOrientationDiskS2 is imported from geometries.robust
+
+# The homogeneous coordinates of the 4x4 determinant rows used by each built in
+# orientation function. geometries.batch.orientation4Batch on these coordinates
+# computes exactly the same values as the orientation function.
+BATCH_COORDINATES = {
+    orientationPointE3:        lambda p: (p.x, p.y, p.z, 1.0),
+    orientationPointOP3:       lambda p: (p.hx, p.hy, p.hz, p.hw),
+    orientationDiskS2:         lambda d: (-d.a, -d.b, -d.c, d.d),
+    robustOrientationPointE3:  lambda p: (p.x, p.y, p.z, 1.0),
+    robustOrientationPointOP3: lambda p: (p.hx, p.hy, p.hz, p.hw),
+    robustOrientationDiskS2:   lambda d: (-d.a, -d.b, -d.c, d.d)
+}
+
+# The orientation functions whose batch versions must be exact (orientation4Signs)
+ROBUST_ORIENTATIONS = set([robustOrientationPointE3, 
+                           robustOrientationPointOP3, 
+                           robustOrientationDiskS2])
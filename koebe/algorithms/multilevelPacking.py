@@ -0,0 +1,358 @@
+#
+# Coarse to fine hyperbolic maximal packings of subdivision tilings.
+#
+# A Tiling produced by TilingRules.generateTiling keeps every subdivision level
+# (faceLevels, with the finest level in tiling.faces) and links each tile to the
+# tile it was cut from (tile.parent). Its vertices are never renumbered: the
+# vertices of level k are a prefix of those of level k + 1.
+#
+# Each level is packed after star triangulating its tiles (as in
+# tiling.generateCirclePackingLayout), from coarsest to finest (full multigrid):
+#
+#     1. Level 0 is packed cold.
+#     2. The radii of level k - 1 are prolonged to initial radii of level k
+#        through the parent links (see prolongRadii).
+#     3. Level k is solved with V-cycles of the full approximation scheme:
+#        a few uniform neighbor sweeps, then the smooth part of the remaining
+#        error is corrected on level k - 1 (recursively), then a few more
+#        sweeps. Sweeps alone remove the error between nearby vertices quickly
+#        but need passes proportional to the size of the triangulation to
+#        remove smooth error, which the coarse levels remove cheaply.
+#
+# With method NEWTON step 3 is replaced by Newton's method, which is started
+# from the prolonged radii.
+#
+import math
+
+import numpy as np
+
+from scipy.sparse import coo_matrix
+
+from .packingArrays import PackingCorners
+from .hypPackerNumpy import (ArrayPacker, angleSums, warmStartPacking,
+                             ITERATIVE, NEWTON, METHODS, GAUSS_SEIDEL)
+
+# Passes and tolerance used to solve the coarsest level within a V-cycle
+_COARSEST_PASSES = 1000
+_COARSEST_TOLERANCE = 1e-13
+# The coarse level target angle sums are kept above this in a V-cycle
+_MIN_COARSE_AIM = 0.5 * math.pi
+
+class TilingLevel:
+    """The star triangulation of one level of a Tiling in array form.
+
+    Vertex i < numTileVerts is tiling.verts[i] and vertex numTileVerts + j is the center of
+    the j-th tile of the level (in the order of the level's face list, skipping the outer
+    face). This matches the vertex order of a duplicate of the tiling after
+    tiling.starTriangulateAllFaces.
+
+    Attributes:
+        tiles: The tiles of the level.
+        numTileVerts: The number of vertices of the tiling (of all levels).
+        corners: The PackingCorners of the star triangulation.
+        aim: The target angle sums: 2*pi for interior vertices, -1 for boundary vertices and
+            for tiling vertices that do not appear at this level.
+    """
+
+    def __init__(self, tiles, outerFace, vertIdx: dict, numTileVerts: int):
+        TWO_PI = 2.0 * math.pi
+        self.tiles = [tile for tile in tiles if tile is not outerFace]
+        self.numTileVerts = numTileVerts
+        numVerts = numTileVerts + len(self.tiles)
+
+        origin, dest, third = [], [], []
+        self.tileVerts = []
+        for j, tile in enumerate(self.tiles):
+            c = numTileVerts + j
+            vs = [vertIdx[v] for v in tile.vertices()]
+            self.tileVerts.append(vs)
+            for i in range(len(vs)):
+                a, b = vs[i], vs[(i + 1) % len(vs)]
+                origin += [a, b, c]
+                dest   += [b, c, a]
+                third  += [c, a, b]
+        self.corners = PackingCorners(numVerts, origin, dest, third)
+
+        self.aim = np.full(numVerts, -1.0)
+        self.aim[self.corners.degrees() > 0] = TWO_PI
+        self.aim[[vertIdx[v] for v in outerFace.vertices()]] = -1.0
+
+    @property
+    def numVerts(self) -> int:
+        return self.corners.numVerts
+
+    def initialRadii(self) -> np.ndarray:
+        """The x-radii hypPacker.maximalPacking starts from (0.5 inside, -5 on the boundary)."""
+        return np.where(self.aim > 0, 0.5, -5.0)
+# END TilingLevel
+
+def tilingLevels(tiling) -> list:
+    """Returns the TilingLevels of tiling from coarsest to finest."""
+    vertIdx = dict((v, i) for i, v in enumerate(tiling.verts))
+    numTileVerts = len(vertIdx)
+    levels = [TilingLevel(faces, faces[0], vertIdx, numTileVerts) for faces in tiling.faceLevels]
+    levels.append(TilingLevel(tiling.faces, tiling.outerFace, vertIdx, numTileVerts))
+    return levels
+
+def _hyperbolicRadii(level: TilingLevel, x: np.ndarray) -> np.ndarray:
+    # Hyperbolic radii of the interior vertices, 0 elsewhere
+    return np.where(level.aim > 0, -0.5 * np.log1p(-np.clip(x, None, 1.0 - 1e-16)), 0.0)
+
+def _incidentTileAverages(level: TilingLevel, tileValues: np.ndarray) -> (np.ndarray, np.ndarray):
+    # For each tile vertex, the average of tileValues over its tiles and its number of tiles
+    total = np.zeros(level.numTileVerts)
+    count = np.zeros(level.numTileVerts, dtype = np.int64)
+    for j, vs in enumerate(level.tileVerts):
+        total[vs] += tileValues[j]
+        count[vs] += 1
+    return total / np.maximum(count, 1), count
+
+def prolongRadii(coarse: TilingLevel, fine: TilingLevel, coarseX: np.ndarray) -> np.ndarray:
+    """Prolongs the x-radii of a packing of coarse to initial x-radii for fine.
+
+    Each fine tile center gets the radius of its parent's center, and each fine tile vertex
+    of valence k (number of tiles) gets the average radius of its tiles' centers times the
+    median ratio between these two quantities over the coarse vertices of valence k. All the
+    radii are then scaled by the one factor that zeroes the total angle sum error.
+
+    Args:
+        coarse: A level of a tiling.
+        fine: The next finer level of the same tiling.
+        coarseX: The x-radii of the vertices of coarse.
+
+    Returns:
+        The x-radii of the vertices of fine (-5 on the boundary).
+    """
+    # Work with hyperbolic radii, which scale like euclidean lengths for small circles.
+    coarseR = _hyperbolicRadii(coarse, coarseX)
+    coarseCenterR = coarseR[coarse.numTileVerts:]
+
+    # The ratio of the radius of a tile vertex to those of the centers around it, by valence
+    average, valence = _incidentTileAverages(coarse, coarseCenterR)
+    interior = (coarse.aim[:coarse.numTileVerts] > 0) & (average > 0)
+    ratios = coarseR[:coarse.numTileVerts][interior] / average[interior]
+    defaultRatio = np.median(ratios) if len(ratios) > 0 else 1.0
+    ratioFor = dict((k, np.median(ratios[valence[interior] == k])) 
+                    for k in np.unique(valence[interior]))
+
+    centerOf = dict((tile, j) for j, tile in enumerate(coarse.tiles))
+    fineCenterR = np.array([coarseCenterR[centerOf[tile.parent]] for tile in fine.tiles])
+    average, valence = _incidentTileAverages(fine, fineCenterR)
+    ratio = np.array([ratioFor.get(k, defaultRatio) for k in valence])
+    fineR = np.concatenate([average * ratio, fineCenterR])
+
+    # Choose the common scale that balances the angle sums (they decrease as radii grow)
+    packed = fine.aim > 0
+    def totalError(logScale):
+        x = np.where(packed, -np.expm1(-2.0 * fineR * math.exp(logScale)), -5.0)
+        return np.sum(angleSums(fine.corners, x)[packed] - fine.aim[packed])
+    lo, hi = -10.0, 10.0
+    for _ in range(50):
+        mid = 0.5 * (lo + hi)
+        if totalError(mid) > 0:
+            lo = mid
+        else:
+            hi = mid
+    scale = math.exp(0.5 * (lo + hi))
+    return np.where(packed, -np.expm1(-2.0 * fineR * scale), -5.0)
+
+def prolongationMatrix(coarse: TilingLevel, fine: TilingLevel):
+    """The matrix prolonging log-radius corrections from coarse to fine.
+
+    A fine vertex that is an interior vertex of coarse takes its own correction, a fine tile
+    center takes the correction of the center of its parent, and any other fine tile vertex
+    takes the average correction of the parent centers of its tiles.
+
+    Returns:
+        A scipy.sparse CSR matrix of shape (fine.numVerts, coarse.numVerts).
+    """
+    centerOf = dict((tile, coarse.numTileVerts + j) for j, tile in enumerate(coarse.tiles))
+    parents = [centerOf[tile.parent] for tile in fine.tiles]
+    _, valence = _incidentTileAverages(fine, np.zeros(len(fine.tiles)))
+    kept = coarse.aim[:fine.numTileVerts] > 0
+
+    rows = list(range(fine.numTileVerts, fine.numVerts))
+    cols = list(parents)
+    vals = [1.0] * len(parents)
+    for j, vs in enumerate(fine.tileVerts):
+        for v in vs:
+            if not kept[v]:
+                rows.append(v)
+                cols.append(parents[j])
+                vals.append(1.0 / valence[v])
+    keptVerts = np.flatnonzero(kept).tolist()
+    rows += keptVerts
+    cols += keptVerts
+    vals += [1.0] * len(keptVerts)
+    return coo_matrix((vals, (rows, cols)), shape = (fine.numVerts, coarse.numVerts)).tocsr()
+
+def _logRadii(level: TilingLevel, x: np.ndarray) -> np.ndarray:
+    # The logs of the hyperbolic radii of the interior vertices, 0 elsewhere
+    return np.where(level.aim > 0, np.log(np.maximum(_hyperbolicRadii(level, x), 1e-300)), 0.0)
+
+def _xRadii(level: TilingLevel, u: np.ndarray) -> np.ndarray:
+    # The x-radii for the log-radii u of the interior vertices, -5 elsewhere
+    return np.where(level.aim > 0, -np.expm1(-2.0 * np.exp(u)), -5.0)
+
+class MultilevelPacker:
+    """Full approximation scheme V-cycles over the levels of a tiling.
+
+    Attributes:
+        levels: The TilingLevels from coarsest to finest.
+        transfers: transfers[k] is the prolongationMatrix from level k - 1 to level k.
+        references: references[k] are x-radii of level k that the V-cycles use to move radii
+            between levels (the current solution of level k once it has been solved, and the
+            initial radii of the level being solved).
+        sweeps: The number of sweeps before and after each coarse correction.
+        residualWeight: The weight of the restricted angle sum errors in the coarse problems.
+            Corrections prolonged by the piecewise constant prolongationMatrix are too rough
+            to take the full coarse correction. 0.6 works well for star triangulated tilings.
+    """
+
+    def __init__(self, levels, schedule: str = GAUSS_SEIDEL, sweeps: int = 2,
+                 residualWeight: float = 0.6):
+        self.levels = levels
+        self.transfers = [None] + [prolongationMatrix(levels[k - 1], levels[k])
+                                   for k in range(1, len(levels))]
+        self.references = [None] * len(levels)
+        self.sweeps = sweeps
+        self.residualWeight = residualWeight
+        self._packers = [ArrayPacker(level.corners, level.aim, schedule) for level in levels]
+
+    def _restrict(self, k: int, u: np.ndarray) -> np.ndarray:
+        # The average of the values of u over the fine vertices of level k owned by each
+        # vertex of level k - 1.
+        P = self.transfers[k]
+        u = np.where(self.levels[k].aim > 0, u, 0.0)
+        weights = P.T @ (self.levels[k].aim > 0).astype(float)
+        return (P.T @ u) / np.maximum(weights, 1e-300)
+
+    def vcycle(self, k: int, x: np.ndarray, aim: np.ndarray) -> None:
+        """One V-cycle for level k with target angle sums aim, updating x in place."""
+        level, packer = self.levels[k], self._packers[k]
+        packer.aim = aim
+        if k == 0:
+            packer.repack(x, _COARSEST_PASSES, _COARSEST_TOLERANCE)
+            packer.aim = level.aim
+            return
+        for _ in range(self.sweeps):
+            packer.sweep(x)
+
+        # The coarse problem, shifted so that its solution is the coarse image of x when
+        # x solves level k.
+        coarse, P = self.levels[k - 1], self.transfers[k]
+        interior = level.aim > 0
+        residual = np.where(interior, aim - angleSums(level.corners, x), 0.0)
+        u = _logRadii(level, x)
+        coarseU = (_logRadii(coarse, self.references[k - 1])
+                   + self._restrict(k, u - _logRadii(level, self.references[k])))
+        coarseX = _xRadii(coarse, coarseU)
+        coarseAim = angleSums(coarse.corners, coarseX) + self.residualWeight * (P.T @ residual)
+        coarseAim = np.where(coarse.aim > 0, np.maximum(coarseAim, _MIN_COARSE_AIM), -1.0)
+        self.vcycle(k - 1, coarseX, coarseAim)
+
+        u = u + P @ np.where(coarse.aim > 0, _logRadii(coarse, coarseX) - coarseU, 0.0)
+        x[interior] = _xRadii(level, u)[interior]
+        packer.aim = aim
+        for _ in range(self.sweeps):
+            packer.sweep(x)
+        packer.aim = level.aim
+
+    def solve(self, k: int, x: np.ndarray, num_cycles: int = 100, tolerance: float = 3e-10) -> int:
+        """Runs V-cycles on level k until the average error falls below tolerance.
+
+        Levels below k must have been solved (their references set) and references[k] must
+        hold the radii x started from.
+
+        Returns:
+            The number of V-cycles performed.
+        """
+        packer = self._packers[k]
+        loopIdx = 0
+        while loopIdx < num_cycles and packer.averageError(x) > tolerance:
+            self.vcycle(k, x, self.levels[k].aim)
+            loopIdx += 1
+        return loopIdx
+# END MultilevelPacker
+
+def multilevelRadii(tiling,
+                    num_passes: int = 1000,
+                    tolerance: float = 3e-10,
+                    coarseTolerance: float = 1e-6,
+                    schedule: str = GAUSS_SEIDEL,
+                    method: str = ITERATIVE) -> (np.ndarray, list):
+    """Computes the radii of a maximal packing of the star triangulation of tiling coarse to fine.
+
+    Args:
+        tiling: A Tiling produced by TilingRules.generateTiling.
+        num_passes: maximum number of V-cycles (or Newton steps) per level.
+        tolerance: the tolerance for which the average angle sum error of the finest level
+            must fall below.
+        coarseTolerance: the tolerance to which the coarser levels are solved.
+        schedule: JACOBI or GAUSS_SEIDEL (the default), the sweeps used by the V-cycles.
+        method: ITERATIVE (the default) for V-cycles or NEWTON.
+
+    Returns:
+        A tuple (x, loopCounts) where x holds the x-radii of the vertices of the finest level
+        (in the vertex order of the star triangulated duplicate of tiling, -5 on the
+        boundary) and loopCounts lists the number of V-cycles (or Newton steps) spent on each
+        level.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown packing method {method}.")
+    levels = tilingLevels(tiling)
+    multilevel = MultilevelPacker(levels, schedule) if method == ITERATIVE else None
+
+    loopCounts = []
+    x = levels[0].initialRadii()
+    for k, level in enumerate(levels):
+        if k > 0:
+            x = prolongRadii(levels[k - 1], level, x)
+        levelTolerance = tolerance if k == len(levels) - 1 else max(tolerance, coarseTolerance)
+        if method == NEWTON:
+            loopCounts.append(ArrayPacker(level.corners, level.aim).newton(x, num_passes, levelTolerance))
+        else:
+            multilevel.references[k] = x.copy()
+            loopCounts.append(multilevel.solve(k, x, num_passes, levelTolerance))
+            multilevel.references[k] = x.copy()
+    return x, loopCounts
+
+def multilevelPacking(tiling,
+                      num_passes: int = 1000,
+                      tolerance: float = 3e-10,
+                      coarseTolerance: float = 1e-6,
+                      centerDartIdx: int = -1,
+                      placeCircles: bool = True,
+                      schedule: str = GAUSS_SEIDEL,
+                      method: str = ITERATIVE):
+    """Computes a hyperbolic maximal packing of the star triangulation of tiling coarse to fine.
+
+    Args:
+        tiling: A Tiling produced by TilingRules.generateTiling.
+        num_passes: maximum number of V-cycles (or Newton steps) per level.
+        tolerance: the tolerance for which the average angle sum error of the finest level
+            must fall below.
+        coarseTolerance: the tolerance to which the coarser levels are solved.
+        centerDartIdx: The index of the dart to lay out from the origin, -1 to pick one.
+        placeCircles: If False only the radii are computed.
+        schedule: JACOBI or GAUSS_SEIDEL (the default), the sweeps used by the V-cycles.
+        method: ITERATIVE (the default) for V-cycles or NEWTON.
+
+    Returns:
+        A tuple (packing, duplicate_tiling, loopCounts) where packing is like the result of
+        hypPacker.maximalPacking for the star triangulated duplicate_tiling of tiling, and
+        loopCounts is as in multilevelRadii.
+    """
+    x, loopCounts = multilevelRadii(tiling, num_passes, tolerance, coarseTolerance, schedule, method)
+
+    duplicate_tiling = tiling.duplicate()
+    for face in tuple(duplicate_tiling.faces):
+        if face != duplicate_tiling.outerFace:
+            face.starTriangulate()
+
+    packing, _ = warmStartPacking(duplicate_tiling,
+                                  list(x),
+                                  changed = [],
+                                  centerDartIdx = centerDartIdx,
+                                  placeCircles = placeCircles)
+    return packing, duplicate_tiling, loopCounts
@@ -0,0 +1,51 @@
+import unittest
+
+import numpy as np
+
+from .packingArrays import PackingCorners
+from .hypPackerNumpy import ArrayPacker, maximalPacking, NEWTON
+from ._testMeshes import pentagonTiling, starTriangulated
+from .multilevelPacking import tilingLevels, prolongRadii, multilevelRadii, multilevelPacking
+
+class TestMultilevelPacking(unittest.TestCase):
+
+    def test_finestLevelMatchesStarTriangulation(self):
+        tiling = pentagonTiling(2)
+        levels = tilingLevels(tiling)
+        self.assertEqual(len(levels), 3)
+        corners = PackingCorners.fromDCEL(starTriangulated(tiling))
+        finest = levels[-1].corners
+        self.assertEqual(finest.numVerts, corners.numVerts)
+        self.assertEqual(sorted(zip(finest.origin.tolist(), finest.dest.tolist(), finest.third.tolist())),
+                         sorted(zip(corners.origin.tolist(), corners.dest.tolist(), corners.third.tolist())))
+
+    def test_prolongRadii(self):
+        levels = tilingLevels(pentagonTiling(2))
+        x = levels[1].initialRadii()
+        ArrayPacker(levels[1].corners, levels[1].aim).newton(x)
+        fineX = prolongRadii(levels[1], levels[2], x)
+        interior = levels[2].aim > 0
+        self.assertTrue(np.all((fineX[interior] > 0) & (fineX[interior] < 1)))
+        self.assertTrue(np.all(fineX[~interior] < 0))
+
+    def test_matchesMaximalPacking(self):
+        tiling = pentagonTiling(3)
+        cold, _ = maximalPacking(starTriangulated(tiling), tolerance = 1e-11, placeCircles = False,
+                                 method = NEWTON)
+        expected = [v.data[1] for v in cold.verts if v.aim > 0]
+        for method in ("iterative", NEWTON):
+            x, loopCounts = multilevelRadii(tiling, tolerance = 1e-11, method = method)
+            self.assertEqual(len(loopCounts), 4)
+            self.assertLess(loopCounts[-1], 50)
+            np.testing.assert_allclose([x[i] for i, v in enumerate(cold.verts) if v.aim > 0],
+                                       expected, rtol = 0, atol = 1e-9)
+
+    def test_multilevelPacking(self):
+        tiling = pentagonTiling(2)
+        packing, duplicate, _ = multilevelPacking(tiling)
+        self.assertEqual(len(packing.verts), len(duplicate.verts))
+        interior = [v for v in packing.verts if v.aim > 0]
+        self.assertLess(sum(abs(v.angleSumError) for v in interior) / len(interior), 3e-10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#
+# Flat corner index arrays of a triangulation for vectorized circle packing.
+#
+# A corner is a dart d of an interior (non-outer) triangle, standing for the
+# angle of that triangle at d.origin. Its two other vertices are d.dest and
+# d.prev.origin. The angle sum at a vertex is the sum of the angles at its
+# corners, so once the corners are stored as three vertex index arrays every
+# angle of the triangulation can be computed by one NumPy expression and all
+# angle sums by one np.add.reduceat.
+#
+
+import numpy as np
+
+from ..datastructures.arrayDCEL import ArrayDCEL
+
+class PackingCorners:
+    """The corners of a triangulation sorted by vertex.
+
+    Attributes:
+        numVerts: The number of vertices. Vertex indices are positions in dcel.verts.
+        origin: origin[c] is the vertex at corner c. Sorted, so the corners at each vertex
+            are contiguous.
+        dest: dest[c] is the next vertex of the triangle of corner c.
+        third: third[c] is the remaining vertex of the triangle of corner c.
+        start: The corners at vertex v are start[v]:start[v+1].
+    """
+
+    def __init__(self, numVerts, origin, dest, third):
+        """Sorts the given corners by origin.
+
+        Args:
+            numVerts: The number of vertices.
+            origin, dest, third: Vertex index arrays of the corners (in counterclockwise order
+                around each triangle).
+        """
+        order = np.argsort(origin, kind = "stable")
+        self.numVerts = numVerts
+        self.origin = np.asarray(origin, dtype = np.int32)[order]
+        self.dest   = np.asarray(dest,   dtype = np.int32)[order]
+        self.third  = np.asarray(third,  dtype = np.int32)[order]
+        counts = np.bincount(self.origin, minlength = numVerts)
+        self.start = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self._hasCorners = counts > 0
+
+    @classmethod
+    def fromArrayDCEL(cls, adcel: ArrayDCEL) -> "PackingCorners":
+        """The corners of all faces of adcel except its outer face."""
+        darts = np.flatnonzero(adcel.dart_face != adcel.outer_face)
+        return cls(adcel.numVerts,
+                   adcel.dart_origin[darts],
+                   adcel.dart_origin[adcel.dart_next[darts]],
+                   adcel.dart_origin[adcel.dart_prev[darts]])
+
+    @classmethod
+    def fromDCEL(cls, dcel) -> "PackingCorners":
+        """The corners of all faces of dcel except dcel.outerFace."""
+        return cls.fromArrayDCEL(ArrayDCEL.fromDCEL(dcel))
+
+    @property
+    def numCorners(self) -> int:
+        return len(self.origin)
+
+    def degrees(self) -> np.ndarray:
+        """The number of corners at each vertex (the degree for interior vertices)."""
+        return np.diff(self.start)
+
+    def cornerSums(self, values: np.ndarray) -> np.ndarray:
+        """Sums per-corner values by vertex.
+
+        Args:
+            values: An array with one value per corner.
+
+        Returns:
+            An array of length numVerts. Vertices without corners get 0.
+        """
+        sums = np.zeros(self.numVerts, dtype = np.result_type(values, np.float64))
+        if len(values) > 0:
+            sums[self._hasCorners] = np.add.reduceat(values, self.start[:-1][self._hasCorners])
+        return sums
+
+    def subset(self, verts: np.ndarray) -> "PackingCorners":
+        """The corners at the given vertices only.
+
+        Args:
+            verts: A boolean mask over the vertices or an array of vertex indices.
+
+        Returns:
+            A PackingCorners with the same numVerts holding only the corners whose origin
+            is in verts.
+        """
+        mask = np.zeros(self.numVerts, dtype = bool)
+        mask[verts] = True
+        keep = mask[self.origin]
+        return PackingCorners(self.numVerts, self.origin[keep], self.dest[keep], self.third[keep])
+
+    def neighborPairs(self) -> (np.ndarray, np.ndarray):
+        """Returns (u, w) arrays of the directed edges (corner origin, corner dest)."""
+        return self.origin, self.dest
+# END PackingCorners
+
+def independentSets(corners: PackingCorners, verts: np.ndarray, seed: int = 0) -> list:
+    """Partitions verts into sets of pairwise non-adjacent vertices (a vertex coloring).
+
+    Uses rounds of the Jones-Plassmann rule: an uncolored vertex joins the current set when
+    its random priority beats those of all its uncolored neighbors.
+
+    Args:
+        corners: The corners of the triangulation (for the adjacency).
+        verts: The vertex indices to color.
+        seed: Seed for the random priorities.
+
+    Returns:
+        A list of vertex index arrays.
+    """
+    priority = np.random.default_rng(seed).random(corners.numVerts)
+    uncolored = np.zeros(corners.numVerts, dtype = bool)
+    uncolored[verts] = True
+    u, w = corners.neighborPairs()
+    sets = []
+    while uncolored.any():
+        neighborMax = np.full(corners.numVerts, -1.0)
+        live = uncolored[u] & uncolored[w]
+        np.maximum.at(neighborMax, u[live], priority[w[live]])
+        np.maximum.at(neighborMax, w[live], priority[u[live]])
+        chosen = uncolored & (priority > neighborMax)
+        sets.append(np.flatnonzero(chosen))
+        uncolored &= ~chosen
+    return sets
@@ -0,0 +1,260 @@
+#
+# Numeric backends for the hyperbolic packer in hypPacker.
+#
+# The scalar packing code (angle sums, radius updates and the layout) only
+# needs real arithmetic, a handful of real functions and points of the
+# complex plane with +, -, *, /, abs, conjugate() and .real/.imag. A backend
+# supplies the functions and the point type:
+#
+#     COMPLEX   Python's builtin float and complex (the fastest scalar backend).
+#     EXTENDED  float and ExtendedComplex (what hypPacker has always used).
+#     MPMATH    mpmath mpf and mpc at any precision (requires mpmath).
+#     NUMPY     not a scalar backend: maximalPacking hands the whole packing to
+#               the array engine of hypPackerNumpy and packingLayout.
+#
+# benchmarkBackends packs one DCEL with several backends and reports their
+# running times and accuracies.
+#
+
+import cmath
+import math
+import time
+
+from dataclasses import dataclass
+from typing import List
+
+from ..datastructures.dcel import DCEL
+from ..geometries.extendedComplex import ExtendedComplex
+
+COMPLEX = "complex"
+EXTENDED = "extended"
+MPMATH = "mpmath"
+NUMPY = "numpy"
+
+class ComplexBackend:
+    """Packs with floats and Python's builtin complex numbers."""
+
+    name = COMPLEX
+    vectorized = False
+    okerr = None # How close an angle sum must be to its aim to stop adjusting it, None for hypPacker.OKERR
+
+    sqrt = staticmethod(math.sqrt)
+    acos = staticmethod(math.acos)
+    cos = staticmethod(math.cos)
+    sin = staticmethod(math.sin)
+    exp = staticmethod(math.exp)
+    log = staticmethod(math.log)
+    pi = math.pi
+
+    def real(self, x):
+        """Converts a float to the backend's real type."""
+        return float(x)
+
+    def point(self, re, im = 0.0):
+        """The point re + i im."""
+        return complex(re, im)
+
+    def fromComplex(self, z):
+        """Converts a complex number (or a point of any backend) to a point of this backend."""
+        return complex(z.toComplex()) if isinstance(z, ExtendedComplex) else complex(z)
+
+    def toComplex(self, z) -> complex:
+        return complex(z)
+
+    def mobius(self, z, a, b, c, d):
+        """(a z + b) / (c z + d)"""
+        return (a * z + b) / (c * z + d)
+
+    def arg(self, z):
+        return cmath.phase(z)
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+# END ComplexBackend
+
+class ExtendedComplexBackend(ComplexBackend):
+    """Packs with floats and ExtendedComplex points."""
+
+    name = EXTENDED
+
+    def point(self, re, im = 0.0):
+        return ExtendedComplex(complex(re, im))
+
+    def fromComplex(self, z):
+        return z if isinstance(z, ExtendedComplex) else ExtendedComplex(complex(z))
+
+    def toComplex(self, z) -> complex:
+        return z.toComplex() if isinstance(z, ExtendedComplex) else complex(z)
+
+    def mobius(self, z, a, b, c, d):
+        return z.applyMobius(a, b, c, d)
+
+    def arg(self, z):
+        return z.arg()
+# END ExtendedComplexBackend
+
+class MpmathBackend(ComplexBackend):
+    """Packs with mpmath's mpf and mpc numbers.
+
+    Each backend has its own mpmath context, so its precision does not change mpmath.mp.
+
+    Args:
+        dps: The number of decimal digits of precision. Default is 30.
+
+    Raises:
+        ImportError if mpmath is not installed.
+    """
+
+    name = MPMATH
+
+    def __init__(self, dps: int = 30):
+        import mpmath
+        self.ctx = mpmath.MPContext()
+        self.ctx.dps = dps
+        self.sqrt = self.ctx.sqrt
+        self.acos = self.ctx.acos
+        self.cos = self.ctx.cos
+        self.sin = self.ctx.sin
+        self.exp = self.ctx.exp
+        self.log = self.ctx.log
+        self.pi = +self.ctx.pi
+        self.okerr = self.ctx.mpf(10) ** (5 - dps)
+
+    @property
+    def dps(self) -> int:
+        return self.ctx.dps
+
+    def real(self, x):
+        return self.ctx.mpf(x)
+
+    def point(self, re, im = 0.0):
+        return self.ctx.mpc(re, im)
+
+    def fromComplex(self, z):
+        if isinstance(z, ExtendedComplex):
+            z = z.toComplex()
+        return self.ctx.mpc(z)
+
+    def toComplex(self, z) -> complex:
+        return complex(z)
+
+    def arg(self, z):
+        return self.ctx.arg(z)
+
+    def __repr__(self):
+        return f"MpmathBackend(dps = {self.dps})"
+# END MpmathBackend
+
+class NumpyBackend:
+    """Marks that the array engine of hypPackerNumpy should be used."""
+
+    name = NUMPY
+    vectorized = True
+
+    def __repr__(self):
+        return "NumpyBackend()"
+# END NumpyBackend
+
+def getBackend(backend):
+    """Returns the backend with the given name (COMPLEX, EXTENDED, MPMATH or NUMPY).
+
+    Backend objects are returned unchanged, so an MpmathBackend(dps) of any precision can be
+    passed wherever a backend name is accepted.
+
+    Raises:
+        ValueError if backend is an unknown name.
+        ImportError if backend is MPMATH and mpmath is not installed.
+    """
+    if not isinstance(backend, str):
+        return backend
+    if backend == COMPLEX:
+        return ComplexBackend()
+    elif backend == EXTENDED:
+        return ExtendedComplexBackend()
+    elif backend == MPMATH:
+        return MpmathBackend()
+    elif backend == NUMPY:
+        return NumpyBackend()
+    raise ValueError(f"Unknown packing backend {backend}.")
+
+def availableBackends() -> List[str]:
+    """The names of the backends that can be used here (MPMATH only if mpmath is installed)."""
+    names = [COMPLEX, EXTENDED, NUMPY]
+    try:
+        import mpmath
+        names.append(MPMATH)
+    except ImportError:
+        pass
+    return names
+
+@dataclass
+class BackendBenchmark:
+    """How one backend did in benchmarkBackends.
+
+    Attributes:
+        backend: The backend's name (with its precision for MPMATH).
+        seconds: The wall time of maximalPacking.
+        loopCount: The number of repack iterations performed.
+        maxAngleSumError: The largest angle sum error over the interior vertices.
+        maxCenterDeviation: The largest distance between a circle center and the center of
+            the same circle in the reference packing.
+        maxRadiusDeviation: The largest difference between an x-radius and the reference one.
+    """
+    backend: str
+    seconds: float
+    loopCount: int
+    maxAngleSumError: float
+    maxCenterDeviation: float
+    maxRadiusDeviation: float
+
+def benchmarkBackends(diskDcel: DCEL,
+                      backends = None,
+                      reference = None,
+                      num_passes: int = 1000,
+                      tolerance: float = 3e-10,
+                      method: str = "iterative") -> List[BackendBenchmark]:
+    """Packs diskDcel with several backends and compares their speed and accuracy.
+
+    Args:
+        diskDcel: A triangulated disk (see hypPacker.maximalPacking).
+        backends: The backends (names or backend objects) to compare. Default is COMPLEX,
+            EXTENDED and NUMPY. MPMATH is about fifty times slower than the others.
+        reference: The backend whose packing the others are compared to, for example an
+            MpmathBackend with a small tolerance. Default is the first of backends.
+        num_passes, tolerance, method: Passed on to hypPacker.maximalPacking.
+
+    Returns:
+        A BackendBenchmark for each backend, in the order of backends.
+    """
+    # Imported here since hypPacker builds on this module
+    from .hypPacker import maximalPacking
+
+    backends = [getBackend(b) for b in ((COMPLEX, EXTENDED, NUMPY) if backends is None else backends)]
+    runs = []
+    for backend in backends:
+        start = time.perf_counter()
+        packing, loopCount = maximalPacking(diskDcel, num_passes, tolerance, method = method,
+                                            backend = backend)
+        runs.append((backend, packing, loopCount, time.perf_counter() - start))
+
+    if reference is None:
+        expected = runs[0][1]
+    else:
+        expected, _ = maximalPacking(diskDcel, num_passes, tolerance, method = method,
+                                     backend = getBackend(reference))
+
+    def circles(packing):
+        return [(v.data.center.coord.toComplex(), float(v.data.xRadius)) for v in packing.verts]
+
+    expectedCircles = circles(expected)
+    results = []
+    for backend, packing, loopCount, seconds in runs:
+        found = circles(packing)
+        results.append(BackendBenchmark(
+            backend = repr(backend) if backend.name == MPMATH else backend.name,
+            seconds = seconds,
+            loopCount = loopCount,
+            maxAngleSumError = max(abs(float(v.angleSumError)) for v in packing.verts if v.aim > 0),
+            maxCenterDeviation = max(abs(z - w) for (z, _), (w, _) in zip(found, expectedCircles)),
+            maxRadiusDeviation = max(abs(x - y) for (_, x), (_, y) in zip(found, expectedCircles))))
+    return results
@@ -0,0 +1,73 @@
+import unittest
+
+import numpy as np
+
+from ..geometries.extendedComplex import ExtendedComplex
+from ..geometries.hyperbolic2 import CircleH2
+from . import hypPacker, hypPackerComplex
+from ._testMeshes import sphereDisk
+from .packingBackends import (COMPLEX, EXTENDED, NUMPY, MPMATH, MpmathBackend,
+                              getBackend, benchmarkBackends)
+
+def _circles(packing):
+    return ([v.data.center.coord.toComplex() for v in packing.verts],
+            [v.data.xRadius for v in packing.verts])
+
+class TestPackingBackends(unittest.TestCase):
+
+    def test_getBackend(self):
+        for name in (COMPLEX, EXTENDED, NUMPY, MPMATH):
+            self.assertEqual(getBackend(name).name, name)
+        backend = MpmathBackend(50)
+        self.assertIs(getBackend(backend), backend)
+        with self.assertRaises(ValueError):
+            getBackend("decimal")
+
+    def test_backendsAgree(self):
+        dcel = sphereDisk(40)
+        expectedCenters, expectedRadii = _circles(hypPacker.maximalPacking(dcel, tolerance = 1e-11)[0])
+        for backend in (COMPLEX, NUMPY):
+            packing, _ = hypPacker.maximalPacking(dcel, tolerance = 1e-11, backend = backend)
+            self.assertTrue(all(isinstance(v.data, CircleH2) for v in packing.verts))
+            centers, radii = _circles(packing)
+            np.testing.assert_allclose(centers, expectedCenters, rtol = 0, atol = 1e-7)
+            np.testing.assert_allclose(radii, expectedRadii, rtol = 0, atol = 1e-8)
+        complexCenters, _ = _circles(hypPackerComplex.maximalPacking(dcel, tolerance = 1e-11)[0])
+        np.testing.assert_allclose(complexCenters, expectedCenters, rtol = 0, atol = 1e-12)
+
+    def test_circleConversionsAtOrigin(self):
+        center, xRadius = hypPackerComplex.euclidean_circle_to_hyperbolic(0j, 0.3)
+        self.assertIs(type(center), complex)
+        self.assertEqual(center, 0j)
+        eCenter, eRadius = hypPackerComplex.hyperbolic_circle_to_euclidean(center, xRadius)
+        self.assertIs(type(eCenter), complex)
+        self.assertEqual(eCenter, 0j)
+        self.assertAlmostEqual(eRadius, 0.3, places = 12)
+        center, _ = hypPacker.euclidean_circle_to_hyperbolic(ExtendedComplex.ZERO, 0.3)
+        self.assertIsInstance(center, ExtendedComplex)
+        self.assertEqual(center.toComplex(), 0j)
+
+    def test_mpmath(self):
+        dcel = sphereDisk(12)
+        backend = MpmathBackend(30)
+        labels, _ = hypPacker.maximalPacking(dcel, tolerance = 1e-20, placeCircles = False,
+                                             backend = backend)
+        self.assertLess(max(abs(v.angleSumError) for v in labels.verts if v.aim > 0), 1e-19)
+        self.assertTrue(all(isinstance(v.data[1], type(backend.real(0))) for v in labels.verts))
+        packing, _ = hypPacker.maximalPacking(dcel, tolerance = 1e-20, backend = backend)
+        centers, radii = _circles(packing)
+        expectedCenters, expectedRadii = _circles(
+            hypPacker.maximalPacking(dcel, tolerance = 1e-12, method = "newton")[0])
+        np.testing.assert_allclose(centers, expectedCenters, rtol = 0, atol = 1e-10)
+        np.testing.assert_allclose(radii, expectedRadii, rtol = 0, atol = 1e-10)
+
+    def test_benchmarkBackends(self):
+        results = benchmarkBackends(sphereDisk(20), num_passes = 200)
+        self.assertEqual([r.backend for r in results], [COMPLEX, EXTENDED, NUMPY])
+        self.assertEqual(results[0].maxCenterDeviation, 0.0)
+        for r in results:
+            self.assertGreater(r.seconds, 0.0)
+            self.assertLess(r.maxCenterDeviation, 1e-6)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,250 @@
+#
+# Array based layout of hyperbolic circle packings.
+#
+# Given the x-radii of a packing (see hypPacker), places the circles in the
+# Poincare disk like hypPacker._place_circles, but a whole generation of the
+# breadth first search at a time: every triangle with two placed vertices
+# places its third vertex, all such triangles at once with NumPy complex128
+# arithmetic.
+#
+# A circle c tangent to a placed finite circle a is placed by moving a to the
+# origin with the disk automorphism T_a(z) = (z + a) / (1 + conj(a) z). There
+# the ray to c makes the face angle at a with the ray to the other placed
+# vertex b, and c is at euclidean distance tanh((r_a + r_c) / 2) from the
+# origin, or on the unit circle if c is a horocycle. Triangles whose two
+# placed vertices are both horocycles are left to hypPacker._compute_center.
+#
+
+import math
+
+import numpy as np
+
+from ..datastructures.dcel import DCEL
+from ..datastructures.arrayDCEL import ArrayDCEL
+from ..geometries.extendedComplex import ExtendedComplex
+from ..geometries.hyperbolic2 import PointH2, CircleH2
+from .packingArrays import PackingCorners
+from .hypPackerNumpy import cosFaceAngles
+from .hypPacker import PackingError, _compute_center
+
+def _toOrigin(z: np.ndarray, a: np.ndarray) -> np.ndarray:
+    # The disk automorphism taking a to the origin (the inverse of T_a)
+    return (z - a) / (1.0 - np.conj(a) * z)
+
+def _fromOrigin(z: np.ndarray, a: np.ndarray) -> np.ndarray:
+    # T_a, the disk automorphism taking the origin to a
+    return (z + a) / (1.0 + np.conj(a) * z)
+
+def _hyperbolicRadii(x: np.ndarray) -> np.ndarray:
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        return np.where(x > 0, -0.5 * np.log1p(-np.minimum(x, 1.0)), np.inf)
+
+def thirdCenters(za: np.ndarray,
+                 zb: np.ndarray,
+                 xa: np.ndarray,
+                 xb: np.ndarray,
+                 xc: np.ndarray,
+                 orientation = 1.0) -> (np.ndarray, np.ndarray):
+    """Places the third circle of triangles of tangent circles (a, b, c).
+
+    The circle a must be finite. Horocycles are given by their points of tangency with the
+    unit circle and their (negative) euclidean radii, as stored by hypPacker._place_circles.
+
+    Args:
+        za, zb: The centers of a and b.
+        xa: The x-radii of a (positive).
+        xb, xc: The x-radii of b and c (x <= 0 for horocycles).
+        orientation: 1.0 where (a, b, c) is counterclockwise, -1.0 where it is clockwise.
+
+    Returns:
+        (zc, radc) the centers of the c circles and their radii: xc for finite circles and
+        minus the euclidean radius for horocycles.
+    """
+    alpha = np.arccos(cosFaceAngles(xa, xb, xc))
+    direction = np.exp(1j * (np.angle(_toOrigin(zb, za)) + orientation * alpha))
+    ra = _hyperbolicRadii(xa)
+    rc = _hyperbolicRadii(xc)
+    finite = xc > 0
+    distance = np.where(finite, np.tanh(0.5 * (ra + np.where(finite, rc, 0.0))), 1.0)
+    zc = _fromOrigin(distance * direction, za)
+
+    # A horocycle tangent to the circle of euclidean radius rho at the origin is the circle
+    # of radius (1 - rho) / 2 through direction. Its image under T_a is found through three
+    # of its points.
+    radc = np.array(xc, dtype = float)
+    horo = np.flatnonzero(~finite)
+    if len(horo) > 0:
+        rho = np.tanh(0.5 * ra[horo])
+        h = 0.5 * (1.0 - rho)
+        center = (1.0 - h) * direction[horo]
+        a = za[horo]
+        w1 = _fromOrigin(center - h, a)
+        w2 = _fromOrigin(center + h, a)
+        w3 = _fromOrigin(center + 1j * h, a)
+        radc[horo] = -_circumradius(w1, w2, w3)
+        zc[horo] = zc[horo] / np.abs(zc[horo])
+    return zc, radc
+
+def _circumradius(w1: np.ndarray, w2: np.ndarray, w3: np.ndarray) -> np.ndarray:
+    a, b = w2 - w1, w3 - w1
+    return np.abs(a) * np.abs(b) * np.abs(a - b) / (2.0 * np.abs((np.conj(a) * b).imag))
+
+class PackingLayout:
+    """The placed circles of a packing.
+
+    Attributes:
+        centers: The centers (complex128) of the circles, on the unit circle for horocycles.
+        radii: The x-radii of finite circles and minus the euclidean radii of horocycles.
+        placed: Which vertices have been placed.
+        generations: The number of breadth first generations used.
+    """
+
+    def __init__(self, centers, radii, placed, generations):
+        self.centers = centers
+        self.radii = radii
+        self.placed = placed
+        self.generations = generations
+
+    def placementErrors(self, corners: PackingCorners) -> np.ndarray:
+        """For each corner with a finite origin, how far its third vertex is from where the
+        other two place it."""
+        o, d, t = corners.origin, corners.dest, corners.third
+        use = np.flatnonzero(self.placed[o] & self.placed[d] & self.placed[t] & (self.radii[o] > 0))
+        o, d, t = o[use], d[use], t[use]
+        zc, _ = self._thirdCenters(self.centers[o], self.centers[d],
+                                   self.radii[o], self.radii[d], self.radii[t])
+        return np.abs(zc - self.centers[t])
+
+    def _thirdCenters(self, za, zb, ra, rb, rc):
+        return thirdCenters(za, zb, ra, rb, rc)
+
+    def maxPlacementError(self, corners: PackingCorners) -> float:
+        errors = self.placementErrors(corners)
+        return float(errors.max()) if len(errors) > 0 else 0.0
+# END PackingLayout
+
+def layoutCircles(corners: PackingCorners,
+                  x: np.ndarray,
+                  centerOrigin: int,
+                  centerDest: int,
+                  average: bool = False) -> PackingLayout:
+    """Places the circles of a packing in the Poincare disk.
+
+    Args:
+        corners: The corners of the triangulation.
+        x: The x-radius of each vertex (x <= 0 for boundary horocycles).
+        centerOrigin: A vertex with a finite circle, placed at the origin.
+        centerDest: A neighbor of centerOrigin, placed on the positive x-axis. The third
+            vertex of the triangle to the left of centerOrigin -> centerDest is placed
+            counterclockwise.
+        average: If True a vertex placed by several triangles in the same generation is put
+            at the average of those placements, else at the first.
+
+    Raises:
+        PackingError if centerOrigin is a horocycle.
+
+    Returns:
+        The PackingLayout.
+    """
+    x = np.asarray(x, dtype = float)
+    if x[centerOrigin] <= 0:
+        raise PackingError("Can't start layout from a horocycle. Select a vertex of finite radius to center at the origin.")
+    n = corners.numVerts
+    centers = np.zeros(n, dtype = np.complex128)
+    radii = x.copy()
+    placed = np.zeros(n, dtype = bool)
+
+    placed[centerOrigin] = True
+    ra = _hyperbolicRadii(x[centerOrigin])
+    if x[centerDest] > 0:
+        centers[centerDest] = math.tanh(0.5 * (ra + _hyperbolicRadii(x[centerDest])))
+    else:
+        centers[centerDest] = 1.0
+        radii[centerDest] = -0.5 * (1.0 - math.tanh(0.5 * ra))
+    placed[centerDest] = True
+
+    o, d, t = corners.origin, corners.dest, corners.third
+    generations = 0
+    while True:
+        ready = np.flatnonzero(placed[o] & placed[d] & ~placed[t])
+        if len(ready) == 0:
+            break
+        generations += 1
+        # Place from the origin if it is finite, else from the dest, turning clockwise
+        # since (dest, origin, third) is a clockwise triangle.
+        fromOrigin = ready[radii[o[ready]] > 0]
+        fromDest = ready[(radii[o[ready]] <= 0) & (radii[d[ready]] > 0)]
+        anchors = np.concatenate([o[fromOrigin], d[fromDest]])
+        others = np.concatenate([d[fromOrigin], o[fromDest]])
+        targets = np.concatenate([t[fromOrigin], t[fromDest]])
+        if len(targets) > 0:
+            orientation = np.where(np.arange(len(targets)) < len(fromOrigin), 1.0, -1.0)
+            zc, radc = thirdCenters(centers[anchors], centers[others],
+                                    radii[anchors], radii[others], radii[targets], orientation)
+            _store(centers, radii, targets, zc, radc, average)
+            placed[targets] = True
+        else:
+            # Only triangles with two placed horocycles are left, place one with the scalar code
+            c = ready[0]
+            ctr, rad = _compute_center(ExtendedComplex(complex(centers[o[c]])),
+                                       ExtendedComplex(complex(centers[d[c]])),
+                                       radii[o[c]], radii[d[c]], radii[t[c]])
+            centers[t[c]] = ctr.toComplex()
+            radii[t[c]] = rad
+            placed[t[c]] = True
+    return PackingLayout(centers, radii, placed, generations)
+
+def _store(centers, radii, targets, zc, radc, average):
+    if average:
+        count = np.bincount(targets, minlength = len(centers))
+        total = np.zeros(len(centers), dtype = np.complex128)
+        np.add.at(total, targets, zc)
+        radTotal = np.zeros(len(centers))
+        np.add.at(radTotal, targets, radc)
+        verts = np.flatnonzero(count)
+        centers[verts] = total[verts] / count[verts]
+        horo = verts[radii[verts] <= 0]
+        radii[horo] = radTotal[horo] / count[horo]
+        centers[horo] = centers[horo] / np.abs(centers[horo])
+    else:
+        verts, first = np.unique(targets, return_index = True)
+        centers[verts] = zc[first]
+        radii[verts] = radc[first]
+
+def layoutPacking(dcel: DCEL, centerDartIdx: int = -1, average: bool = False) -> float:
+    """Array version of hypPacker._place_circles.
+
+    Replaces the [z, r] label of every vertex by its CircleH2 (horocycles store minus their
+    euclidean radius, as in hypPacker.maximalPacking) and records the maximum placement
+    error on dcel.maxPlacementError.
+
+    Args:
+        dcel: A triangulated disk whose vertices have .data [z, r] with r the x-radius, and
+            .aim (negative on the boundary).
+        centerDartIdx: The index of the dart to lay out from the origin, -1 to pick one.
+        average: Whether to average multiple placements (see layoutCircles).
+
+    Raises:
+        PackingError if all vertices are incident to the outer face or the selected dart
+        starts at a horocycle.
+
+    Returns:
+        The maximum placement error.
+    """
+    adcel = ArrayDCEL.fromDCEL(dcel)
+    corners = PackingCorners.fromArrayDCEL(adcel)
+    x = np.array([v.data[1] for v in dcel.verts], dtype = float)
+    if centerDartIdx < 0:
+        interior = [i for i, v in enumerate(dcel.verts) if v.aim > 0]
+        if len(interior) == 0:
+            raise PackingError("All vertices are incident to the outer face.")
+        centerDartIdx = adcel.vert_adart[interior[0]]
+    centerOrigin = adcel.dart_origin[centerDartIdx]
+    centerDest = adcel.dart_origin[adcel.dart_next[centerDartIdx]]
+
+    layout = layoutCircles(corners, x, centerOrigin, centerDest, average)
+    for i, v in enumerate(dcel.verts):
+        v.data = (CircleH2(PointH2(ExtendedComplex(complex(layout.centers[i]))), float(layout.radii[i]))
+                  if layout.placed[i] else None)
+    dcel.maxPlacementError = layout.maxPlacementError(corners)
+    return dcel.maxPlacementError
@@ -0,0 +1,69 @@
+import unittest
+
+import numpy as np
+
+from . import hypPacker, hypPackerNumpy
+from .hypPacker import PackingError
+from .hypPackerNumpy import NEWTON
+from ._testMeshes import sphereDisk, pentagonTiling, starTriangulated
+from .packingArrays import PackingCorners
+from .packingLayout import layoutCircles, layoutPacking
+
+def _radiiLabels(dcel):
+    labels, _ = hypPackerNumpy.maximalPacking(dcel, tolerance = 1e-12, placeCircles = False,
+                                              method = NEWTON)
+    return labels
+
+def _copy(labels):
+    dcel = labels.duplicate(vdata_transform = (lambda data : list(data)))
+    for v, w in zip(dcel.verts, labels.verts):
+        v.aim = w.aim
+    return dcel
+
+class TestPackingLayout(unittest.TestCase):
+
+    def assertSameLayout(self, dcel, expected):
+        np.testing.assert_allclose([v.data.center.coord.toComplex() for v in dcel.verts],
+                                   [v.data[0].toComplex() for v in expected.verts], rtol = 0, atol = 1e-10)
+        np.testing.assert_allclose([v.data.xRadius for v in dcel.verts],
+                                   [v.data[1] for v in expected.verts], rtol = 0, atol = 1e-10)
+
+    def test_matchesPlaceCircles(self):
+        for disk in (sphereDisk(150), starTriangulated(pentagonTiling(3))):
+            labels = _radiiLabels(disk)
+            expected = _copy(labels)
+            hypPacker._place_circles(expected, -1)
+            for average in (False, True):
+                dcel = _copy(labels)
+                error = layoutPacking(dcel, average = average)
+                self.assertEqual(error, dcel.maxPlacementError)
+                self.assertLess(error, 1e-10)
+                self.assertSameLayout(dcel, expected)
+
+    def test_centerDart(self):
+        labels = _radiiLabels(sphereDisk(60))
+        boundary = [i for i, d in enumerate(labels.darts) if d.origin.aim < 0][0]
+        with self.assertRaises(PackingError):
+            layoutPacking(_copy(labels), boundary)
+        interior = [i for i, d in enumerate(labels.darts) if d.origin.aim > 0 and d.dest.aim < 0][0]
+        expected = _copy(labels)
+        hypPacker._place_circles(expected, interior)
+        dcel = _copy(labels)
+        layoutPacking(dcel, interior)
+        self.assertSameLayout(dcel, expected)
+
+    def test_placementErrors(self):
+        labels = _radiiLabels(sphereDisk(100))
+        corners = PackingCorners.fromDCEL(labels)
+        x = np.array([v.data[1] for v in labels.verts])
+        origin = [i for i, v in enumerate(labels.verts) if v.aim > 0][0]
+        dest = int(corners.dest[corners.start[origin]])
+        layout = layoutCircles(corners, x, origin, dest)
+        self.assertTrue(layout.placed.all())
+        self.assertLess(layout.maxPlacementError(corners), 1e-10)
+        # An unpacked labelling does not close up around the vertices
+        x[x > 0] *= 0.9
+        self.assertGreater(layoutCircles(corners, x, origin, dest).maxPlacementError(corners), 1e-3)
+
+if __name__ == '__main__':
+    unittest.main()
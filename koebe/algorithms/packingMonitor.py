@@ -0,0 +1,109 @@
+#
+# Convergence instrumentation for the circle packers.
+#
+# The repack functions of hypPacker and the ArrayPacker of hypPackerNumpy (and
+# so the euclidean and spherical packers built on it) run as generators that
+# yield a PassStats after every sweep or Newton step. The radii being packed
+# are updated in place, so between two passes they hold the intermediate
+# labels. The usual entry points consume these generators and hand each
+# PassStats to an optional callback, which stops the packing by returning
+# True. PackingMonitor is such a callback: it records every pass and can stop
+# after a time limit or when the error stalls.
+#
+
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional
+
+@dataclass
+class PassStats:
+    """What happened in one pass (sweep or Newton step) of a packer.
+
+    Attributes:
+        passIdx: The number of passes performed so far, starting at 1.
+        averageError: The average absolute angle sum error after the pass.
+        maxError: The largest absolute angle sum error after the pass.
+        updated: The number of vertices whose radius changed in the pass.
+        seconds: The wall time of the pass.
+    """
+    passIdx: int
+    averageError: float
+    maxError: float
+    updated: int
+    seconds: float
+
+def runPasses(passes: Iterator[PassStats], callback: Optional[Callable[[PassStats], bool]] = None) -> int:
+    """Runs a packing generator to the end, or until callback returns True.
+
+    Args:
+        passes: A generator of PassStats, such as hypPacker.repackPasses.
+        callback: Called with the PassStats of every pass. The packing stops when it
+            returns a true value.
+
+    Returns:
+        The number of passes performed.
+    """
+    loopIdx = 0
+    for stats in passes:
+        loopIdx = stats.passIdx
+        if callback is not None and callback(stats):
+            break
+    return loopIdx
+
+class PackingMonitor:
+    """A packing callback that records every pass and stops long or stalled packings.
+
+    Args:
+        maxSeconds: Stop once the passes took this much wall time in total, None for no limit.
+        stallPasses: Stop if the average error did not drop below stallRatio times its value
+            stallPasses passes earlier, None to never stop for stalling.
+        stallRatio: See stallPasses. Default is 0.99.
+        callback: Another callback to call with every PassStats; the packing also stops when
+            it returns True.
+
+    A monitor can be reused: a pass with passIdx 1 starts a new packing and resets it.
+
+    Attributes:
+        passes: The PassStats of every pass of the current packing so far.
+        totalSeconds: The wall time of those passes.
+        stopReason: None, "time", "stalled" or "callback" once the monitor stopped a packing.
+    """
+
+    def __init__(self,
+                 maxSeconds: Optional[float] = None,
+                 stallPasses: Optional[int] = None,
+                 stallRatio: float = 0.99,
+                 callback: Optional[Callable[[PassStats], bool]] = None):
+        self.maxSeconds = maxSeconds
+        self.stallPasses = stallPasses
+        self.stallRatio = stallRatio
+        self.callback = callback
+        self.reset()
+
+    def reset(self):
+        """Forgets the recorded passes, to monitor another packing."""
+        self.passes: List[PassStats] = []
+        self.totalSeconds = 0.0
+        self.stopReason = None
+
+    def __call__(self, stats: PassStats) -> bool:
+        if stats.passIdx == 1:
+            self.reset()
+        self.passes.append(stats)
+        self.totalSeconds += stats.seconds
+        if self.callback is not None and self.callback(stats):
+            self.stopReason = "callback"
+        elif self.maxSeconds is not None and self.totalSeconds >= self.maxSeconds:
+            self.stopReason = "time"
+        elif (self.stallPasses is not None and len(self.passes) > self.stallPasses
+              and stats.averageError > self.stallRatio * self.passes[-1 - self.stallPasses].averageError):
+            self.stopReason = "stalled"
+        return self.stopReason is not None
+
+    def averageErrors(self) -> List[float]:
+        """The average error after each pass, for plotting convergence."""
+        return [stats.averageError for stats in self.passes]
+
+    def maxErrors(self) -> List[float]:
+        """The largest error after each pass."""
+        return [stats.maxError for stats in self.passes]
+# END PackingMonitor
@@ -0,0 +1,97 @@
+import unittest
+import warnings
+
+import numpy as np
+
+from . import hypPacker, hypPackerNumpy
+from .hypPacker import PackingWarning
+from .hypPackerNumpy import ArrayPacker, NEWTON
+from ._testMeshes import sphereDisk
+from .euclideanPacker import euclideanPacking
+from .packingArrays import PackingCorners
+from .packingMonitor import PassStats, PackingMonitor
+
+def _labels(dcel):
+    labels, _ = hypPacker.maximalPacking(dcel, num_passes = 0, placeCircles = False)
+    return labels
+
+class TestPackingMonitor(unittest.TestCase):
+
+    def test_repackPasses(self):
+        labels = _labels(sphereDisk(40))
+        passes = list(hypPacker.repackPasses(labels, 50))
+        self.assertEqual([stats.passIdx for stats in passes], list(range(1, 51)))
+        for stats in passes:
+            self.assertIsInstance(stats, PassStats)
+            self.assertGreaterEqual(stats.maxError, stats.averageError)
+            self.assertGreater(stats.updated, 0)
+            self.assertGreaterEqual(stats.seconds, 0.0)
+        self.assertLess(passes[-1].averageError, passes[0].averageError)
+        # The labels hold the radii of the last pass
+        self.assertAlmostEqual(passes[-1].averageError,
+                               np.mean([abs(v.angleSumError) for v in labels.verts if v.aim > 0]))
+
+    def test_callbackStops(self):
+        monitor = PackingMonitor(callback = lambda stats : stats.passIdx == 7)
+        _, loopCount = hypPacker.maximalPacking(sphereDisk(40), callback = monitor)
+        self.assertEqual(loopCount, 7)
+        self.assertEqual(len(monitor.passes), 7)
+        self.assertEqual(monitor.stopReason, "callback")
+        self.assertEqual(monitor.averageErrors(), [stats.averageError for stats in monitor.passes])
+
+    def test_reuse(self):
+        monitor = PackingMonitor(callback = lambda stats : stats.passIdx == 5)
+        hypPacker.maximalPacking(sphereDisk(40), callback = monitor)
+        first = list(monitor.passes)
+        _, loopCount = hypPacker.maximalPacking(sphereDisk(40), callback = monitor)
+        self.assertEqual(loopCount, 5)
+        self.assertEqual([stats.passIdx for stats in monitor.passes], list(range(1, 6)))
+        self.assertEqual(monitor.totalSeconds, sum(stats.seconds for stats in monitor.passes))
+        self.assertEqual(len(first), 5)
+        monitor.reset()
+        self.assertEqual((monitor.passes, monitor.totalSeconds, monitor.stopReason), ([], 0.0, None))
+
+    def test_stalled(self):
+        monitor = PackingMonitor(stallPasses = 3, stallRatio = 0.5)
+        _, loopCount = hypPackerNumpy.maximalPacking(sphereDisk(60), placeCircles = False,
+                                                     callback = monitor)
+        self.assertEqual(monitor.stopReason, "stalled")
+        self.assertEqual(loopCount, len(monitor.passes))
+        self.assertLess(loopCount, 1000)
+        monitor = PackingMonitor(maxSeconds = 0.0)
+        _, loopCount = euclideanPacking(sphereDisk(60), callback = monitor)
+        self.assertEqual((loopCount, monitor.stopReason), (1, "time"))
+
+    def test_arrayPasses(self):
+        labels = _labels(sphereDisk(80))
+        corners = PackingCorners.fromDCEL(labels)
+        aim = np.array([v.aim for v in labels.verts])
+        x = np.array([v.data[1] for v in labels.verts])
+        packer = ArrayPacker(corners, aim)
+        newtonPasses = list(packer.newtonPasses(x.copy(), tolerance = 1e-12))
+        self.assertLess(newtonPasses[-1].maxError, 1e-10)
+        self.assertEqual(newtonPasses[0].updated, len(packer.packed))
+        sweeps = packer.repackPasses(x)
+        first = next(sweeps)
+        self.assertAlmostEqual(first.averageError, packer.averageError(x))
+        monitor = PackingMonitor()
+        _, loopCount = hypPackerNumpy.maximalPacking(sphereDisk(80), method = NEWTON, callback = monitor)
+        self.assertEqual(loopCount, len(newtonPasses))
+        self.assertEqual([s.updated for s in monitor.passes], [s.updated for s in newtonPasses])
+
+    def test_placementWarning(self):
+        labels, _ = hypPacker.maximalPacking(sphereDisk(30), placeCircles = False)
+        hypPacker._place_circles(labels, -1)
+        self.assertEqual(labels.unplacedVerts, [])
+        labels, _ = hypPacker.maximalPacking(sphereDisk(30), placeCircles = False)
+        bad = [v for v in labels.verts if v.aim > 0][-1]
+        bad.data[1] = None
+        with warnings.catch_warnings(record = True) as caught:
+            warnings.simplefilter("always")
+            hypPacker._place_circles(labels, -1)
+        self.assertIn(bad, labels.unplacedVerts)
+        self.assertTrue(all(v.data is None for v in labels.unplacedVerts))
+        self.assertTrue(any(issubclass(w.category, PackingWarning) for w in caught))
+
+if __name__ == '__main__':
+    unittest.main()
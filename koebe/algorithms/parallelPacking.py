@@ -0,0 +1,135 @@
+#
+# Packs many independent triangulated disks on several cores.
+#
+# Each DCEL is sent to a worker process as the plain index arrays of its
+# ArrayDCEL (no Vertex/Dart object graph is pickled). The worker rebuilds a
+# DCEL, runs hypPackerNumpy.maximalPacking and sends back the circle centers,
+# x-radii and angle sums as arrays, which are attached to a duplicate of the
+# input DCEL in the calling process.
+#
+
+import time
+import warnings
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+from typing import List
+
+import numpy as np
+
+from ..datastructures.dcel import DCEL
+from ..datastructures.arrayDCEL import ArrayDCEL
+from ..geometries.extendedComplex import ExtendedComplex
+from ..geometries.hyperbolic2 import PointH2, CircleH2
+from .hypPacker import PackingWarning
+from .hypPackerNumpy import maximalPacking, ITERATIVE, GAUSS_SEIDEL
+
+# The ArrayDCEL constructor arguments sent to the workers
+_TOPOLOGY = ("dart_next", "dart_twin", "dart_origin", "dart_face", "vert_adart", "face_adart",
+             "dart_prev", "dart_edge", "edge_adart")
+
+@dataclass
+class PackingResult:
+    """The packing of one DCEL by packMany.
+
+    Attributes:
+        packing: The packing, like the first result of maximalPacking.
+        loopCount: The number of sweeps (or Newton steps) performed.
+        seconds: The time spent in the worker (including the layout).
+    """
+    packing: DCEL
+    loopCount: int
+    seconds: float
+
+def topologyArrays(dcel: DCEL) -> dict:
+    """The arrays needed to rebuild the combinatorics of dcel with ArrayDCEL(**arrays)."""
+    adcel = ArrayDCEL.fromDCEL(dcel)
+    arrays = dict((name, getattr(adcel, name)) for name in _TOPOLOGY)
+    arrays["outer_face"] = int(adcel.outer_face)
+    return arrays
+
+def _packArrays(arrays: dict, options: dict):
+    # Runs in a worker. Returns (centers, xRadii, placed, aims, angleSums, loopCount, seconds),
+    # where placed is False for the vertices the layout could not place (their .data is None).
+    start = time.perf_counter()
+    dcel = ArrayDCEL(**arrays).toDCEL()
+    packing, loopCount = maximalPacking(dcel, **options)
+
+    centers = np.zeros(len(packing.verts), dtype = np.complex128)
+    xRadii = np.zeros(len(packing.verts))
+    placed = np.ones(len(packing.verts), dtype = bool)
+    for i, v in enumerate(packing.verts):
+        if v.data is None:
+            placed[i] = False
+        elif isinstance(v.data, CircleH2):
+            centers[i] = v.data.center.coord.toComplex()
+            xRadii[i] = v.data.xRadius
+        else:
+            centers[i] = v.data[0].toComplex()
+            xRadii[i] = v.data[1]
+    aims = np.array([v.aim for v in packing.verts])
+    angleSums = np.array([getattr(v, "angleSum", 0.0) for v in packing.verts])
+    return centers, xRadii, placed, aims, angleSums, loopCount, time.perf_counter() - start
+
+def packMany(dcels: List[DCEL],
+             workers: int = None,
+             num_passes: int = 1000,
+             tolerance: float = 3e-10,
+             centerDartIdx: int = -1,
+             placeCircles: bool = True,
+             schedule: str = GAUSS_SEIDEL,
+             method: str = ITERATIVE) -> List[PackingResult]:
+    """Computes the hyperbolic maximal packings of many DCELs in parallel.
+
+    Args:
+        dcels: The triangulated disks to pack (see hypPackerNumpy.maximalPacking).
+        workers: The number of worker processes. None uses one per core, and 1 packs in
+            this process without starting a pool.
+        num_passes, tolerance, centerDartIdx, placeCircles, schedule, method: Passed on to
+            hypPackerNumpy.maximalPacking for every DCEL.
+
+    Returns:
+        A list with the PackingResult of each DCEL, in the order of dcels. As in
+        hypPacker.maximalPacking, vertices whose circle could not be placed keep .data None,
+        are listed in packing.unplacedVerts and are reported with a PackingWarning.
+    """
+    options = dict(num_passes = num_passes,
+                   tolerance = tolerance,
+                   centerDartIdx = centerDartIdx,
+                   placeCircles = placeCircles,
+                   schedule = schedule,
+                   method = method)
+    jobs = [topologyArrays(dcel) for dcel in dcels]
+
+    if workers == 1:
+        outputs = [_packArrays(arrays, options) for arrays in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers = workers) as executor:
+            outputs = list(executor.map(_packArrays, jobs, repeat(options)))
+
+    results = []
+    for k, (dcel, (centers, xRadii, placed, aims, angleSums, loopCount, seconds)) in enumerate(zip(dcels, outputs)):
+        packing = dcel.duplicate(
+                      vdata_transform = (lambda v : None),
+                      edata_transform = (lambda e : None),
+                      fdata_transform = (lambda f : None)
+                  )
+        packing.unplacedVerts = []
+        for i, v in enumerate(packing.verts):
+            v.aim = float(aims[i])
+            if not placed[i]:
+                packing.unplacedVerts.append(v)
+                continue
+            center = ExtendedComplex(complex(centers[i]))
+            v.data = (CircleH2(PointH2(center), float(xRadii[i])) if placeCircles
+                      else [center, float(xRadii[i])])
+            if v.aim > 0:
+                v.angleSum = float(angleSums[i])
+                v.angleSumError = v.angleSum - v.aim
+        if packing.unplacedVerts:
+            # The warnings of the layout stay in the worker process, so repeat them here
+            warnings.warn(f"Could not place {len(packing.unplacedVerts)} circles of DCEL {k}; their "
+                          "vertices are listed in packing.unplacedVerts.", PackingWarning)
+        results.append(PackingResult(packing, loopCount, seconds))
+    return results
@@ -0,0 +1,58 @@
+import unittest
+import warnings
+
+from unittest import mock
+
+import numpy as np
+
+from ..geometries.hyperbolic2 import CircleH2
+from .hypPackerNumpy import maximalPacking, NEWTON
+from ._testMeshes import sphereDisk
+from .hypPacker import PackingWarning
+from . import parallelPacking
+from .parallelPacking import packMany, topologyArrays
+from ..datastructures.arrayDCEL import ArrayDCEL
+
+class TestParallelPacking(unittest.TestCase):
+
+    def test_topologyArrays(self):
+        dcel = sphereDisk(40)
+        rebuilt = ArrayDCEL(**topologyArrays(dcel)).toDCEL()
+        self.assertEqual(len(rebuilt.verts), len(dcel.verts))
+        self.assertEqual(len(rebuilt.faces), len(dcel.faces))
+        self.assertEqual(set(rebuilt.verts.index(v) for v in rebuilt.outerFace.vertices()),
+                         set(dcel.verts.index(v) for v in dcel.outerFace.vertices()))
+
+    def test_packMany(self):
+        dcels = [sphereDisk(n) for n in (30, 50, 40)]
+        for workers in (1, 2):
+            results = packMany(dcels, workers = workers, method = NEWTON)
+            self.assertEqual([len(r.packing.verts) for r in results], [len(d.verts) for d in dcels])
+            for dcel, result in zip(dcels, results):
+                expected, loopCount = maximalPacking(dcel, method = NEWTON)
+                self.assertEqual(result.loopCount, loopCount)
+                self.assertGreaterEqual(result.seconds, 0.0)
+                self.assertTrue(all(isinstance(v.data, CircleH2) for v in result.packing.verts))
+                np.testing.assert_allclose([v.data.xRadius for v in result.packing.verts],
+                                           [v.data.xRadius for v in expected.verts], rtol = 0, atol = 1e-12)
+                np.testing.assert_allclose([v.data.center.coord.toComplex() for v in result.packing.verts],
+                                           [v.data.center.coord.toComplex() for v in expected.verts],
+                                           rtol = 0, atol = 1e-12)
+
+    def test_unplacedVerts(self):
+        def losingOne(dcel, **options):
+            packing, loopCount = maximalPacking(dcel, **options)
+            packing.verts[-1].data = None
+            return packing, loopCount
+        with mock.patch.object(parallelPacking, "maximalPacking", losingOne):
+            with warnings.catch_warnings(record = True) as caught:
+                warnings.simplefilter("always")
+                result, = packMany([sphereDisk(30)], workers = 1)
+        lost = result.packing.verts[-1]
+        self.assertEqual(result.packing.unplacedVerts, [lost])
+        self.assertIsNone(lost.data)
+        self.assertTrue(all(isinstance(v.data, CircleH2) for v in result.packing.verts if v is not lost))
+        self.assertTrue(any(issubclass(w.category, PackingWarning) for w in caught))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,9 @@ from .sampling import *
 import random
 import math
 
+import numpy as np
+from scipy.spatial import cKDTree
+
 def _distSq(x1, y1, x2, y2):
     dx = x2 - x1
     dy = y2 - y1
@@ -98,6 +101,609 @@ def slowUniformDartThrowingWithBoundary(radius: float, stop_count: int = 500):
     
     return slowUniformDartThrowing(radius, stop_count, samples)
 
+class _SampleGrid:
+    """A background grid over the unit square with cells of side radius / sqrt(2).
+
+    Every cell holds at most one sample of a sampling with minimum distance radius,
+    so the samples within radius of a point lie in the 5 by 5 block of cells around it.
+    """
+
+    def __init__(self, radius: float):
+        self.radiusSq = radius * radius
+        self.cellSize = radius / math.sqrt(2)
+        self.n = int(math.ceil(1.0 / self.cellSize))
+        self.cells = [None] * (self.n * self.n)
+
+    def _cell(self, x, y):
+        return min(int(x / self.cellSize), self.n - 1), min(int(y / self.cellSize), self.n - 1)
+
+    def fits(self, x, y):
+        """Whether (x, y) is farther than radius from every sample in the grid."""
+        i, j = self._cell(x, y)
+        n, cells, radiusSq = self.n, self.cells, self.radiusSq
+        for jj in range(max(j - 2, 0), min(j + 3, n)):
+            row = jj * n
+            for ii in range(max(i - 2, 0), min(i + 3, n)):
+                s = cells[row + ii]
+                if s is not None and _distSq(x, y, s[0], s[1]) <= radiusSq:
+                    return False
+        return True
+
+    def add(self, sample):
+        i, j = self._cell(sample[0], sample[1])
+        self.cells[j * self.n + i] = sample
+# END _SampleGrid
+
+def uniformBoundarySampling(radius: float):
+    """Computes a maximal Poisson disk sampling of the boundary of the unit square.
+
+    The four corners are always samples. Each side is then filled from one end with gaps drawn
+    uniformly from [radius, 2 radius] until no further sample fits, so that no two samples are
+    within radius of each other and every gap is shorter than 2 radius.
+
+    Args:
+        radius: The minimum distance between samples. Should be less than 1.
+
+    Returns:
+        A list of (x, y) samples.
+    """
+    corners = [(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)]
+    samples = []
+    for k, (x0, y0) in enumerate(corners):
+        x1, y1 = corners[(k + 1) % 4]
+        samples.append((x0, y0))
+        t = 0.0
+        while 1.0 - t >= 2 * radius:
+            t += radius + random.random() * (min(2 * radius, 1.0 - radius - t) - radius)
+            samples.append((x0 + t * (x1 - x0), y0 + t * (y1 - y0)))
+    return samples
+
+def uniformPoissonDiskSampling(radius: float, k: int = 30, initial_samples = None):
+    """Computes a Poisson disk sampling of the unit square with Bridson's algorithm.
+
+    Samples are kept in a background grid with cells of side radius / sqrt(2), so checking a
+    candidate only looks at the samples of the 5 by 5 cells around it. Every sample starts out
+    active. Up to k candidates are drawn uniformly from the annulus between radius and 2 radius
+    around a random active sample; the first one that fits becomes a new (active) sample and if
+    none does the sample is retired. This takes time linear in the number of samples and stops
+    once (almost) no further sample fits.
+
+    Args:
+        radius: The minimum distance between samples.
+        k: The number of candidates to try around an active sample before retiring it.
+        initial_samples: (x, y) samples to start from (they are not changed). Default is a
+            single sample drawn uniformly at random.
+
+    Returns:
+        A list of (x, y) samples, starting with initial_samples.
+    """
+    grid = _SampleGrid(radius)
+    samples = list(initial_samples) if initial_samples else [(random.random(), random.random())]
+    for s in samples:
+        grid.add(s)
+
+    active = list(range(len(samples)))
+    while active:
+        a = random.randrange(len(active))
+        sx, sy = samples[active[a]]
+        for _ in range(k):
+            # An area uniform point of the annulus radius <= |p - s| <= 2 radius
+            rho = radius * math.sqrt(1.0 + 3.0 * random.random())
+            theta = 2.0 * math.pi * random.random()
+            x, y = sx + rho * math.cos(theta), sy + rho * math.sin(theta)
+            if 0.0 <= x <= 1.0 and 0.0 <= y <= 1.0 and grid.fits(x, y):
+                grid.add((x, y))
+                active.append(len(samples))
+                samples.append((x, y))
+                break
+        else:
+            active[a] = active[-1]
+            active.pop()
+    return samples
+
+def uniformPoissonDiskSamplingWithBoundary(radius: float, k: int = 30):
+    """Computes a Poisson disk sampling of the unit square that first samples its boundary.
+
+    The boundary is sampled by uniformBoundarySampling, then the interior is filled by
+    uniformPoissonDiskSampling.
+
+    Args:
+        radius: The minimum distance between samples. Should be less than 1.
+        k: See uniformPoissonDiskSampling.
+
+    Returns:
+        A list of (x, y) samples, starting with the boundary samples.
+    """
+    return uniformPoissonDiskSampling(radius, k, uniformBoundarySampling(radius))
+
+class _RadiusGrid:
+    """A hierarchy of grids over the plane for samples (x, y, r) of varying radius.
+
+    A sample of radius r is stored in the grid with cells of side 2^ceil(log2(r)), so a grid
+    only holds samples with radii between half its cell size and its cell size. Two samples
+    conflict if they are within the larger of their radii, so a candidate of radius r only has
+    to check the cells of each grid within max(cell size, r) of it, which is the 3 by 3 block
+    around it unless r is larger than the cells.
+    """
+
+    def __init__(self):
+        self.levels = {}
+
+    def add(self, sample):
+        x, y, r = sample
+        size = 2.0 ** math.ceil(math.log2(r))
+        cells = self.levels.setdefault(size, {})
+        cells.setdefault((math.floor(x / size), math.floor(y / size)), []).append(sample)
+
+    def fits(self, x, y, r):
+        """Whether (x, y) with radius r conflicts with no sample in the grid."""
+        for size, cells in self.levels.items():
+            reach = max(size, r)
+            i0, i1 = math.floor((x - reach) / size), math.floor((x + reach) / size)
+            j0, j1 = math.floor((y - reach) / size), math.floor((y + reach) / size)
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    for sx, sy, sr in cells.get((i, j), ()):
+                        rad = max(sr, r)
+                        if _distSq(x, y, sx, sy) <= rad * rad:
+                            return False
+        return True
+# END _RadiusGrid
+
+def _scalarRadius(radius_function, vectorized):
+    if not vectorized:
+        return radius_function
+    return lambda x, y: float(radius_function(np.array([x]), np.array([y]))[0])
+
+def adaptivePoissonDiskSampling(radius_function, k: int = 30, initial_samples = None, vectorized: bool = False):
+    """Computes an adaptive Poisson disk sampling of the unit square with Bridson's algorithm.
+
+    Each sample (x, y, r) has the radius r = radius_function(x, y) and two samples conflict if
+    they are within the larger of their radii (as in slowAdaptiveDartThrowing). The samples
+    are kept in a _RadiusGrid, so a candidate is only checked against nearby samples. Up to k
+    candidates are drawn in the annulus between r and 2r around a random active sample; the
+    first one that fits becomes a new active sample and if none does the sample is retired.
+
+    Args:
+        radius_function: (x, y) -> float. The (positive) radius at a point.
+        k: The number of candidates to try around an active sample before retiring it.
+        initial_samples: (x, y, r) samples to start from (they are not changed). Default is a
+            single sample drawn uniformly at random.
+        vectorized: If True, radius_function takes arrays of x and y coordinates and returns
+            an array of radii. It is then called once for the k candidates of an active sample.
+
+    Returns:
+        A list of (x, y, r) samples, starting with initial_samples.
+    """
+    radius = _scalarRadius(radius_function, vectorized)
+    grid = _RadiusGrid()
+    if initial_samples:
+        samples = list(initial_samples)
+    else:
+        x, y = random.random(), random.random()
+        samples = [(x, y, radius(x, y))]
+    for s in samples:
+        grid.add(s)
+
+    active = list(range(len(samples)))
+    while active:
+        a = random.randrange(len(active))
+        sx, sy, sr = samples[active[a]]
+        candidates = []
+        for _ in range(k):
+            # An area uniform point of the annulus sr <= |p - s| <= 2 sr
+            rho = sr * math.sqrt(1.0 + 3.0 * random.random())
+            theta = 2.0 * math.pi * random.random()
+            x, y = sx + rho * math.cos(theta), sy + rho * math.sin(theta)
+            if 0.0 <= x <= 1.0 and 0.0 <= y <= 1.0:
+                candidates.append((x, y))
+        if vectorized and candidates:
+            xs, ys = np.array(candidates).T
+            radii = np.asarray(radius_function(xs, ys), dtype = float).tolist()
+        else:
+            radii = (radius_function(x, y) for x, y in candidates)
+        for (x, y), r in zip(candidates, radii):
+            if grid.fits(x, y, r):
+                grid.add((x, y, r))
+                active.append(len(samples))
+                samples.append((x, y, r))
+                break
+        else:
+            active[a] = active[-1]
+            active.pop()
+    return samples
+
+def adaptivePoissonDiskSamplingWithBoundary(radius_function, k: int = 30, stop_count: int = 100,
+                                            vectorized: bool = False):
+    """Computes an adaptive Poisson disk sampling of the unit square that first samples its boundary.
+
+    The boundary is sampled by dart throwing until stop_count consecutive darts fail (as in
+    slowAdaptiveDartThrowingWithBoundary, but checking the darts with a _RadiusGrid), then the
+    interior is filled by adaptivePoissonDiskSampling.
+
+    Args:
+        radius_function: See adaptivePoissonDiskSampling.
+        k: See adaptivePoissonDiskSampling.
+        stop_count: The number of consecutive failed darts that ends the boundary sampling.
+        vectorized: See adaptivePoissonDiskSampling.
+
+    Returns:
+        A list of (x, y, r) samples, starting with the boundary samples.
+    """
+    radius = _scalarRadius(radius_function, vectorized)
+    grid = _RadiusGrid()
+    samples = []
+
+    fail_count = 0
+    while fail_count < stop_count:
+        s = random.random() * 4
+
+        x, y = ((s, 0) if s <= 1.0
+                else (1, s - 1) if s <= 2.0
+                else (3 - s, 1) if s <= 3.0
+                else (0, 4 - s))
+        r = radius(x, y)
+        if grid.fits(x, y, r):
+            fail_count = 0
+            grid.add((x, y, r))
+            samples.append((x, y, r))
+        else:
+            fail_count += 1
+
+    return adaptivePoissonDiskSampling(radius_function, k, samples, vectorized)
+
+def _radiusLevels(radii):
+    # The level L of a radius r is ceil(log2(r)), so that 2^(L-1) < r <= 2^L (as in _RadiusGrid)
+    return np.ceil(np.log2(radii)).astype(int)
+
+class _KDIndex:
+    """Samples with radii kept in KD-trees, for checking batches of candidates at once.
+
+    The samples are grouped by radius level: level L holds the samples with radii between
+    2^(L-1) and 2^L. Within a level the samples are split into blocks of decreasing size, each
+    with its own tree. A new batch of samples becomes a block of its own, merged with the last
+    blocks of its level while they are not larger, so every sample is put into a rebuilt tree
+    O(log n) times.
+
+    Two samples conflict if they are within the larger of their radii. The candidates are
+    grouped by level in the same way, and the candidates of level L are only paired with the
+    samples of level L' within 2^max(L, L'). So the pairs examined are within twice the larger
+    of their radii, not within the largest radius of all samples, which matters when the
+    radii span several orders of magnitude.
+    """
+
+    def __init__(self):
+        self.levels = {} # level -> blocks (tree, points, radii), from largest to smallest
+        self.chunks = [] # (points, radii) in the order the samples were added
+
+    def add(self, points, radii):
+        if len(points) == 0:
+            return
+        self.chunks.append((points, radii))
+        levels = _radiusLevels(radii)
+        for level in np.unique(levels):
+            inLevel = levels == level
+            self._addBlock(self.levels.setdefault(level, []), points[inLevel], radii[inLevel])
+
+    @staticmethod
+    def _addBlock(blocks, points, radii):
+        while blocks and len(blocks[-1][1]) <= len(points):
+            _, blockPoints, blockRadii = blocks.pop()
+            points = np.concatenate([blockPoints, points])
+            radii = np.concatenate([blockRadii, radii])
+        blocks.append((cKDTree(points), points, radii))
+
+    def samples(self):
+        """The points and radii of all samples, in the order they were added."""
+        if not self.chunks:
+            return np.empty((0, 2)), np.empty(0)
+        return (np.concatenate([points for points, _ in self.chunks]),
+                np.concatenate([radii for _, radii in self.chunks]))
+
+    def conflicts(self, points, radii):
+        """For each candidate, whether it is within max(its radius, sample radius) of a sample."""
+        hit = np.zeros(len(points), dtype = bool)
+        levels = _radiusLevels(radii)
+        # A tree over the candidates of each level, rebuilt without the candidates found to
+        # conflict once they are half of the tree, so later blocks see few of them
+        trees = {level: None for level in np.unique(levels)}
+        blocks = sorted(((sampleLevel, block) for sampleLevel, levelBlocks in self.levels.items()
+                                              for block in levelBlocks), key = lambda b: -len(b[1][1]))
+        for sampleLevel, (other, _, otherRadii) in blocks:
+            for level, entry in list(trees.items()):
+                if entry is None or 2 * np.count_nonzero(~hit[entry[1]]) < len(entry[1]):
+                    members = np.nonzero((levels == level) & ~hit)[0]
+                    if len(members) == 0:
+                        del trees[level]
+                        continue
+                    entry = trees[level] = (cKDTree(points[members]), members)
+                tree, members = entry
+                reach = 2.0 ** max(level, sampleLevel)
+                pairs = tree.sparse_distance_matrix(other, reach, output_type = "ndarray")
+                i = members[pairs["i"]]
+                close = pairs["v"] <= np.maximum(radii[i], otherRadii[pairs["j"]])
+                hit[i[close]] = True
+            if not trees:
+                break
+        return hit
+# END _KDIndex
+
+def _greedyIndependent(points, radii):
+    """The candidates that sequential dart throwing in index order would accept.
+
+    A candidate is accepted once no remaining candidate before it conflicts with it, and the
+    candidates conflicting with an accepted one are removed. Every round accepts at least the
+    first remaining candidate, and each round is a few vectorized operations on the conflicting
+    pairs. The pairs are found level by level as in _KDIndex: the candidates of level L are
+    paired with all candidates within 2^L and the pairs farther apart than the radius of the
+    level L candidate are dropped.
+    """
+    n = len(points)
+    accepted = np.zeros(n, dtype = bool)
+    if n == 0:
+        return accepted
+    tree = cKDTree(points)
+    levels = _radiusLevels(radii)
+    keys = []
+    for level in np.unique(levels):
+        members = np.nonzero(levels == level)[0]
+        pairs = cKDTree(points[members]).sparse_distance_matrix(tree, 2.0 ** level, output_type = "ndarray")
+        i, j = members[pairs["i"]], pairs["j"].astype(np.int64)
+        close = (pairs["v"] <= radii[i]) & (i != j)
+        i, j = i[close], j[close]
+        keys.append(np.minimum(i, j) * n + np.maximum(i, j))
+    keys = np.unique(np.concatenate(keys))
+    i, j = keys // n, keys % n
+
+    alive = np.ones(n, dtype = bool)
+    while alive.any():
+        live = alive[i] & alive[j]
+        blocked = np.zeros(n, dtype = bool)
+        blocked[j[live]] = True
+        new = alive & ~blocked
+        accepted |= new
+        alive &= ~new
+        alive[j[new[i]]] = False
+        alive[i[new[j]]] = False
+    return accepted
+
+def _batchDartThrowing(draw, points, radii, stop_count, batch_size, index = None):
+    # Throws batches of darts (points, radii) = draw(m) until fewer than one in stop_count
+    # of a batch is accepted. A batch has at least batch_size darts and grows with the number
+    # of samples, so that the last, mostly rejected, batches are few. Returns the points and
+    # radii of all samples. The samples are kept in index, a _KDIndex by default.
+    index = _KDIndex() if index is None else index
+    index.add(points, radii)
+    count = len(points)
+    while True:
+        m = max(batch_size, count)
+        candidates, candidateRadii = draw(m)
+        fresh = ~index.conflicts(candidates, candidateRadii)
+        candidates, candidateRadii = candidates[fresh], candidateRadii[fresh]
+        accepted = _greedyIndependent(candidates, candidateRadii)
+        index.add(candidates[accepted], candidateRadii[accepted])
+        count += np.count_nonzero(accepted)
+        if np.count_nonzero(accepted) * stop_count < m:
+            return index.samples()
+
+def _perimeterPoints(s):
+    # Maps s in [0, 4) to the boundary of the unit square, counterclockwise from (0, 0)
+    x = np.select([s <= 1.0, s <= 2.0, s <= 3.0], [s, np.ones_like(s), 3.0 - s], np.zeros_like(s))
+    y = np.select([s <= 1.0, s <= 2.0, s <= 3.0], [np.zeros_like(s), s - 1.0, np.ones_like(s)], 4.0 - s)
+    return np.column_stack([x, y])
+
+def _uniformDraw(rng, radius):
+    return lambda m: (rng.random((m, 2)), np.full(m, radius))
+
+def _uniformBoundaryDraw(rng, radius):
+    return lambda m: (_perimeterPoints(4.0 * rng.random(m)), np.full(m, radius))
+
+def _adaptiveDraw(rng, radius_function, boundary = False):
+    def draw(m):
+        points = _perimeterPoints(4.0 * rng.random(m)) if boundary else rng.random((m, 2))
+        return points, np.asarray(radius_function(points[:, 0], points[:, 1]), dtype = float)
+    return draw
+
+def batchUniformDartThrowing(radius: float, stop_count: int = 500, initial_samples = None,
+                             batch_size: int = 10000, seed = None):
+    """Computes a Poisson disk sampling of the unit square by throwing darts in batches.
+
+    Each batch of batch_size darts is drawn with a numpy.random.Generator. Darts within radius
+    of a sample are removed with a KD-tree query, and the remaining darts are accepted in order
+    unless they are within radius of an accepted dart of the same batch (resolved in vectorized
+    rounds, see _greedyIndependent). So the result is the one slowUniformDartThrowing would
+    give for the same darts, except that the batches stop once fewer than one dart in
+    stop_count is accepted.
+
+    Args:
+        radius: The minimum distance between samples.
+        stop_count: Stop after a batch that accepts fewer than batch_size / stop_count darts.
+        initial_samples: (x, y) samples to start from (they are not changed).
+        batch_size: The number of darts thrown at once.
+        seed: An int seed or a numpy.random.Generator for reproducible samplings, None for a
+            fresh random seed.
+
+    Returns:
+        A list of (x, y) samples, starting with initial_samples.
+    """
+    rng = np.random.default_rng(seed)
+    points = np.array(initial_samples, dtype = float).reshape(-1, 2) if initial_samples else np.empty((0, 2))
+    points, _ = _batchDartThrowing(_uniformDraw(rng, radius), points, np.full(len(points), radius),
+                                   stop_count, batch_size)
+    return list(map(tuple, points.tolist()))
+
+def batchUniformDartThrowingWithBoundary(radius: float, stop_count: int = 500,
+                                         batch_size: int = 10000, seed = None):
+    """Computes a Poisson disk sampling of the unit square that first samples its boundary,
+    by throwing darts in batches (see batchUniformDartThrowing).
+
+    Returns:
+        A list of (x, y) samples, starting with the boundary samples.
+    """
+    rng = np.random.default_rng(seed)
+    points, radii = _batchDartThrowing(_uniformBoundaryDraw(rng, radius), np.empty((0, 2)), np.empty(0),
+                                       stop_count, batch_size)
+    points, _ = _batchDartThrowing(_uniformDraw(rng, radius), points, radii, stop_count, batch_size)
+    return list(map(tuple, points.tolist()))
+
+def batchAdaptiveDartThrowing(radius_function, stop_count: int = 100, initial_samples = None,
+                              batch_size: int = 10000, seed = None):
+    """Computes an adaptive Poisson disk sampling of the unit square by throwing darts in batches.
+
+    Two samples conflict if they are within the larger of their radii (as in
+    slowAdaptiveDartThrowing). The darts are drawn and checked in batches as in
+    batchUniformDartThrowing.
+
+    Args:
+        radius_function: (xs, ys) -> radii. The (positive) radii at arrays of points.
+        stop_count: Stop after a batch that accepts fewer than batch_size / stop_count darts.
+        initial_samples: (x, y, r) samples to start from (they are not changed).
+        batch_size: The number of darts thrown at once.
+        seed: An int seed or a numpy.random.Generator, None for a fresh random seed.
+
+    Returns:
+        A list of (x, y, r) samples, starting with initial_samples.
+    """
+    rng = np.random.default_rng(seed)
+    initial = np.array(initial_samples, dtype = float).reshape(-1, 3) if initial_samples else np.empty((0, 3))
+    points, radii = _batchDartThrowing(_adaptiveDraw(rng, radius_function), initial[:, :2], initial[:, 2],
+                                       stop_count, batch_size)
+    return list(map(tuple, np.column_stack([points, radii]).tolist()))
+
+def batchAdaptiveDartThrowingWithBoundary(radius_function, stop_count: int = 100,
+                                          batch_size: int = 10000, seed = None):
+    """Computes an adaptive Poisson disk sampling of the unit square that first samples its
+    boundary, by throwing darts in batches (see batchAdaptiveDartThrowing).
+
+    Returns:
+        A list of (x, y, r) samples, starting with the boundary samples.
+    """
+    rng = np.random.default_rng(seed)
+    points, radii = _batchDartThrowing(_adaptiveDraw(rng, radius_function, boundary = True),
+                                       np.empty((0, 2)), np.empty(0), stop_count, batch_size)
+    points, radii = _batchDartThrowing(_adaptiveDraw(rng, radius_function), points, radii,
+                                       stop_count, batch_size)
+    return list(map(tuple, np.column_stack([points, radii]).tolist()))
+
+class _HashGrid3:
+    """Samples in space at distance more than radius from each other, hashed into a grid.
+
+    The cells have side radius, so the samples within radius of a point lie in the 3 by 3 by 3
+    block of cells around it. Only the cells holding samples are stored: the samples are sorted
+    by the key of their cell, with the distinct keys and where their samples start.
+
+    Args:
+        radius: The minimum distance between samples.
+        lower, upper: Corners of a box containing all samples.
+    """
+
+    def __init__(self, radius, lower, upper):
+        self.radius = radius
+        self.lower = np.asarray(lower, dtype = float)
+        # Cell coordinates start at 1, so the neighbors of a cell never wrap around
+        self.dims = np.floor((np.asarray(upper, dtype = float) - self.lower) / radius).astype(np.int64) + 3
+        offsets = np.stack(np.meshgrid([0, -1, 1], [0, -1, 1], [0, -1, 1], indexing = "ij"), axis = -1)
+        self.offsets = self._keys(offsets.reshape(-1, 3))
+        self.chunks = []
+        self.count = 0
+        self.points = np.empty((0, 3))
+        self.cellKeys = np.empty(0, dtype = np.int64)
+        self.cellStarts = np.zeros(1, dtype = np.int64)
+
+    def _keys(self, cells):
+        return (cells[:, 0] * self.dims[1] + cells[:, 1]) * self.dims[2] + cells[:, 2]
+
+    def _cellKeys(self, points):
+        return self._keys(np.floor((points - self.lower) / self.radius).astype(np.int64) + 1)
+
+    def add(self, points, radii = None):
+        if len(points) == 0:
+            return
+        self.chunks.append(points)
+        self.count += len(points)
+        allPoints = np.concatenate([self.points, points])
+        keys = self._cellKeys(allPoints)
+        order = np.argsort(keys, kind = "stable")
+        self.points, keys = allPoints[order], keys[order]
+        self.cellKeys, starts = np.unique(keys, return_index = True)
+        self.cellStarts = np.append(starts, len(keys))
+
+    def samples(self):
+        """The points of all samples, in the order they were added, and their radii."""
+        points = np.concatenate(self.chunks) if self.chunks else np.empty((0, 3))
+        return points, np.full(len(points), self.radius)
+
+    def conflicts(self, points, radii = None):
+        """For each candidate, whether it is within radius of a sample."""
+        hit = np.zeros(len(points), dtype = bool)
+        if len(self.cellKeys) == 0 or len(points) == 0:
+            return hit
+        keys = self._cellKeys(points)
+        # Looking up the candidates in the order of their keys makes the binary searches local
+        remaining = np.argsort(keys)
+        for offset in self.offsets:
+            neighborKeys = keys[remaining] + offset
+            pos = np.minimum(np.searchsorted(self.cellKeys, neighborKeys), len(self.cellKeys) - 1)
+            found = self.cellKeys[pos] == neighborKeys
+            candidates, pos = remaining[found], pos[found]
+            # Pair every candidate with each sample of its neighboring cell
+            starts = self.cellStarts[pos]
+            counts = self.cellStarts[pos + 1] - starts
+            which = np.repeat(candidates, counts)
+            samples = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            close = np.sum((points[which] - self.points[samples]) ** 2, axis = 1) <= self.radius ** 2
+            hit[which[close]] = True
+            remaining = remaining[~hit[remaining]]
+        return hit
+# END _HashGrid3
+
+def _faceCorners(dcel):
+    # The corners of the inner faces of a triangulated dcel with PointE3 vertex data, as an F by 3 by 3 array
+    faces = [f for f in dcel.faces if dcel.outerFace != f]
+    return np.array([[list(v.data) for v in f.vertices()] for f in faces], dtype = float)
+
+def ambientSurfaceSampling(dcel, radius: float, stop_count: int = 500, initial_samples = None,
+                           batch_size: int = 10000, seed = None, as_array: bool = False):
+    """Computes a Poisson disk sampling of a triangulated surface with distances measured in space.
+
+    A fast version of slowAmbientSurfaceSampling with the default area weights and uniform
+    triangle samples. The corners and areas of the faces are gathered into arrays once. Darts
+    are thrown in batches (as in batchUniformDartThrowing): faces are picked in proportion to
+    their area by a binary search in the accumulated areas, and the darts are checked against
+    the samples hashed into a 3D grid (see _HashGrid3) with cells of side radius.
+
+    Args:
+        dcel: A triangulated surface with PointE3 objects stored at each vertex.
+        radius: The minimum distance between samples.
+        stop_count: Stop after a batch that accepts fewer than batch_size / stop_count darts.
+        initial_samples: PointE3 samples to start from (they are not changed).
+        batch_size: The number of darts thrown at once.
+        seed: An int seed or a numpy.random.Generator, None for a fresh random seed.
+        as_array: Return the samples as an n by 3 array instead of a list of PointE3s.
+
+    Returns:
+        The sample points, starting with initial_samples.
+    """
+    rng = np.random.default_rng(seed)
+    corners = _faceCorners(dcel)
+    areas = 0.5 * np.linalg.norm(np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]), axis = 1)
+    areaAccSum = np.cumsum(areas)
+
+    def draw(m):
+        faceIdx = np.minimum(np.searchsorted(areaAccSum, rng.random(m) * areaAccSum[-1], side = "right"),
+                             len(areas) - 1)
+        sqrtR1, r2 = np.sqrt(rng.random((m, 1))), rng.random((m, 1))
+        v0, v1, v2 = corners[faceIdx, 0], corners[faceIdx, 1], corners[faceIdx, 2]
+        return (1 - sqrtR1) * v0 + sqrtR1 * (1 - r2) * v1 + sqrtR1 * r2 * v2, np.full(m, radius)
+
+    initial = np.array([list(p) for p in initial_samples], dtype = float).reshape(-1, 3) if initial_samples else np.empty((0, 3))
+    allCorners = np.concatenate([corners.reshape(-1, 3), initial])
+    index = _HashGrid3(radius, allCorners.min(axis = 0), allCorners.max(axis = 0))
+    points, _ = _batchDartThrowing(draw, initial, np.full(len(initial), radius), stop_count, batch_size, index)
+    if as_array:
+        return points
+    return [PointE3(x, y, z) for x, y, z in points.tolist()]
+
 def slowAmbientSurfaceSampling(dcel, 
                                radius: float = None, 
                                stop_count: int = 500, 
@@ -0,0 +1,175 @@
+import unittest
+import random
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from .poissonDiskSampling import (uniformBoundarySampling, uniformPoissonDiskSampling,
+                                  uniformPoissonDiskSamplingWithBoundary,
+                                  adaptivePoissonDiskSampling, adaptivePoissonDiskSamplingWithBoundary,
+                                  batchUniformDartThrowing, batchUniformDartThrowingWithBoundary,
+                                  batchAdaptiveDartThrowing, batchAdaptiveDartThrowingWithBoundary,
+                                  ambientSurfaceSampling, _greedyIndependent, _KDIndex)
+from ..geometries.euclidean3 import PointE3
+from .randomizedConvexHull import randomizedConvexHull
+
+def _nearestDistances(samples):
+    P = np.array(samples)
+    dists, _ = cKDTree(P).query(P, 2)
+    return dists[:, 1]
+
+def _adaptiveConflicts(samples):
+    P = np.array(samples)
+    pairs = cKDTree(P[:, :2]).query_pairs(P[:, 2].max(), output_type = "ndarray")
+    i, j = pairs[:, 0], pairs[:, 1]
+    return int(np.sum(np.linalg.norm(P[i, :2] - P[j, :2], axis = 1) <= np.maximum(P[i, 2], P[j, 2])))
+
+def _radius(x, y):
+    return 0.01 + 0.05 * x * y
+
+class TestPoissonDiskSampling(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+
+    def test_boundarySampling(self):
+        r = 0.07
+        samples = uniformBoundarySampling(r)
+        for corner in [(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)]:
+            self.assertIn(corner, samples)
+        self.assertGreater(_nearestDistances(samples).min(), r)
+        # Walking around the square, no gap leaves room for another sample
+        perimeter = sorted(x + y if y == 0 or x == 1 else 4 - x - y for x, y in samples)
+        self.assertLess(np.diff(perimeter + [4.0]).max(), 2 * r)
+
+    def test_uniformSampling(self):
+        r = 0.03
+        samples = uniformPoissonDiskSampling(r)
+        P = np.array(samples)
+        self.assertTrue(np.all((P >= 0) & (P <= 1)))
+        self.assertGreater(_nearestDistances(samples).min(), r)
+        # Nearly maximal: few points of a fine grid are farther than radius from every sample
+        g = np.linspace(0, 1, 101)
+        grid = np.stack(np.meshgrid(g, g), axis = -1).reshape(-1, 2)
+        uncovered = cKDTree(P).query(grid)[0] > r
+        self.assertLess(uncovered.mean(), 0.01)
+
+    def test_withBoundary(self):
+        r = 0.05
+        boundary = len(uniformBoundarySampling(r))
+        random.seed(0)
+        samples = uniformPoissonDiskSamplingWithBoundary(r)
+        self.assertGreater(len(samples), boundary)
+        self.assertTrue(all(x in (0.0, 1.0) or y in (0.0, 1.0) for x, y in samples[:boundary]))
+        self.assertGreater(_nearestDistances(samples).min(), r)
+
+    def test_initialSamplesUnchanged(self):
+        initial = [(0.5, 0.5)]
+        samples = uniformPoissonDiskSampling(0.1, initial_samples = initial)
+        self.assertEqual(initial, [(0.5, 0.5)])
+        self.assertEqual(samples[0], (0.5, 0.5))
+
+    def test_adaptiveSampling(self):
+        samples = adaptivePoissonDiskSampling(_radius)
+        P = np.array(samples)
+        self.assertTrue(np.all((P[:, :2] >= 0) & (P[:, :2] <= 1)))
+        self.assertTrue(np.allclose(P[:, 2], _radius(P[:, 0], P[:, 1])))
+        self.assertEqual(_adaptiveConflicts(samples), 0)
+        # Denser where the radius is small
+        small = np.sum((P[:, 0] < 0.5) & (P[:, 1] < 0.5))
+        large = np.sum((P[:, 0] > 0.5) & (P[:, 1] > 0.5))
+        self.assertGreater(small, 2 * large)
+
+    def test_adaptiveVectorized(self):
+        calls = []
+        def radius(xs, ys):
+            calls.append(len(xs))
+            return _radius(xs, ys)
+        samples = adaptivePoissonDiskSamplingWithBoundary(radius, vectorized = True)
+        self.assertEqual(_adaptiveConflicts(samples), 0)
+        self.assertGreater(max(calls), 1)
+        self.assertTrue(any(x in (0, 1) or y in (0, 1) for x, y, _ in samples))
+
+    def test_greedyIndependent(self):
+        rng = np.random.default_rng(1)
+        points, radii = rng.random((400, 2)), rng.uniform(0.02, 0.06, 400)
+        accepted = _greedyIndependent(points, radii)
+        # The same as accepting the darts one at a time
+        expected = []
+        for i in range(len(points)):
+            if all(np.linalg.norm(points[i] - points[j]) > max(radii[i], radii[j]) for j in expected):
+                expected.append(i)
+        self.assertEqual(np.flatnonzero(accepted).tolist(), expected)
+
+    def test_wideRadiusRange(self):
+        # Radii from 0.001 to 0.1, so the samples fall into several radius levels
+        rng = np.random.default_rng(2)
+        wide = lambda n: 0.001 * 100.0 ** rng.random(n)
+        samples, sampleRadii = rng.random((300, 2)), wide(300)
+        index = _KDIndex()
+        index.add(samples[:200], sampleRadii[:200])
+        index.add(samples[200:], sampleRadii[200:])
+        points, radii = rng.random((2000, 2)), wide(2000)
+        dists = np.linalg.norm(points[:, None, :] - samples[None, :, :], axis = 2)
+        expected = (dists <= np.maximum(radii[:, None], sampleRadii[None, :])).any(axis = 1)
+        self.assertEqual(index.conflicts(points, radii).tolist(), expected.tolist())
+
+        points, radii = points[:300], radii[:300]
+        expected = []
+        for i in range(len(points)):
+            if all(np.linalg.norm(points[i] - points[j]) > max(radii[i], radii[j]) for j in expected):
+                expected.append(i)
+        self.assertEqual(np.flatnonzero(_greedyIndependent(points, radii)).tolist(), expected)
+
+        radius = lambda x, y: 0.002 * 50.0 ** np.asarray(x)
+        P = np.array(batchAdaptiveDartThrowing(radius, batch_size = 500, seed = 5))
+        self.assertTrue(np.allclose(P[:, 2], radius(P[:, 0], P[:, 1])))
+        self.assertEqual(_adaptiveConflicts(P), 0)
+
+    def test_batchUniform(self):
+        r = 0.03
+        samples = batchUniformDartThrowing(r, batch_size = 500, seed = 7)
+        self.assertEqual(samples, batchUniformDartThrowing(r, batch_size = 500, seed = 7))
+        self.assertTrue(all(type(s) is tuple and len(s) == 2 for s in samples))
+        self.assertGreater(_nearestDistances(samples).min(), r)
+        self.assertGreater(len(samples), 0.5 * len(uniformPoissonDiskSampling(r)))
+
+        more = batchUniformDartThrowing(r, initial_samples = samples[:10], seed = 8)
+        self.assertEqual(more[:10], samples[:10])
+        self.assertGreater(_nearestDistances(more).min(), r)
+
+        boundary = batchUniformDartThrowingWithBoundary(r, seed = np.random.default_rng(3))
+        self.assertEqual(boundary[0][0] * boundary[0][1] * (1 - boundary[0][0]) * (1 - boundary[0][1]), 0)
+        self.assertGreater(_nearestDistances(boundary).min(), r)
+
+    def test_batchAdaptive(self):
+        samples = batchAdaptiveDartThrowing(_radius, batch_size = 500, seed = 7)
+        self.assertEqual(samples, batchAdaptiveDartThrowing(_radius, batch_size = 500, seed = 7))
+        P = np.array(samples)
+        self.assertTrue(np.allclose(P[:, 2], _radius(P[:, 0], P[:, 1])))
+        self.assertEqual(_adaptiveConflicts(samples), 0)
+        self.assertEqual(_adaptiveConflicts(batchAdaptiveDartThrowingWithBoundary(_radius, seed = 2)), 0)
+
+    def test_ambientSurfaceSampling(self):
+        rng = np.random.default_rng(0)
+        X = rng.normal(size = (300, 3))
+        X /= np.linalg.norm(X, axis = 1)[:, None]
+        sphere = randomizedConvexHull([PointE3(*x) for x in X.tolist()], seed = 0)
+        r = 0.1
+        samples = ambientSurfaceSampling(sphere, r, seed = 5)
+        self.assertTrue(all(isinstance(p, PointE3) for p in samples))
+        P = np.array([list(p) for p in samples])
+        self.assertTrue(np.array_equal(P, ambientSurfaceSampling(sphere, r, seed = 5, as_array = True)))
+        self.assertGreater(_nearestDistances(P).min(), r)
+        # On the hull: inside the sphere but close to it
+        norms = np.linalg.norm(P, axis = 1)
+        self.assertTrue(np.all((norms <= 1 + 1e-9) & (norms > 0.8)))
+        # Nearly maximal: few vertices are farther than radius from every sample
+        self.assertLess(np.mean(cKDTree(P).query(X)[0] > r), 0.02)
+
+        more = ambientSurfaceSampling(sphere, r, initial_samples = samples[:5], seed = 6)
+        self.assertEqual(more[:5], samples[:5])
+        self.assertGreater(_nearestDistances([list(p) for p in more]).min(), r)
+
+if __name__ == '__main__':
+    unittest.main()
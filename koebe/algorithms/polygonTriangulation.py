@@ -13,21 +13,35 @@ References;
 from koebe.datastructures.dcel import *
 from koebe.geometries.euclidean2 import PointE2, SegmentE2, PolygonE2
 from koebe.geometries.commonOps import orientation2, Orientation
+from koebe.geometries.batch import orientation2Batch, isPlainFloat
 
-from typing import List
+from typing import List, Tuple
+
+import numpy as np
 
 
 def leftHandTurn(p1: PointE2, p2: PointE2, p3: PointE2) -> bool:
     return (orientation2(p1.x, p1.y, p2.x, p2.y, p3.x, p3.y) 
             == Orientation.POSITIVE)
 
-def triangulateByEarClipping(dcelFace: Face):
+def triangulateByEarClipping(dcelFace: Face, useBatch: bool = True) -> List[Face]:
+    """Triangulates a simple polygonal face by ear clipping in O(n^2) time. 
+    
+    Args:
+        dcelFace: A face whose vertex .data are PointE2s in counterclockwise order. 
+        useBatch: If True (the default) and the coordinates are plain floats, the ear 
+            tests check all reflex vertices with one call to the vectorized predicates 
+            in koebe.geometries.batch. 
     
+    Returns:
+        The new triangles. dcelFace itself is reused as the last triangle. 
+    """
     dcel  = dcelFace.dcel
     darts = dcelFace.darts()
+    verts = [dart.origin for dart in darts]
     n     = len(darts)
     
-    def definingPoints(dart: Dart) -> Tuple[PointE2]:
+    def definingPoints(dart: Dart) -> Tuple[PointE2, PointE2, PointE2]:
         return dart.prev.origin.data, dart.origin.data, dart.dest.data
     
     def triContains(dart: Dart, vert: Vertex) -> bool: 
@@ -43,24 +57,52 @@ def triangulateByEarClipping(dcelFace: Face):
     def isReflex(dart: Dart) -> bool:
         return not leftHandTurn(*definingPoints(dart))
     
-    #convex = set([dart for dart in darts if isConvex(dart)])
-    reflex = set([dart for dart in darts if isReflex(dart)])
-    
-    def isEar(dart: Dart) -> bool:
-        if isReflex(dart):
-            return False
-        isAnEar = True
-        for r in reflex:
-            if triContains(dart, r):
-                isAnEar = False
-                break
-        return isAnEar
+    if useBatch and all(isPlainFloat(v.data.x) and isPlainFloat(v.data.y) for v in verts):
+        # The reflex vertices are kept as a mask over the coordinate array so that an 
+        # ear test is a single batch call over all of them. 
+        posOf  = dict((v, k) for k, v in enumerate(verts))
+        coords = np.array([(v.data.x, v.data.y) for v in verts], dtype = float)
+        ks     = np.arange(n)
+        reflexMask = (orientation2Batch(coords[ks - 1], coords, coords[(ks + 1) % n]) 
+                      != Orientation.POSITIVE.value)
+        
+        def setReflex(dart: Dart, value: bool):
+            reflexMask[posOf[dart.origin]] = value
+        
+        def isEar(dart: Dart) -> bool:
+            if reflexMask[posOf[dart.origin]]:
+                return False
+            R = coords[reflexMask]
+            p1, p2, p3 = [coords[posOf[v]] for v in (dart.pred, dart.origin, dart.dest)]
+            positive = Orientation.POSITIVE.value
+            inside = (  (orientation2Batch(p1, p2, R) == positive) 
+                      & (orientation2Batch(p2, p3, R) == positive)
+                      & (orientation2Batch(p3, p1, R) == positive))
+            return not inside.any()
+    else:
+        reflex = set([dart.origin for dart in darts if isReflex(dart)])
+        
+        def setReflex(dart: Dart, value: bool):
+            if value:
+                reflex.add(dart.origin)
+            else:
+                reflex.discard(dart.origin)
+        
+        def isEar(dart: Dart) -> bool:
+            if dart.origin in reflex:
+                return False
+            return not any(triContains(dart, r) for r in reflex)
     
     ears = set([dart for dart in darts if isEar(dart)])
     
+    newFaces = []
     for _ in range(n-3):
-        anEar = ears.pop()
+        anEar  = ears.pop()
+        before = anEar.prev
+        after  = anEar.next
         
+        # Cut the triangle before, anEar, newDart1 off along a new diagonal. newDart2 
+        # replaces before and anEar on the remaining polygon. 
         newFace  = Face(dcel, aDart = anEar)
         newEdge  = Edge(dcel)
         newDart1 = Dart(dcel, 
@@ -69,27 +111,28 @@ def triangulateByEarClipping(dcelFace: Face):
                         face = newFace)
         newDart2 = Dart(dcel, 
                         edge = newEdge,
-                        origin = anEar.prev.origin
-                        face = dcelFace)
-        newDart1.makeTwin(newDart2)
-        newDart2.makeNext(anEar.next)
-        newDart2.makePrev(anEar.prev.prev)
-        newDart1.makeNext(anEar.prev)
+                        origin = before.origin,
+                        face = dcelFace, 
+                        twin = newDart1)
+        newDart2.makePrev(before.prev)
+        newDart2.makeNext(after)
         newDart1.makePrev(anEar)
+        newDart1.makeNext(before)
+        anEar.face  = newFace
+        before.face = newFace
+        newFaces.append(newFace)
         
-        if anEar.prev in reflex: reflex.remove(anEar.prev)
-        elif anEar.prev in ears: ears.remove(anEar.prev)
-        
-        if isReflex(newDart2): reflex.add(newDart2)
-        elif isEar(newDart2): ears.add(newDart2)
-        
-        if isConvex(newDart2.next):
-            if newDart2.next in reflex:
-                reflex.remove(newDart2.next)
-            if newDart2.next not in ears and isEar(newDart2.next):
-                ears.add(newDart2.next)
-        
+        # Only the corners at the two ends of the diagonal changed. 
+        ears.discard(before)
+        for dart in (newDart2, after):
+            ears.discard(dart)
+            setReflex(dart, isReflex(dart))
+        for dart in (newDart2, after):
+            if isEar(dart):
+                ears.add(dart)
     
+    return newFaces
+
 from enum import Enum
 from heapq import *
 
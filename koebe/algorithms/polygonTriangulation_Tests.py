@@ -0,0 +1,36 @@
+import unittest
+import math
+import random
+
+from ..datastructures.dcel import DCEL
+from ..geometries.euclidean2 import PointE2
+from .polygonTriangulation import triangulateByEarClipping
+
+def _starPolygon(n, seed):
+    rng = random.Random(seed)
+    radii = [1 + rng.random() for _ in range(n)]
+    return [PointE2(r * math.cos(2 * math.pi * k / n), r * math.sin(2 * math.pi * k / n))
+            for k, r in enumerate(radii)]
+
+def _signedArea(points):
+    n = len(points)
+    return sum(points[i].x * points[(i+1) % n].y - points[(i+1) % n].x * points[i].y
+               for i in range(n)) / 2
+
+class TestEarClipping(unittest.TestCase):
+
+    def test_triangulatesStarPolygons(self):
+        for useBatch in (True, False):
+            for seed in range(5):
+                points = _starPolygon(40, seed)
+                dcel = DCEL.generateCycle(vdata = points)
+                face = dcel.faces[1]
+                tris = triangulateByEarClipping(face, useBatch)
+                self.assertEqual(len(tris), len(points) - 3)
+                areas = [_signedArea([v.data for v in tri.vertices()]) for tri in tris + [face]]
+                self.assertTrue(all(a > 0 for a in areas))
+                self.assertAlmostEqual(sum(areas), _signedArea(points))
+                self.assertEqual(dcel.eulerCharacteristic(), 2)
+
+if __name__ == '__main__':
+    unittest.main()
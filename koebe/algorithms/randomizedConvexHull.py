@@ -0,0 +1,239 @@
+"""Randomized incremental 3D convex hull with a conflict graph.
+
+The incremental hull in incrementalConvexHull tests every face of the current hull
+against every inserted point, which is O(n^2). This module inserts the points in
+random order and maintains a conflict graph between the not yet inserted points and
+the faces of the current hull: every point knows which faces it can see and every
+face knows which points can see it. Inserting a point then only touches the faces in
+its conflict list, and the conflicts of each new face are found among the conflicts
+of the two faces adjacent to its horizon edge. This gives expected O(n log n) time.
+
+The result has the same shape as incrConvexHull: a triangulated DCEL whose vertex
+.data are the input points on the hull, listed in input order. Any orientation
+predicate accepted by incrConvexHull works here as well.
+
+References:
+    Clarkson, K. L. and Shor, P. W. "Applications of random sampling in computational
+        geometry, II." Discrete & Computational Geometry 4, pp. 387-421, 1989.
+    de Berg, M., Cheong, O., van Kreveld, M., and Overmars, M.
+        Computational Geometry Algorithms and Applications, 3rd ed., Chapter 11.
+        Springer-Verlag Berlin Heidelberg, 2008.
+"""
+
+import random
+
+from fractions import Fraction
+from itertools import combinations
+
+import numpy as np
+
+from ..geometries.batch import orientation4Batch, orientation4Signs
+from .incrementalConvexHull import (incrConvexHull,
+                                    incrConvexHullOfFourPoints,
+                                    isVisible,
+                                    isCoplanar,
+                                    facesContaining,
+                                    batchCoordinates,
+                                    faceCorners,
+                                    removeVisibleRegion,
+                                    coneToHorizon,
+                                    orientationPointE3,
+                                    orientationPointOP3,
+                                    orientationDiskS2,
+                                    robustOrientationPointE3,
+                                    robustOrientationPointOP3,
+                                    robustOrientationDiskS2,
+                                    ROBUST_ORIENTATIONS,
+                                    BATCH_COORDINATES)
+
+# Conflict candidate lists shorter than this are tested with the scalar predicate,
+# longer ones with one batch predicate call.
+BATCH_THRESHOLD = 8
+
+# The built in orientation predicates by name.
+ORIENTATIONS = {
+    "PointE3":  orientationPointE3,
+    "PointOP3": orientationPointOP3,
+    "DiskS2":   orientationDiskS2,
+    "RobustPointE3":  robustOrientationPointE3,
+    "RobustPointOP3": robustOrientationPointOP3,
+    "RobustDiskS2":   robustOrientationDiskS2
+}
+
+class DegenerateInputError(Exception):
+    """Raised when all the input points are coplanar."""
+    pass
+
+def randomizedConvexHull(points, orientation = orientationPointE3, shuffle = True, seed = None,
+                         useBatch = True, keepCoplanar = False):
+    """Computes the 3D convex hull of a list of points by randomized incremental construction.
+
+    Args:
+        points: The list of points in some 3D point type.
+        orientation: (PointT, PointT, PointT, PointT) -> float. An orientation predicate, or
+            the name of one of the built in predicates in ORIENTATIONS ("PointE3", "PointOP3",
+            "DiskS2" and their exact versions "RobustPointE3", ...). Default is 
+            orientationPointE3.
+        shuffle: If True (the default), points are inserted in random order, which is what
+            gives the expected O(n log n) running time.
+        seed: Optional seed for the shuffle.
+        useBatch: If True (the default) and orientation is a built in predicate and the 
+            point coordinates are plain floats, conflicts are tested with the vectorized 
+            predicates in geometries.batch.
+        keepCoplanar: If True, points on the boundary of the hull are kept as hull vertices
+            (see incrConvexHull). Use with one of the exact robust predicates. Each point 
+            that sees no face then costs a scan of the hull faces.
+
+    Raises:
+        DegenerateInputError if there are at least four points and all of them are coplanar.
+
+    Returns:
+        The convex hull of the points as a DCEL.
+    """
+    if isinstance(orientation, str):
+        orientation = ORIENTATIONS[orientation]
+
+    n = len(points)
+    if n < 4:
+        return incrConvexHull(points, orientation, useBatch, keepCoplanar)
+
+    order = list(range(n))
+    if shuffle:
+        random.Random(seed).shuffle(order)
+
+    _moveInitialTetrahedronToFront(points, order, orientation)
+
+    ch = incrConvexHullOfFourPoints(*[points[i] for i in order[:4]], orientation)
+
+    # Remember the input index of each vertex so we can restore the input order.
+    inputIdx = {}
+    for v in ch.verts:
+        inputIdx[v] = next(i for i in order[:4] if points[i] is v.data)
+
+    # The conflict graph. faceConflicts[f] is the list of uninserted point indices that
+    # see face f, pointConflicts[i] is the set of faces seen by point i.
+    remaining = order[4:]
+    faceConflicts = dict((f, []) for f in ch.faces)
+    pointConflicts = dict((i, set()) for i in remaining)
+    
+    # With batch coordinates, coords[i] holds the homogeneous coordinates of points[i]
+    coordinatesOf = batchCoordinates(points, orientation) if useBatch else None
+    coords = (np.array([coordinatesOf(p) for p in points], dtype = float) 
+              if coordinatesOf != None else None)
+    
+    batchOrientation = orientation4Signs if orientation in ROBUST_ORIENTATIONS else orientation4Batch
+    
+    def visibleAmong(face, candidates):
+        if coords is None or len(candidates) < BATCH_THRESHOLD:
+            return [j for j in candidates if isVisible(face, points[j], orientation)]
+        c1, c2, c3 = faceCorners(face, coordinatesOf)
+        vals = batchOrientation(c1, c2, c3, coords[candidates])
+        return [candidates[k] for k in np.flatnonzero(vals < 0)]
+    
+    for f in ch.faces:
+        for i in visibleAmong(f, remaining):
+            faceConflicts[f].append(i)
+            pointConflicts[i].add(f)
+
+    for i in remaining:
+        visibleFaces = pointConflicts.pop(i)
+
+        # A point on the boundary of the hull sees no face, so with keepCoplanar the
+        # faces containing it are replaced instead (see incrementalConvexHull.addPoint).
+        # A new face in the plane of a replaced face has the same conflicts. 
+        if len(visibleFaces) == 0 and keepCoplanar:
+            coplanarFaces = [f for f in ch.faces if isCoplanar(f, points[i], orientation)]
+            visibleFaces = facesContaining(ch, coplanarFaces, points[i], orientation)
+
+        # No visible faces means the point is already inside the hull.
+        if len(visibleFaces) == 0:
+            continue
+
+        shadowBoundaryDarts = removeVisibleRegion(ch, visibleFaces)
+
+        # The candidates for conflicts with the new face on a horizon edge are the
+        # conflicts of the two faces that met along that edge.
+        horizonCandidates = [(dart.face, dart.twin.face) for dart in shadowBoundaryDarts]
+
+        v, newFaces = coneToHorizon(ch, points[i], shadowBoundaryDarts)
+        inputIdx[v] = i
+
+        for newFace, (shadowFace, visibleFace) in zip(newFaces, horizonCandidates):
+            candidates = []
+            seen = set()
+            for j in faceConflicts[shadowFace] + faceConflicts[visibleFace]:
+                if j != i and j not in seen:
+                    seen.add(j)
+                    candidates.append(j)
+            conflicts = visibleAmong(newFace, candidates)
+            for j in conflicts:
+                pointConflicts[j].add(newFace)
+            faceConflicts[newFace] = conflicts
+
+        # Finally, the visible faces are gone, so drop them from the conflict graph.
+        for f in visibleFaces:
+            for j in faceConflicts.pop(f):
+                if j != i:
+                    pointConflicts[j].discard(f)
+
+    ch.verts = sorted(ch.verts, key = lambda v: inputIdx[v])
+    ch.compact()
+    return ch
+
+def _hasFullRank(rows):
+    # Whether the rows (of exact numbers) are linearly independent, i.e. some maximal
+    # minor is non-zero.
+    def det(m):
+        if len(m) == 1:
+            return m[0][0]
+        return sum((-1) ** j * m[0][j] * det([row[:j] + row[j + 1:] for row in m[1:]])
+                   for j in range(len(m)) if m[0][j] != 0)
+    return any(det([[row[c] for c in cols] for row in rows]) != 0
+               for cols in combinations(range(len(rows[0])), len(rows)))
+
+def _moveInitialTetrahedronToFront(points, order, orientation):
+    """Reorders order so that its first four points have non-zero orientation.
+
+    For the built in predicates the points are compared through their homogeneous
+    coordinates (see incrementalConvexHull.BATCH_COORDINATES), in exact arithmetic: the
+    second point is the first one different from the first, the third the first one off
+    the line through those two and the fourth the first one off their plane. Each is
+    found in one pass over order. Other predicates only offer the orientation of four
+    points, so the first two points are kept and the other two are searched for, which
+    takes quadratic time when many points are collinear with the first two.
+
+    Raises:
+        DegenerateInputError if no such four points exist.
+    """
+    n = len(order)
+    coordinatesOf = BATCH_COORDINATES.get(orientation)
+
+    if coordinatesOf != None:
+        def exact(k):
+            return [Fraction(x) for x in coordinatesOf(points[order[k]])]
+
+        h0 = exact(0)
+        k1 = next((k for k in range(1, n) if _hasFullRank([h0, exact(k)])), n)
+        if k1 < n:
+            h1 = exact(k1)
+            k2 = next((k for k in range(k1 + 1, n) if _hasFullRank([h0, h1, exact(k)])), n)
+            if k2 < n:
+                p0, p1, p2 = points[order[0]], points[order[k1]], points[order[k2]]
+                k3 = next((k for k in range(k2 + 1, n) if orientation(p0, p1, p2, points[order[k]]) != 0), n)
+                if k3 < n:
+                    front = [order[0], order[k1], order[k2], order[k3]]
+                    order[:] = front + [order[m] for m in range(1, n) if m not in (k1, k2, k3)]
+                    return
+        raise DegenerateInputError("All of the input points are coplanar.")
+
+    # Look for a fourth point off the plane of the first three, replacing the third point
+    # if the first three happen to be collinear.
+    for k in range(2, n - 1):
+        p1, p2, p3 = points[order[0]], points[order[1]], points[order[k]]
+        for l in range(max(3, k + 1), n):
+            if orientation(p1, p2, p3, points[order[l]]) != 0:
+                front = [order[0], order[1], order[k], order[l]]
+                order[:] = front + [order[m] for m in range(2, n) if m != k and m != l]
+                return
+
+    raise DegenerateInputError("All of the input points are coplanar.")
@@ -0,0 +1,80 @@
+import unittest
+import random
+
+from ..geometries.euclidean3 import PointE3
+from .incrementalConvexHull import incrConvexHull, orientationPointE3, robustOrientationPointE3
+from .randomizedConvexHull import randomizedConvexHull, DegenerateInputError, _moveInitialTetrahedronToFront
+
+def _faceSet(ch, points):
+    idx = dict((id(p), i) for i, p in enumerate(points))
+    return set(frozenset(idx[id(v.data)] for v in f.vertices()) for f in ch.faces)
+
+class TestRandomizedConvexHull(unittest.TestCase):
+
+    def test_matchesIncrementalHull(self):
+        rng = random.Random(7)
+        points = [PointE3(rng.gauss(0, 1), rng.gauss(0, 1), rng.gauss(0, 1))
+                  for _ in range(300)]
+        expected = incrConvexHull(points, orientationPointE3)
+        for seed in range(3):
+            ch = randomizedConvexHull(points, seed = seed)
+            # Both have the same hull vertices; randomizedConvexHull lists them in input order
+            # (incrConvexHull may swap two of its first points).
+            self.assertEqual(set(map(id, (v.data for v in ch.verts))),
+                             set(map(id, (v.data for v in expected.verts))))
+            hullIdx = [points.index(v.data) for v in ch.verts]
+            self.assertEqual(hullIdx, sorted(hullIdx))
+            self.assertEqual(_faceSet(ch, points), _faceSet(expected, points))
+            self.assertEqual(ch.eulerCharacteristic(), 2)
+
+    def test_batchMatchesScalar(self):
+        rng = random.Random(11)
+        points = [PointE3(rng.gauss(0, 1), rng.gauss(0, 1), rng.gauss(0, 1))
+                  for _ in range(300)]
+        scalar = incrConvexHull(points, orientationPointE3, useBatch = False)
+        self.assertEqual(_faceSet(incrConvexHull(points, orientationPointE3), points), 
+                         _faceSet(scalar, points))
+        self.assertEqual(_faceSet(randomizedConvexHull(points, seed = 1, useBatch = False), points), 
+                         _faceSet(randomizedConvexHull(points, seed = 1), points))
+
+    def test_keepCoplanar(self):
+        # All 26 surface points of a 3x3x3 grid are hull vertices. The first four
+        # points are corners that are not coplanar. 
+        grid = sorted([(i, j, k) for i in range(3) for j in range(3) for k in range(3)], key = sum)
+        points = ([PointE3(*c) for c in grid if not 1 in c] 
+                  + [PointE3(*c) for c in grid if 1 in c and c != (1, 1, 1)])
+        for useBatch in (True, False):
+            ch = incrConvexHull(points, robustOrientationPointE3, useBatch, keepCoplanar = True)
+            self.assertEqual(len(ch.verts), 26)
+            self.assertEqual(ch.eulerCharacteristic(), 2)
+            ch = incrConvexHull(points, robustOrientationPointE3, useBatch)
+            self.assertEqual(len(ch.verts), 8)
+        ch = randomizedConvexHull(points, "RobustPointE3", seed = 3, keepCoplanar = True)
+        self.assertEqual(len(ch.verts), 26)
+
+    def test_orientationByName(self):
+        rng = random.Random(3)
+        points = [PointE3(rng.random(), rng.random(), rng.random()) for _ in range(50)]
+        ch = randomizedConvexHull(points, "PointE3", seed = 0)
+        self.assertEqual(len(ch.darts), 3 * len(ch.faces))
+
+    def test_coplanar(self):
+        points = [PointE3(i, j, 0) for i in range(3) for j in range(3)]
+        self.assertRaises(DegenerateInputError, randomizedConvexHull, points)
+
+    def test_degenerateStart(self):
+        rng = random.Random(5)
+        cloud = [PointE3(rng.gauss(0, 1), rng.gauss(0, 1), rng.gauss(0, 1)) for _ in range(20)]
+        # The first two points coincide and many points follow on one line
+        line = [PointE3(0, 0, 0), PointE3(0, 0, 0)] + [PointE3(t, 0, 0) for t in range(1, 3000)]
+        points = line + cloud
+        for orientation in (orientationPointE3, robustOrientationPointE3):
+            order = list(range(len(points)))
+            _moveInitialTetrahedronToFront(points, order, orientation)
+            self.assertEqual(order[:4], [0, 2, len(line), len(line) + 1])
+            self.assertEqual(sorted(order), list(range(len(points))))
+        ch = randomizedConvexHull(line[:30] + cloud, "RobustPointE3", shuffle = False)
+        self.assertEqual(ch.eulerCharacteristic(), 2)
+
+if __name__ == '__main__':
+    unittest.main()
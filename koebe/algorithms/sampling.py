@@ -7,6 +7,8 @@ import itertools
 import random
 import math
 
+import numpy as np
+
 def faceAreaE3(face):
     """Computes the area of a triangular DCEL face with vertex coordinates given
     as PointE3 objects.
@@ -49,41 +51,142 @@ def binarySearch(A, x):
             low = mid + 1
     return low
 
-def weightedIndexSampling1D(rho, n):
+ALIAS = "alias"
+SEARCHSORTED = "searchsorted"
+
+def _rng(seed):
+    # Without a seed, draw one from the random module so that random.seed still makes
+    # the samplings reproducible.
+    return np.random.default_rng(random.getrandbits(64) if seed is None else seed)
+
+class AliasTable:
+    """A Walker/Vose alias table for drawing indices of a density in O(1) time per draw.
+
+    Index i is kept with probability prob[i] and replaced by alias[i] otherwise, after drawing
+    i uniformly. Build the table once and pass it instead of the density to reuse it.
+
+    Args:
+        rho: An array (of any shape) of nonnegative densities, not all zero. Indices into the
+            flattened array are drawn in proportion to rho.
+
+    Attributes:
+        shape: The shape of rho.
+        prob: The probability of keeping each (flat) index.
+        alias: The index that replaces each index when it is not kept.
+    """
+
+    def __init__(self, rho):
+        rho = np.asarray(rho, dtype = float)
+        self.shape = rho.shape
+        n = rho.size
+        q = rho.ravel() * (n / rho.sum())
+        self.prob = np.ones(n)
+        self.alias = np.arange(n)
+
+        small, large = np.flatnonzero(q < 1.0), np.flatnonzero(q >= 1.0)
+        while len(small) > 0 and len(large) > 0:
+            # Lay the deficits 1 - q of the small indices and the surpluses q - 1 of the large
+            # ones end to end. Each small index takes the large one whose surplus holds the
+            # start of its deficit, which may leave that large index below 1 for the next round.
+            deficits = 1.0 - q[small]
+            host = np.searchsorted(np.cumsum(q[large] - 1.0), np.cumsum(deficits) - deficits, side = "right")
+            done = host < len(large)
+            s = small[done]
+            self.prob[s] = q[s]
+            self.alias[s] = large[host[done]]
+            q[large] -= np.bincount(host[done], deficits[done], minlength = len(large))
+            stillLarge = q[large] >= 1.0
+            small = np.concatenate([small[~done], large[~stillLarge]])
+            large = large[stillLarge]
+            if not done.any():
+                break
+        # What is left is 1 up to rounding and is always kept
+
+    def sample(self, n, seed = None):
+        """Draws n flat indices. seed is an int seed or a numpy.random.Generator."""
+        rng = _rng(seed)
+        idx = rng.integers(len(self.prob), size = n)
+        return np.where(rng.random(n) < self.prob[idx], idx, self.alias[idx])
+# END AliasTable
+
+class CumulativeTable:
+    """Draws indices of a density by binary search in its cumulative sums (O(log n) per draw).
+
+    Cheaper to build than an AliasTable, so better for densities that are only sampled a few
+    times. Takes the same arguments and has the same shape attribute and sample method.
+    """
+
+    def __init__(self, rho):
+        rho = np.asarray(rho, dtype = float)
+        self.shape = rho.shape
+        self.accSum = np.cumsum(rho.ravel())
+
+    def sample(self, n, seed = None):
+        """Draws n flat indices. seed is an int seed or a numpy.random.Generator."""
+        u = _rng(seed).random(n) * self.accSum[-1]
+        return np.minimum(np.searchsorted(self.accSum, u, side = "right"), len(self.accSum) - 1)
+# END CumulativeTable
+
+def samplingTable(rho, method = ALIAS):
+    """A table for drawing indices of the density rho with method ALIAS (the default) or SEARCHSORTED.
+
+    Raises:
+        ValueError if method is unknown.
+    """
+    if method == ALIAS:
+        return AliasTable(rho)
+    elif method == SEARCHSORTED:
+        return CumulativeTable(rho)
+    raise ValueError(f"Unknown sampling method {method}.")
+
+def _table(rho, method):
+    return rho if isinstance(rho, (AliasTable, CumulativeTable)) else samplingTable(rho, method)
+
+def weightedIndexSampling1D(rho, n, method = ALIAS, seed = None, as_array = False):
     """Samples in range(0,len(rho)) where the probability that a given index i is drawn is rho[i] / sum(rho)
     
     Args:
         rho: (List[float]) A density function defined over the indices where each rho[i] > 0 and rho[i] represents the density at index i. 
+            May be a numpy array, or a table returned by samplingTable(rho) to reuse it.
         n: int The number of samples to draw. 
+        method: ALIAS (the default) or SEARCHSORTED, see samplingTable. Ignored if rho is a table.
+        seed: An int seed or a numpy.random.Generator, None to seed from the random module.
+        as_array: Return the samples as a numpy array instead of a list.
     """
-    acc = [0] + list(itertools.accumulate(rho))
-    samples = [binarySearch(acc, random.random() * acc[-1]) - 1 for _ in range(n)]
-    return samples
+    samples = _table(rho, method).sample(n, seed)
+    return samples if as_array else samples.tolist()
 
-def weightedIndexSampling2D(rho, n):
+def weightedIndexSampling2D(rho, n, method = ALIAS, seed = None, as_array = False):
     """Samples the index set (i, j) of indices into the 2D list rho. The samples will be indices (i, j) into rho.
     
     Args:
         rho: (List[List[float]]) A 2D density function defined over the indices where each rho[i][j] > 0 and rho[i][j] represents the density at index (i, j). 
+            May be a 2D numpy array, or a table returned by samplingTable(rho) to reuse it.
         n: int The number of samples to draw. 
+        method: ALIAS (the default) or SEARCHSORTED, see samplingTable. Ignored if rho is a table.
+        seed: An int seed or a numpy.random.Generator, None to seed from the random module.
+        as_array: Return the samples as an n by 2 numpy array instead of a list of tuples.
     """
-    indices = [(i, j) for i in range(len(rho)) for j in range(len(rho[i]))]
-    flattened_rho = [rho[i][j] for i, j in indices]
-    flattened_samples = weightedIndexSampling1D(flattened_rho, n)
-    samples = [indices[i] for i in flattened_samples]
-    return samples
+    table = _table(rho, method)
+    samples = np.column_stack(np.unravel_index(table.sample(n, seed), table.shape))
+    return samples if as_array else list(map(tuple, samples.tolist()))
 
-def weightedSubgridSampling2D(rho, n):
+def weightedSubgridSampling2D(rho, n, method = ALIAS, seed = None, as_array = False):
     """Samples a grid using a 2D density function rho. First each grid index (i, j) is drawn using the proportion of the 
     density at rho[i][j]. Then a uniform sample of that grid index (i + random.random(), j + random.random()) is selected.
     
     Args:
         rho: (List[List[float]]) A 2D density function defined over the indices where each rho[i][j] > 0 and rho[i][j] represents the density at index (i, j). 
+            May be a 2D numpy array, or a table returned by samplingTable(rho) to reuse it.
         n: int The number of samples to draw. 
+        method: ALIAS (the default) or SEARCHSORTED, see samplingTable. Ignored if rho is a table.
+        seed: An int seed or a numpy.random.Generator, None to seed from the random module.
+        as_array: Return the samples as an n by 2 numpy array instead of a list of tuples.
     """
-    indices = weightedIndexSampling2D(rho, n)
-    samples = [(i + random.random(), j + random.random()) for i, j in indices]
-    return samples
+    rng = _rng(seed)
+    indices = weightedIndexSampling2D(rho, n, method, rng, as_array = True)
+    samples = indices + rng.random((n, 2))
+    return samples if as_array else list(map(tuple, samples.tolist()))
     
 def surfaceSampling(dcel, nsamples, face_weight_function = faceAreaE3, face_sampling_function = uniformTriangleSampleE3):
     """Computes a sampling of a DCEL. Faces are weighted using the face_weight_function and a 
@@ -0,0 +1,61 @@
+import unittest
+import random
+
+import numpy as np
+
+from .sampling import (AliasTable, CumulativeTable, samplingTable, weightedIndexSampling1D,
+                       weightedIndexSampling2D, weightedSubgridSampling2D, ALIAS, SEARCHSORTED)
+
+def _tableProbabilities(table):
+    # The exact probability of drawing each index from an AliasTable
+    n = len(table.prob)
+    return (np.bincount(np.arange(n), table.prob / n, minlength = n)
+            + np.bincount(table.alias, (1.0 - table.prob) / n, minlength = n))
+
+class TestSampling(unittest.TestCase):
+
+    def test_aliasTable(self):
+        rng = np.random.default_rng(0)
+        densities = [rng.random(500),
+                     rng.random(500) ** 10,
+                     np.concatenate([[1000.0], np.ones(499)]),
+                     np.concatenate([np.zeros(250), rng.random(250)]),
+                     np.ones(7)]
+        for rho in densities:
+            table = AliasTable(rho)
+            self.assertTrue(np.allclose(_tableProbabilities(table), rho / rho.sum(), rtol = 0, atol = 1e-12))
+
+    def test_methods(self):
+        rho = np.array([1.0, 0.0, 3.0, 6.0])
+        for method in (ALIAS, SEARCHSORTED):
+            samples = weightedIndexSampling1D(rho, 100000, method, seed = 1)
+            self.assertIsInstance(samples, list)
+            counts = np.bincount(samples, minlength = 4) / len(samples)
+            self.assertTrue(np.allclose(counts, rho / rho.sum(), atol = 0.01))
+            self.assertEqual(counts[1], 0)
+        with self.assertRaises(ValueError):
+            samplingTable(rho, "unknown")
+
+    def test_reproducible(self):
+        rho = [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]]
+        self.assertEqual(weightedIndexSampling2D(rho, 50, seed = 3), weightedIndexSampling2D(rho, 50, seed = 3))
+        random.seed(4)
+        first = weightedSubgridSampling2D(rho, 50)
+        random.seed(4)
+        self.assertEqual(first, weightedSubgridSampling2D(rho, 50))
+
+    def test_2D(self):
+        rho = np.zeros((30, 40))
+        rho[3, 5] = 1.0
+        rho[20, 31] = 3.0
+        table = CumulativeTable(rho)
+        indices = weightedIndexSampling2D(table, 1000, seed = 0)
+        self.assertEqual(set(indices), {(3, 5), (20, 31)})
+        self.assertAlmostEqual(indices.count((20, 31)) / 1000, 0.75, delta = 0.05)
+
+        samples = weightedSubgridSampling2D(samplingTable(rho), 1000, seed = 0, as_array = True)
+        self.assertEqual(samples.shape, (1000, 2))
+        self.assertEqual(set(map(tuple, np.floor(samples).astype(int).tolist())), {(3, 5), (20, 31)})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+#
+# Circle packings of closed triangulated spheres.
+#
+# A closed triangulation with one vertex removed is a triangulated disk. Its
+# hyperbolic maximal packing (computed with the array engine of
+# hypPackerNumpy), viewed as euclidean circles in the Poincaré disk, is
+# tangent to the unit circle exactly at the neighbors of the removed vertex.
+# Lifting the unit disk to a hemisphere by stereographic projection turns these
+# circles into spherical caps and the removed vertex into the complementary
+# hemisphere, which gives the packing of the whole sphere (a Koebe-Andreev-
+# Thurston packing, unique up to Möbius transformations).
+#
+
+import math
+
+from typing import Callable, Optional
+
+import numpy as np
+
+from ..datastructures.dcel import DCEL
+from ..datastructures.arrayDCEL import ArrayDCEL
+from ..geometries.spherical2 import DiskS2
+from .packingArrays import PackingCorners
+from .packingLayout import layoutCircles
+from .hypPacker import PackingError
+from .packingMonitor import PassStats
+from .hypPackerNumpy import ArrayPacker, GAUSS_SEIDEL, ITERATIVE, NEWTON, METHODS
+
+def poincareToEuclidean(z: np.ndarray, x: np.ndarray) -> (np.ndarray, np.ndarray):
+    """Converts hyperbolic circles of the Poincaré disk to euclidean circles.
+
+    Args:
+        z: The hyperbolic centers (for horocycles the point of tangency with the unit
+            circle) as returned by packingLayout.layoutCircles.
+        x: The x-radii as returned by packingLayout.layoutCircles (minus the euclidean radius
+            for horocycles).
+
+    Returns:
+        (centers, radii) of the euclidean circles.
+    """
+    z = np.asarray(z, dtype = np.complex128)
+    x = np.asarray(x, dtype = float)
+    centers = np.empty_like(z)
+    radii = np.empty_like(x)
+
+    horo = x <= 0
+    radii[horo] = -x[horo]
+    centers[horo] = z[horo] * (1.0 - radii[horo])
+
+    finite = ~horo
+    zf, xf = z[finite], x[finite]
+    s = np.sqrt(1.0 - xf)
+    absSq = np.abs(zf) ** 2
+    n1 = (1.0 + s) ** 2
+    n2 = n1 - absSq * xf * xf / n1
+    radii[finite] = np.abs(xf * (1.0 - absSq) / n2)
+    centers[finite] = 4.0 * s / n2 * zf
+    return centers, radii
+
+def euclideanToDisksS2(centers: np.ndarray, radii: np.ndarray) -> np.ndarray:
+    """Lifts euclidean disks to spherical caps by inverse stereographic projection.
+
+    Uses the same projection as orientedProjective2.DiskOP2.toDiskS2. Each row is scaled so
+    that (a, b, c) is the unit center of the cap and d is minus the cosine of its radius
+    (as in spherical2.DiskS2.withCenterAndRadiusS2).
+
+    Returns:
+        An n by 4 array with the coefficients (a, b, c, d) of the DiskS2s.
+    """
+    centers = np.asarray(centers, dtype = np.complex128)
+    cx, cy = centers.real, centers.imag
+    d = cx * cx + cy * cy - np.asarray(radii, dtype = float) ** 2
+    coeffs = np.column_stack([1.0 - d, -2.0 * cy, -2.0 * cx, -(1.0 + d)])
+    return coeffs / np.linalg.norm(coeffs[:, :3], axis = 1)[:, None]
+
+def capTangencyErrors(disks: np.ndarray, corners: PackingCorners) -> np.ndarray:
+    """How far the caps of neighboring vertices are from being tangent.
+
+    Args:
+        disks: The normalized cap coefficients returned by euclideanToDisksS2.
+        corners: The corners of the triangulation.
+
+    Returns:
+        For every corner, the difference between the angle between the cap centers of its
+        first two vertices and the sum of their cap radii.
+    """
+    u, w = corners.origin, corners.dest
+    normals = disks[:, :3]
+    rho = np.arccos(np.clip(-disks[:, 3], -1.0, 1.0))
+    cosAngle = np.clip(np.sum(normals[u] * normals[w], axis = 1), -1.0, 1.0)
+    return np.abs(np.arccos(cosAngle) - rho[u] - rho[w])
+
+def sphericalPacking(closedDcel: DCEL,
+                     infinityVertex: int = -1,
+                     num_passes: int = 1000,
+                     tolerance: float = 3e-10,
+                     centerDartIdx: int = -1,
+                     schedule: str = GAUSS_SEIDEL,
+                     method: str = ITERATIVE,
+                     averagePlacements: bool = False,
+                     callback: Optional[Callable[[PassStats], bool]] = None) -> (DCEL, int):
+    """Computes a circle packing of a triangulated sphere.
+
+    Args:
+        closedDcel: The input DCEL. Should be a triangulation of the sphere (every face a
+            triangle, no outer face).
+        infinityVertex: The index of the vertex whose cap is the hemisphere opposite to
+            (1, 0, 0), -1 for a vertex of largest degree.
+        num_passes: maximum number of sweeps (or Newton steps) to perform. Default is 1000.
+        tolerance: the tolerance for which the average angle sum error must fall below.
+        centerDartIdx: The index of a dart of the disk closedDcel minus infinityVertex to
+            lay out from the origin, -1 to pick one.
+        schedule: JACOBI or GAUSS_SEIDEL (the default).
+        method: ITERATIVE (the default) or NEWTON.
+        averagePlacements: Whether to average multiple placements (see
+            packingLayout.layoutCircles).
+        callback: Called with a packingMonitor.PassStats after every sweep (or Newton step).
+            Returning True stops the packing.
+
+    Raises:
+        ValueError if method is unknown.
+        PackingError if every vertex is infinityVertex or one of its neighbors (as in the
+        tetrahedron), which leaves nothing to pack.
+
+    Returns:
+        A tuple (dcel, loopCount) where dcel is a new DCEL structure where each vertex
+        stores a DiskS2 as its .data object and loopCount is the number of sweeps (or
+        Newton steps) performed. The largest difference between the angle between two
+        neighboring cap centers and the sum of their radii is recorded as
+        dcel.maxTangencyError.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown packing method {method}.")
+    n = len(closedDcel.verts)
+    if infinityVertex < 0:
+        infinityVertex = int(np.argmax(PackingCorners.fromDCEL(closedDcel).degrees()))
+
+    disk = closedDcel.duplicate(
+               vdata_transform = (lambda v : None),
+               edata_transform = (lambda e : None),
+               fdata_transform = (lambda f : None)
+           )
+    disk.outerFace = disk.verts[infinityVertex].remove()
+    adcel = ArrayDCEL.fromDCEL(disk)
+    corners = PackingCorners.fromArrayDCEL(adcel)
+
+    aim = np.full(n - 1, 2.0 * math.pi)
+    x = np.full(n - 1, 0.5)
+    boundary = np.unique(adcel.dart_origin[adcel.dart_face == adcel.outer_face])
+    aim[boundary] = -1.0
+    x[boundary] = -5.0
+
+    packer = ArrayPacker(corners, aim, schedule)
+    if method == NEWTON:
+        loopIdx = packer.newton(x, num_passes, tolerance, callback)
+    else:
+        loopIdx = packer.repack(x, num_passes, tolerance, callback)
+
+    if centerDartIdx < 0:
+        centerDartIdx = adcel.vert_adart[packer.packed[0]]
+    centerOrigin = adcel.dart_origin[centerDartIdx]
+    centerDest = adcel.dart_origin[adcel.dart_next[centerDartIdx]]
+    if aim[centerOrigin] < 0:
+        raise PackingError("The center dart must start at an interior vertex.")
+    layout = layoutCircles(corners, x, centerOrigin, centerDest, averagePlacements)
+
+    disks = np.empty((n, 4))
+    others = np.delete(np.arange(n), infinityVertex) # The closed index of each disk vertex
+    disks[others] = euclideanToDisksS2(*poincareToEuclidean(layout.centers, layout.radii))
+    disks[infinityVertex] = (-1.0, 0.0, 0.0, 0.0)
+
+    dcel = closedDcel.duplicate(
+               vdata_transform = (lambda v : None),
+               edata_transform = (lambda e : None),
+               fdata_transform = (lambda f : None)
+           )
+    for v, (a, b, c, d) in zip(dcel.verts, disks):
+        v.data = DiskS2(float(a), float(b), float(c), float(d))
+    dcel.maxTangencyError = float(capTangencyErrors(disks, PackingCorners.fromDCEL(dcel)).max())
+
+    return dcel, loopIdx
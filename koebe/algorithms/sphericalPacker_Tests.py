@@ -0,0 +1,56 @@
+import unittest
+import math
+
+import numpy as np
+
+from ..geometries.spherical2 import DiskS2
+from ._testMeshes import sphere
+from .hypPacker import PackingError
+from .hypPackerNumpy import NEWTON
+from .packingArrays import PackingCorners
+from .sphericalPacker import poincareToEuclidean, sphericalPacking
+
+def _caps(packing):
+    normals = np.array([[v.data.a, v.data.b, v.data.c] for v in packing.verts])
+    radii = np.arccos(np.array([-v.data.d for v in packing.verts]))
+    return normals, radii
+
+class TestSphericalPacker(unittest.TestCase):
+
+    def test_poincareToEuclidean(self):
+        # A circle at the origin of hyperbolic radius r has euclidean radius tanh(r / 2)
+        r = 0.7
+        centers, radii = poincareToEuclidean([0j, 1j], [1.0 - math.exp(-2 * r), -0.25])
+        np.testing.assert_allclose(radii, [math.tanh(r / 2), 0.25])
+        np.testing.assert_allclose(centers, [0j, 0.75j])
+
+    def test_tangency(self):
+        dcel = sphere(120)
+        for infinityVertex in (-1, 7):
+            packing, _ = sphericalPacking(dcel, infinityVertex, tolerance = 1e-12, method = NEWTON)
+            self.assertTrue(all(isinstance(v.data, DiskS2) for v in packing.verts))
+            self.assertLess(packing.maxTangencyError, 1e-8)
+            normals, radii = _caps(packing)
+            np.testing.assert_allclose(np.linalg.norm(normals, axis = 1), 1.0)
+            # Neighboring caps touch, the others are disjoint
+            corners = PackingCorners.fromDCEL(packing)
+            neighbors = set(zip(corners.origin.tolist(), corners.dest.tolist()))
+            angles = np.arccos(np.clip(normals @ normals.T, -1.0, 1.0))
+            gaps = angles - radii[:, None] - radii[None, :]
+            for i in range(len(radii)):
+                for j in range(i + 1, len(radii)):
+                    if (i, j) in neighbors:
+                        self.assertAlmostEqual(gaps[i, j], 0.0, places = 8)
+                    else:
+                        self.assertGreater(gaps[i, j], 0.0)
+        self.assertTrue(np.allclose(normals[7], (-1.0, 0.0, 0.0)))
+        self.assertAlmostEqual(radii[7], math.pi / 2)
+
+    def test_smallSpheres(self):
+        packing, _ = sphericalPacking(sphere(6))
+        self.assertLess(packing.maxTangencyError, 1e-8)
+        with self.assertRaises(PackingError):
+            sphericalPacking(sphere(4))
+
+if __name__ == '__main__':
+    unittest.main()
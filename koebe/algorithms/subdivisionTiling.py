@@ -550,7 +550,7 @@ def TilingViewer(packing, showCirclePacking = True, showTriangulation = True, si
     return viewer
 
 
-def generateCirclePackingLayout(tiling, num_passes = 1000, centerDartIdx = -1):
+def generateCirclePackingLayout(tiling, num_passes = 1000, centerDartIdx = -1, previousPacking = None, multilevel = False):
     # To circle pack we will have to triangulate each face, which adds
     # a new vertex for each face. We store the current vertex count
     # so we can distinguish between these new vertices and the originals
@@ -562,12 +562,40 @@ def generateCirclePackingLayout(tiling, num_passes = 1000, centerDartIdx = -1):
     starTriangulateAllFaces(duplicate_tiling)
 
     # Do the hyperbolic maximal circle packing
-    from koebe.algorithms.hypPacker import maximalPacking
-    packing, _ = maximalPacking(
-        duplicate_tiling, 
-        num_passes=num_passes,
-        centerDartIdx=centerDartIdx
-    )
+    if multilevel:
+        # Pack the coarser subdivision levels first and use them to solve the
+        # finest one (see multilevelPacking)
+        from koebe.algorithms.multilevelPacking import multilevelRadii
+        from koebe.algorithms.hypPackerNumpy import warmStartPacking
+        radii, _ = multilevelRadii(tiling, num_passes=num_passes)
+        packing, _ = warmStartPacking(
+            duplicate_tiling, 
+            list(radii), 
+            changed=[],
+            centerDartIdx=centerDartIdx
+        )
+    elif previousPacking == None:
+        from koebe.algorithms.hypPacker import maximalPacking
+        packing, _ = maximalPacking(
+            duplicate_tiling, 
+            num_passes=num_passes,
+            centerDartIdx=centerDartIdx
+        )
+    else:
+        # Warm start from a packing returned by an earlier call, e.g. for a coarser
+        # level of the same tiling. Tile vertices keep their indices when the tiling
+        # is subdivided but the star triangulation vertices do not, so only the
+        # tile vertices are seeded with their previous radii. 
+        from koebe.algorithms.hypPackerNumpy import warmStartPacking
+        previousRadii = dict((vIdx, v.data.xRadius) 
+                             for vIdx, v in enumerate(previousPacking.verts) 
+                             if v.is_tile_vertex)
+        packing, _ = warmStartPacking(
+            duplicate_tiling, 
+            previousRadii, 
+            num_passes=num_passes,
+            centerDartIdx=centerDartIdx
+        )
 
     # Annotate each vertex with whether it is an original tile vertex
     # (i.e. .is_tile_vertex == True) or is one of the vertices added
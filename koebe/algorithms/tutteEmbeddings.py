@@ -1,116 +1,180 @@
 from koebe.geometries.euclidean2 import PointE2
 
-from scipy.sparse import coo_matrix
-from scipy.sparse.linalg import inv
+from scipy.sparse import diags
+from scipy.sparse.linalg import splu, cg
 import numpy as np
 import math
 
-def sparse_laplacian(self, verbose=False):
-    if verbose: print("Creating vertToIdx array...")
-    vertToIdx = dict((v, k) for k, v in enumerate(self.verts))
-    if verbose: print("Creating vertToDeg array...")
-    vertToDeg = [len(v.outDarts()) for v in self.verts]
-    if verbose: print("Creating mat...")
-    #mat = [[0 for _ in range(len(self.verts))] for _ in range(len(self.verts))]
-    
-    row_array = []
-    col_array = []
-    dat_array = []
-
-    if verbose: print("Done.")
-    for i in range(len(self.verts)):
-        u = self.verts[i]
-        neighbors = u.neighbors()
-        
-        #mat[i][i] = len(neighbors)
-        row_array.append(i)
-        col_array.append(i)
-        dat_array.append(len(neighbors))
-        
-        for v in neighbors:
-            row_array.append(i)
-            col_array.append(vertToIdx[v])
-            dat_array.append(-1)
-    
-    if verbose: print(f"Returning coo_matrix with shape ({len(self.verts)}, {len(self.verts)})")
-    return coo_matrix((np.array(dat_array), (np.array(row_array), np.array(col_array))), shape=(len(self.verts), len(self.verts))).tocsc()
-
-def tutteEmbeddingE2(graphDCEL, in_place = False, verbose = False):
-    """Computes a Tutte embedding of a graph. The vertices incident to graphDCEL.outerFace
-    are evenly spaced along the unit circle. The locations of the vertices are given as PointE2 objects.
-    
-    Args:
-        graphDCEL: The graph to embed. It should be topologically a disk. The outer face is placed in convex position.
-        in_place: Defaults to False. If set to True, then the graphDCEL object is not duplicated before embedding, and
-            and the vertex data for each vertex is replaced with Euclidean points for the embedding.
-    Returns:
-        A DCEL with vertex data set to the point locations for the Tutte embedding. If in_place is False, the combinatorics
-        are a duplicate of the input graphDCEL. Otherwise, it simply returns a handle to graphDCEL. 
-    """
-    if not in_place:
-        if verbose: print("Duplicating DCEL...")
-        graph = graphDCEL.duplicate()
-        if verbose: print("done.")
-    else:
-        graph = graphDCEL
-    
-    for vIdx in range(len(graph.verts)): 
-        graph.verts[vIdx]._original_idx = vIdx
-    
-    if verbose: print("Reordering vertices...")
-    graph.reorderVerticesByBoundaryFirst()
-    if verbose: print("done.")
-
-    boundaryVerts = graph.boundaryVerts()
-
-    k = len(boundaryVerts)
-    
-    if verbose: print("Laying out boundary...")
-    boundaryCoords = [[math.cos(theta), math.sin(theta)]
-                      for theta in [i * 2 * math.pi / k for i in range(k)]]
-    if verbose: print("done.")
-    
-    if verbose: print("Computing graph laplacian...")
-    L = sparse_laplacian(graph, verbose)
-    if verbose: print("done.")
+SPLU = "splu"
+CG = "cg"
 
-    if verbose: print("Computing Tutte embedding...")
+def sparse_laplacian(self, verbose=False, weight=None):
+    """The (weighted) graph Laplacian of a DCEL as a sparse CSC matrix.
 
-    if verbose: print("Computing P1...")
-    P1 = np.matrix(boundaryCoords)
+    Row and column i belong to self.verts[i]. The off-diagonal entry of two neighbors is minus
+    the weight of the edge between them (summed over parallel edges) and each diagonal entry
+    is the sum of the weights of the edges at the vertex.
 
-    if verbose: print("Computing L1...")
-    L1 = L[0:k, 0:k]
+    Args:
+        verbose: Print progress.
+        weight: None for unit weights, or any weight accepted by DCEL.weightedLaplacian: a
+            function weight(u, v), a sequence of per-dart or per-edge weights, or a name such
+            as laplacians.COTANGENT.
+    """
+    n = len(self.verts)
+    if verbose: print(f"Returning sparse matrix with shape ({n}, {n})")
+    L = self.laplacian() if weight is None else self.weightedLaplacian(weight)
+    return L.tocsc()
 
-    if verbose: print("Computing B...")
-    B = L[k:,0:k]
+def circleBoundary(k):
+    """k points evenly spaced counterclockwise on the unit circle, starting at (1, 0), as a k by 2 array."""
+    theta = np.arange(k) * (2 * math.pi / k)
+    return np.column_stack([np.cos(theta), np.sin(theta)])
 
-    if verbose: print("Computing L2...")
-    L2 = L[k:,k:]
+class TutteEmbedder:
+    """Tutte (harmonic) embeddings of one graph for many boundary placements.
 
-    if verbose: print("Computing -inv(L2)")
-    nInvL2 = -inv(L2)
+    The interior block L2 of the Laplacian is factorized once, so each embedding
+    (see embed and positions) costs a single back-substitution. Any number of boundary
+    placements can be solved at once, and the boundary coordinates may have any dimension.
 
-    if verbose: print("Computing nInvL2*B*P1")
-    P2 = nInvL2*B*P1
+    Args:
+        graphDCEL: The graph to embed. It should be topologically a disk. Only its combinatorics
+            are used, so it should not be changed while the embedder is in use.
+        weight: The edge weights (see sparse_laplacian), None for the standard Tutte embedding.
+        solver: SPLU (the default) to factorize L2 or CG for conjugate gradients with a Jacobi
+            preconditioner (nothing is factorized, every solve iterates).
+        tolerance: The relative residual CG stops at.
+        verbose: Print progress.
+
+    Attributes:
+        graph: graphDCEL.
+        boundary: The indices in graph.verts of the boundary vertices, in the order of
+            graph.boundaryVerts(), which is the order boundary coordinates are given in.
+        interior: The indices of the interior vertices.
+
+    Raises:
+        ValueError if solver is unknown.
+    """
 
-    if verbose: print("Concatenating P1 and P2")
-    P = np.concatenate((P1, P2))
+    def __init__(self, graphDCEL, weight = None, solver = SPLU, tolerance = 1e-10, verbose = False):
+        if solver not in (SPLU, CG):
+            raise ValueError(f"Unknown solver {solver}.")
+        self.graph = graphDCEL
+        self.solver = solver
+        self.tolerance = tolerance
+
+        if verbose: print("Finding boundary...")
+        graphDCEL.verts.compact()
+        self.boundary = np.array([v.idx for v in graphDCEL.boundaryVerts()], dtype=np.int64)
+        isInterior = np.ones(len(graphDCEL.verts), dtype=bool)
+        isInterior[self.boundary] = False
+        self.interior = np.flatnonzero(isInterior)
+
+        if verbose: print("Computing graph laplacian...")
+        L = sparse_laplacian(graphDCEL, verbose, weight).tocsr()
+        L_interior = L[self.interior]
+        self._B = L_interior[:, self.boundary].tocsc()
+        self._L2 = L_interior[:, self.interior].tocsc()
+
+        self._lu = None
+        if solver == SPLU and len(self.interior) > 0:
+            if verbose: print("Factorizing L2...")
+            self._lu = splu(self._L2)
+        if verbose: print("done.")
 
-    if verbose: print("done.")
+    @property
+    def numBoundary(self):
+        return len(self.boundary)
+
+    def _solve(self, rhs):
+        if self._lu is not None:
+            return self._lu.solve(rhs)
+        # Conjugate gradients with a Jacobi preconditioner (L2 is symmetric positive definite)
+        preconditioner = diags(1.0 / self._L2.diagonal())
+        columns = []
+        for j in range(rhs.shape[1]):
+            x, info = cg(self._L2, rhs[:, j], rtol=self.tolerance, M=preconditioner)
+            if info != 0:
+                raise RuntimeError(f"Conjugate gradients did not converge (info = {info}).")
+            columns.append(x)
+        return np.column_stack(columns)
+
+    def positions(self, boundaryCoords = None):
+        """Computes the positions of all vertices for the given boundary placement(s).
+
+        Args:
+            boundaryCoords: A k by d array with the position of each boundary vertex (in the order
+                of self.boundary), or an m by k by d array of m placements to solve at once.
+                Default is circleBoundary(k).
+
+        Returns:
+            An n by d array (or m by n by d for m placements) whose row i is the position of
+            graph.verts[i].
+        """
+        P1 = circleBoundary(self.numBoundary) if boundaryCoords is None else np.asarray(boundaryCoords, dtype=float)
+        batched = P1.ndim == 3
+        if not batched:
+            P1 = P1[None]
+        m, k, d = P1.shape
+        if k != self.numBoundary:
+            raise ValueError(f"Expected coordinates for {self.numBoundary} boundary vertices, got {k}.")
+
+        # The placements side by side as the columns of one k by m*d right hand side
+        columns = P1.transpose(1, 0, 2).reshape(k, m * d)
+        P = np.empty((len(self.graph.verts), m * d))
+        P[self.boundary] = columns
+        if len(self.interior) > 0:
+            P[self.interior] = self._solve(-(self._B @ columns))
+        P = P.reshape(-1, m, d).transpose(1, 0, 2)
+        return P if batched else P[0]
+
+    def embed(self, boundaryCoords = None, in_place = False):
+        """Computes a Tutte embedding for the given boundary placement (see tutteEmbeddingE2).
+
+        Args:
+            boundaryCoords: A k by 2 array of boundary positions (see positions).
+            in_place: If True the points are stored as .tutte_data on the vertices of self.graph,
+                otherwise as .data on the vertices of a duplicate.
+
+        Returns:
+            The DCEL holding the points.
+        """
+        P = self.positions(boundaryCoords)
+        graph = self.graph if in_place else self.graph.duplicate()
+        for v, (x, y) in zip(graph.verts, P):
+            if not in_place:
+                v.data = PointE2(x, y)
+            else:
+                v.tutte_data = PointE2(x, y)
+        return graph
+# END TutteEmbedder
+
+def tutteEmbeddingE2(graphDCEL, in_place = False, verbose = False, weight = None, solver = SPLU, tolerance = 1e-10):
+    """Computes a Tutte embedding of a graph. The vertices incident to graphDCEL.outerFace
+    are evenly spaced along the unit circle. The locations of the vertices are given as PointE2 objects.
 
-    if verbose: print("Setting .data attributes...")
-    for i in range(len(graph.verts)):
-        if not in_place:
-            graph.verts[i].data = PointE2(P[i,0],P[i,1])
-        else:
-            graph.verts[i].tutte_data = PointE2(P[i,0],P[i,1])
-    if verbose: print("done.")
-        
-    vs = [None for _ in range(len(graph.verts))]
-    for v in graph.verts: 
-        vs[v._original_idx] = v
-    
-    graph.verts = vs
-    
-    return graph
\ No newline at end of file
+    The interior positions solve L2 P2 = -B P1, where L2 is the Laplacian restricted to the interior
+    vertices, B its interior-boundary block and P1 the boundary positions. The system is solved with
+    a sparse LU factorization (or conjugate gradients), never forming the inverse of L2. Use a
+    TutteEmbedder to embed the same graph with many boundary placements.
+
+    Args:
+        graphDCEL: The graph to embed. It should be topologically a disk. The outer face is placed in convex position.
+        in_place: Defaults to False. If set to True, then the graphDCEL object is not duplicated before embedding, and
+            and the vertex data for each vertex is replaced with Euclidean points for the embedding.
+        verbose: Print progress.
+        weight: The edge weights (see sparse_laplacian), None for the standard Tutte embedding.
+            The weights should be positive.
+        solver: SPLU (the default) for a sparse LU factorization or CG for conjugate gradients
+            with a Jacobi preconditioner, which needs less memory on very large graphs.
+        tolerance: The relative residual CG stops at.
+    Raises:
+        ValueError if solver is unknown.
+    Returns:
+        A DCEL with vertex data set to the point locations for the Tutte embedding. If in_place is False, the combinatorics
+        are a duplicate of the input graphDCEL. Otherwise, it simply returns a handle to graphDCEL.
+    """
+    embedder = TutteEmbedder(graphDCEL, weight, solver, tolerance, verbose)
+    if verbose: print("Computing Tutte embedding...")
+    return embedder.embed(in_place = in_place)
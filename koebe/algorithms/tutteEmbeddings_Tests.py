@@ -0,0 +1,76 @@
+import unittest
+
+import numpy as np
+
+from ._testMeshes import sphereDisk
+from .tutteEmbeddings import sparse_laplacian, tutteEmbeddingE2, circleBoundary, TutteEmbedder, CG
+
+def _positions(dcel, attr = "data"):
+    return np.array([[getattr(v, attr).x, getattr(v, attr).y] for v in dcel.verts])
+
+class TestTutteEmbeddings(unittest.TestCase):
+
+    def test_sparseLaplacian(self):
+        dcel = sphereDisk(50)
+        L = sparse_laplacian(dcel)
+        self.assertEqual(L.format, "csc")
+        np.testing.assert_array_equal(L.toarray(), dcel.laplacian().toarray())
+        weights = np.arange(1.0, len(dcel.edges) + 1)
+        L = sparse_laplacian(dcel, weight = weights).toarray()
+        e = dcel.edges[3]
+        u, v = e.aDart.origin.idx, e.aDart.dest.idx
+        self.assertEqual((L[u, v], L[v, u]), (-4.0, -4.0))
+        with self.assertRaises(ValueError):
+            sparse_laplacian(dcel, weight = [1.0, 2.0])
+
+    def test_embedding(self):
+        dcel = sphereDisk(150)
+        for weight in (None, [1.0 + (i % 3) for i in range(len(dcel.edges))]):
+            tutte = tutteEmbeddingE2(dcel, weight = weight)
+            P = _positions(tutte)
+            boundary = [v.idx for v in tutte.boundaryVerts()]
+            np.testing.assert_allclose(np.linalg.norm(P[boundary], axis = 1), 1.0)
+            # Every interior vertex is the weighted average of its neighbors
+            L = sparse_laplacian(tutte, weight = weight)
+            interior = np.setdiff1d(np.arange(len(P)), boundary)
+            np.testing.assert_allclose((L @ P)[interior], 0.0, atol = 1e-12)
+            np.testing.assert_allclose(_positions(tutteEmbeddingE2(dcel, weight = weight, solver = CG)),
+                                       P, atol = 1e-8)
+
+    def test_inPlace(self):
+        dcel = sphereDisk(40)
+        verts = list(dcel.verts)
+        tutte = tutteEmbeddingE2(dcel, in_place = True)
+        self.assertIs(tutte, dcel)
+        self.assertEqual(list(dcel.verts), verts)
+        np.testing.assert_allclose(_positions(dcel, "tutte_data"), _positions(tutteEmbeddingE2(dcel)))
+        with self.assertRaises(ValueError):
+            tutteEmbeddingE2(dcel, solver = "inv")
+
+    def test_embedder(self):
+        dcel = sphereDisk(120)
+        embedder = TutteEmbedder(dcel)
+        k = embedder.numBoundary
+        np.testing.assert_allclose(embedder.positions(), _positions(tutteEmbeddingE2(dcel)), atol = 1e-14)
+        rng = np.random.default_rng(0)
+        placements = np.stack([circleBoundary(k) * (1.0 + i) + rng.normal(size = 2) for i in range(4)])
+        batch = embedder.positions(placements)
+        self.assertEqual(batch.shape, (4, len(dcel.verts), 2))
+        for placement, P in zip(placements, batch):
+            np.testing.assert_allclose(embedder.positions(placement), P, atol = 1e-12)
+        # Harmonic extensions of other boundary data, in any dimension
+        heights = rng.normal(size = (k, 3))
+        P = embedder.positions(heights)
+        np.testing.assert_allclose(P[embedder.boundary], heights)
+        interior = embedder.interior
+        np.testing.assert_allclose((sparse_laplacian(dcel) @ P)[interior], 0.0, atol = 1e-12)
+        cgEmbedder = TutteEmbedder(dcel, solver = CG)
+        np.testing.assert_allclose(cgEmbedder.positions(placements), batch, atol = 1e-8)
+        with self.assertRaises(ValueError):
+            embedder.positions(heights[1:])
+        square = embedder.embed(np.sign(circleBoundary(k)))
+        self.assertIsNot(square, dcel)
+        np.testing.assert_allclose(_positions(square)[embedder.boundary], np.sign(circleBoundary(k)))
+
+if __name__ == '__main__':
+    unittest.main()
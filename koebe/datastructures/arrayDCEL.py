@@ -0,0 +1,473 @@
+# Array-backed doubly-connected edge list data structure
+#
+# The object DCEL in dcel.py stores every vertex, dart, edge and face as a
+# Python object and every pointer as an object reference. That is pleasant to
+# work with, but costly for very large meshes. The ArrayDCEL stores the same
+# topology in flat NumPy int32 arrays indexed by element number:
+#
+#   dart_next[d], dart_prev[d], dart_twin[d]  -- dart indices
+#   dart_origin[d]                            -- vertex index
+#   dart_face[d]                              -- face index
+#   dart_edge[d]                              -- edge index
+#   vert_adart[v], edge_adart[e], face_adart[f] -- dart indices
+#
+# A missing pointer (None in the object DCEL) is stored as -1.
+#
+# The usual traversal API (outDarts, neighbors, Face.vertices, ...) is
+# available through lightweight index views (ArrayVertex, ArrayDart,
+# ArrayEdge, ArrayFace) that only hold a reference to the ArrayDCEL and an
+# index.
+
+import numpy as np
+
+from .dcel import DCEL, MalformedDCELException
+
+NONE_IDX = -1
+
+def _idx_array(values):
+    return np.array(values, dtype=np.int32)
+
+class ArrayDCEL:
+
+    def __init__(self,
+                 dart_next,
+                 dart_twin,
+                 dart_origin,
+                 dart_face,
+                 vert_adart,
+                 face_adart,
+                 dart_prev  = None,
+                 dart_edge  = None,
+                 edge_adart = None,
+                 outer_face = NONE_IDX,
+                 vert_data  = None,
+                 dart_data  = None,
+                 edge_data  = None,
+                 face_data  = None):
+        """Creates an ArrayDCEL from its topology arrays.
+
+        Args:
+            dart_next, dart_twin, dart_origin, dart_face: Per dart index arrays.
+            vert_adart: An outgoing dart for each vertex.
+            face_adart: A dart on the boundary of each face.
+            dart_prev: Optional. Computed from dart_next if not given.
+            dart_edge, edge_adart: Optional. If not given, one edge is created
+                per twin pair with edge_adart set to the lower dart index.
+            outer_face: The index of the outer face, or -1 if there is none.
+            vert_data, dart_data, edge_data, face_data: Optional lists holding
+                the .data of each element. None means no element carries data.
+        """
+        self.dart_next   = _idx_array(dart_next)
+        self.dart_twin   = _idx_array(dart_twin)
+        self.dart_origin = _idx_array(dart_origin)
+        self.dart_face   = _idx_array(dart_face)
+        self.vert_adart  = _idx_array(vert_adart)
+        self.face_adart  = _idx_array(face_adart)
+
+        if dart_prev is None:
+            dart_prev = np.full(len(self.dart_next), NONE_IDX, dtype=np.int32)
+            hasNext = self.dart_next >= 0
+            dart_prev[self.dart_next[hasNext]] = np.nonzero(hasNext)[0]
+        self.dart_prev = _idx_array(dart_prev)
+
+        if dart_edge is None:
+            dart_edge, edge_adart = ArrayDCEL._edgesFromTwins(self.dart_twin)
+        self.dart_edge  = _idx_array(dart_edge)
+        self.edge_adart = _idx_array(edge_adart)
+
+        self.outer_face = int(outer_face)
+
+        self.vert_data = vert_data
+        self.dart_data = dart_data
+        self.edge_data = edge_data
+        self.face_data = face_data
+
+    @staticmethod
+    def _edgesFromTwins(dart_twin):
+        dart_idx   = np.arange(len(dart_twin), dtype=np.int32)
+        is_rep     = (dart_twin < 0) | (dart_idx < dart_twin)
+        edge_adart = dart_idx[is_rep]
+        dart_edge  = np.full(len(dart_twin), NONE_IDX, dtype=np.int32)
+        dart_edge[edge_adart] = np.arange(len(edge_adart), dtype=np.int32)
+        paired = edge_adart[dart_twin[edge_adart] >= 0]
+        dart_edge[dart_twin[paired]] = dart_edge[paired]
+        return dart_edge, edge_adart
+
+    #### Sizes and element views
+
+    @property
+    def numVerts(self):
+        return len(self.vert_adart)
+
+    @property
+    def numDarts(self):
+        return len(self.dart_next)
+
+    @property
+    def numEdges(self):
+        return len(self.edge_adart)
+
+    @property
+    def numFaces(self):
+        return len(self.face_adart)
+
+    @property
+    def verts(self):
+        return _ViewSequence(self, ArrayVertex, self.numVerts)
+
+    @property
+    def darts(self):
+        return _ViewSequence(self, ArrayDart, self.numDarts)
+
+    @property
+    def edges(self):
+        return _ViewSequence(self, ArrayEdge, self.numEdges)
+
+    @property
+    def faces(self):
+        return _ViewSequence(self, ArrayFace, self.numFaces)
+
+    @property
+    def outerFace(self):
+        return None if self.outer_face < 0 else ArrayFace(self, self.outer_face)
+
+    #### Whole-mesh array queries
+
+    @property
+    def dart_dest(self):
+        """The destination vertex index of every dart, -1 for darts without a twin."""
+        return np.where(self.dart_twin >= 0, self.dart_origin[self.dart_twin], NONE_IDX)
+
+    def vertexDegrees(self):
+        """The number of outgoing darts at each vertex."""
+        return np.bincount(self.dart_origin, minlength = self.numVerts)
+
+    def edgeEndpoints(self):
+        """Returns an (numEdges, 2) array of the endpoint vertex indices of each edge."""
+        return np.stack((self.dart_origin[self.edge_adart],
+                         self.dart_dest[self.edge_adart]), axis=1)
+
+    def eulerCharacteristic(self):
+        return self.numVerts - (self.numDarts / 2) + self.numFaces
+
+    def boundaryVerts(self):
+        if self.outerFace == None:
+            return []
+        return list(reversed(self.outerFace.vertices()))
+
+    #### Conversion to and from the object DCEL
+
+    @classmethod
+    def fromDCEL(cls, dcel):
+        """Creates an ArrayDCEL with the same topology and element data as dcel.
+
+        Elements are numbered by their position in dcel.verts, dcel.darts,
+        dcel.edges and dcel.faces.
+
+        Args:
+            dcel: An object DCEL.
+
+        Returns:
+            The ArrayDCEL.
+        """
+        vertIdx = dict((v, k) for k, v in enumerate(dcel.verts))
+        dartIdx = dict((d, k) for k, d in enumerate(dcel.darts))
+        edgeIdx = dict((e, k) for k, e in enumerate(dcel.edges))
+        faceIdx = dict((f, k) for k, f in enumerate(dcel.faces))
+
+        def idxOf(lookup, obj):
+            return NONE_IDX if obj is None else lookup[obj]
+
+        def dataOf(elements):
+            data = [elt.data for elt in elements]
+            return None if all(d is None for d in data) else data
+
+        return cls(
+            dart_next   = [idxOf(dartIdx, d.next)   for d in dcel.darts],
+            dart_twin   = [idxOf(dartIdx, d.twin)   for d in dcel.darts],
+            dart_origin = [idxOf(vertIdx, d.origin) for d in dcel.darts],
+            dart_face   = [idxOf(faceIdx, d.face)   for d in dcel.darts],
+            vert_adart  = [idxOf(dartIdx, v.aDart)  for v in dcel.verts],
+            face_adart  = [idxOf(dartIdx, f.aDart)  for f in dcel.faces],
+            dart_prev   = [idxOf(dartIdx, d.prev)   for d in dcel.darts],
+            dart_edge   = [idxOf(edgeIdx, d.edge)   for d in dcel.darts],
+            edge_adart  = [idxOf(dartIdx, e.aDart)  for e in dcel.edges],
+            outer_face  = idxOf(faceIdx, dcel.outerFace),
+            vert_data   = dataOf(dcel.verts),
+            dart_data   = dataOf(dcel.darts),
+            edge_data   = dataOf(dcel.edges),
+            face_data   = dataOf(dcel.faces)
+        )
+
+    def toDCEL(self, dcelClass = DCEL):
+        """Creates an object DCEL with the same topology and element data.
+
+        Args:
+            dcelClass: The DCEL class to instantiate (default DCEL).
+
+        Returns:
+            The object DCEL with elements in the same order as this ArrayDCEL.
+        """
+        dcel = dcelClass()
+
+        def dataAt(data, i):
+            return None if data is None else data[i]
+
+        verts = [dcel.Vertex(dcel, data = dataAt(self.vert_data, i)) for i in range(self.numVerts)]
+        darts = [dcel.Dart(dcel, data = dataAt(self.dart_data, i))   for i in range(self.numDarts)]
+        edges = [dcel.Edge(dcel, data = dataAt(self.edge_data, i))   for i in range(self.numEdges)]
+        faces = [dcel.Face(dcel, data = dataAt(self.face_data, i))   for i in range(self.numFaces)]
+
+        def objAt(objs, i):
+            return None if i < 0 else objs[i]
+
+        for i, vert in enumerate(verts):
+            vert.aDart = objAt(darts, self.vert_adart[i])
+
+        for i, dart in enumerate(darts):
+            dart.next   = objAt(darts, self.dart_next[i])
+            dart.prev   = objAt(darts, self.dart_prev[i])
+            dart.twin   = objAt(darts, self.dart_twin[i])
+            dart.origin = objAt(verts, self.dart_origin[i])
+            dart.face   = objAt(faces, self.dart_face[i])
+            dart.edge   = objAt(edges, self.dart_edge[i])
+
+        for i, edge in enumerate(edges):
+            edge.aDart = objAt(darts, self.edge_adart[i])
+
+        for i, face in enumerate(faces):
+            face.aDart = objAt(darts, self.face_adart[i])
+
+        dcel.outerFace = objAt(faces, self.outer_face)
+
+        return dcel
+
+# END ArrayDCEL
+
+class _ViewSequence:
+    """A read-only sequence of index views that creates each view on demand."""
+
+    __slots__ = ['dcel', 'viewClass', 'length']
+
+    def __init__(self, dcel, viewClass, length):
+        self.dcel      = dcel
+        self.viewClass = viewClass
+        self.length    = length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.viewClass(self.dcel, j) for j in range(*i.indices(self.length))]
+        if i < 0:
+            i += self.length
+        if not 0 <= i < self.length:
+            raise IndexError("element index out of range")
+        return self.viewClass(self.dcel, i)
+
+    def __iter__(self):
+        for i in range(self.length):
+            yield self.viewClass(self.dcel, i)
+
+class _IndexView:
+
+    __slots__ = ['dcel', 'idx']
+
+    def __init__(self, dcel, idx):
+        self.dcel = dcel
+        self.idx  = int(idx)
+
+    def __eq__(self, other):
+        return (type(self) is type(other)
+                and self.dcel is other.dcel
+                and self.idx == other.idx)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((type(self), id(self.dcel), self.idx))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.idx})"
+
+    def _view(self, viewClass, idx):
+        return None if idx < 0 else viewClass(self.dcel, idx)
+
+def _dataProperty(dataAttr, countAttr):
+
+    def getData(self):
+        data = getattr(self.dcel, dataAttr)
+        return None if data is None else data[self.idx]
+
+    def setData(self, value):
+        data = getattr(self.dcel, dataAttr)
+        if data is None:
+            data = [None] * getattr(self.dcel, countAttr)
+            setattr(self.dcel, dataAttr, data)
+        data[self.idx] = value
+
+    return property(getData, setData)
+
+class ArrayVertex(_IndexView):
+
+    __slots__ = []
+
+    data = _dataProperty("vert_data", "numVerts")
+
+    @property
+    def aDart(self):
+        return self._view(ArrayDart, self.dcel.vert_adart[self.idx])
+
+    def outDartIndices(self):
+        dcel  = self.dcel
+        start = dcel.vert_adart[self.idx]
+        if start < 0:
+            raise MalformedDCELException("Vertex.aDart is None")
+        result = []
+        curr = start
+        while True:
+            result.append(int(curr))
+            curr = dcel.dart_twin[dcel.dart_prev[curr]]
+            if len(result) > dcel.numDarts:
+                raise MalformedDCELException("outDarts() collected more darts than should exist")
+            if curr == start:
+                break
+        return result
+
+    def outDarts(self):
+        return [ArrayDart(self.dcel, d) for d in self.outDartIndices()]
+
+    def inDarts(self):
+        twin = self.dcel.dart_twin
+        return [ArrayDart(self.dcel, twin[d]) for d in self.outDartIndices()]
+
+    def neighborIndices(self):
+        dcel = self.dcel
+        return [int(dcel.dart_origin[dcel.dart_twin[d]]) for d in self.outDartIndices()]
+
+    def neighbors(self):
+        return [ArrayVertex(self.dcel, v) for v in self.neighborIndices()]
+
+    def edges(self):
+        return [ArrayEdge(self.dcel, self.dcel.dart_edge[d]) for d in self.outDartIndices()]
+
+    def faces(self):
+        return [ArrayFace(self.dcel, self.dcel.dart_face[d]) for d in self.outDartIndices()]
+
+    def degree(self):
+        return len(self.outDartIndices())
+
+# END ArrayVertex
+
+class ArrayDart(_IndexView):
+
+    __slots__ = []
+
+    data = _dataProperty("dart_data", "numDarts")
+
+    @property
+    def next(self):
+        return self._view(ArrayDart, self.dcel.dart_next[self.idx])
+
+    @property
+    def prev(self):
+        return self._view(ArrayDart, self.dcel.dart_prev[self.idx])
+
+    @property
+    def twin(self):
+        return self._view(ArrayDart, self.dcel.dart_twin[self.idx])
+
+    @property
+    def origin(self):
+        return self._view(ArrayVertex, self.dcel.dart_origin[self.idx])
+
+    @property
+    def face(self):
+        return self._view(ArrayFace, self.dcel.dart_face[self.idx])
+
+    @property
+    def edge(self):
+        return self._view(ArrayEdge, self.dcel.dart_edge[self.idx])
+
+    @property
+    def dest(self):
+        twin = self.dcel.dart_twin[self.idx]
+        if twin < 0:
+            raise MalformedDCELException("Dart.twin is None")
+        return ArrayVertex(self.dcel, self.dcel.dart_origin[twin])
+
+    @property
+    def pred(self):
+        prev = self.dcel.dart_prev[self.idx]
+        if prev < 0:
+            raise MalformedDCELException("Dart.prev is None")
+        return ArrayVertex(self.dcel, self.dcel.dart_origin[prev])
+
+    def cycleIndices(self):
+        dart_next = self.dcel.dart_next
+        result = []
+        curr = self.idx
+        while True:
+            result.append(int(curr))
+            curr = dart_next[curr]
+            if curr == self.idx:
+                break
+            if len(result) > self.dcel.numDarts:
+                raise MalformedDCELException("cycle() collected more darts than should exist")
+        return result
+
+    def cycle(self):
+        return [ArrayDart(self.dcel, d) for d in self.cycleIndices()]
+
+# END ArrayDart
+
+class ArrayEdge(_IndexView):
+
+    __slots__ = []
+
+    data = _dataProperty("edge_data", "numEdges")
+
+    @property
+    def aDart(self):
+        return self._view(ArrayDart, self.dcel.edge_adart[self.idx])
+
+    def endPoints(self):
+        return [self.aDart.origin, self.aDart.dest]
+
+    def incidentFaces(self):
+        return [self.aDart.face, self.aDart.twin.face]
+
+    def darts(self):
+        return [self.aDart, self.aDart.twin]
+
+# END ArrayEdge
+
+class ArrayFace(_IndexView):
+
+    __slots__ = []
+
+    data = _dataProperty("face_data", "numFaces")
+
+    @property
+    def aDart(self):
+        return self._view(ArrayDart, self.dcel.face_adart[self.idx])
+
+    def dartIndices(self):
+        start = self.dcel.face_adart[self.idx]
+        if start < 0:
+            raise MalformedDCELException("Face.aDart is None")
+        return ArrayDart(self.dcel, start).cycleIndices()
+
+    def darts(self):
+        return [ArrayDart(self.dcel, d) for d in self.dartIndices()]
+
+    def vertexIndices(self):
+        dart_origin = self.dcel.dart_origin
+        return [int(dart_origin[d]) for d in self.dartIndices()]
+
+    def vertices(self):
+        return [ArrayVertex(self.dcel, v) for v in self.vertexIndices()]
+
+# END ArrayFace
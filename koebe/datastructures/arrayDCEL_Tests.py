@@ -0,0 +1,63 @@
+import unittest
+
+from .dcel import DCEL
+from .arrayDCEL import ArrayDCEL
+
+def _starredCycle(n):
+    dcel = DCEL.generateCycle(vdata = list(range(n)))
+    dcel.faces[1].starTriangulate(vdata = n)
+    return dcel
+
+class TestArrayDCEL(unittest.TestCase):
+
+    def test_sizes(self):
+        dcel = _starredCycle(5)
+        adcel = ArrayDCEL.fromDCEL(dcel)
+        self.assertEqual(adcel.numVerts, len(dcel.verts))
+        self.assertEqual(adcel.numDarts, len(dcel.darts))
+        self.assertEqual(adcel.numEdges, len(dcel.edges))
+        self.assertEqual(adcel.numFaces, len(dcel.faces))
+        self.assertEqual(adcel.eulerCharacteristic(), dcel.eulerCharacteristic())
+
+    def test_traversal(self):
+        dcel = _starredCycle(5)
+        adcel = ArrayDCEL.fromDCEL(dcel)
+        for v, av in zip(dcel.verts, adcel.verts):
+            self.assertEqual([u.data for u in v.neighbors()],
+                             [u.data for u in av.neighbors()])
+            self.assertEqual(len(v.outDarts()), av.degree())
+        for f, af in zip(dcel.faces, adcel.faces):
+            self.assertEqual([u.data for u in f.vertices()],
+                             [u.data for u in af.vertices()])
+        self.assertEqual(list(adcel.vertexDegrees()),
+                         [v.degree() for v in dcel.verts])
+
+    def test_roundTrip(self):
+        dcel = _starredCycle(6)
+        copy = ArrayDCEL.fromDCEL(dcel).toDCEL()
+        self.assertEqual([v.data for v in copy.boundaryVerts()],
+                         [v.data for v in dcel.boundaryVerts()])
+        for v, w in zip(dcel.verts, copy.verts):
+            self.assertEqual([u.data for u in v.neighbors()],
+                             [u.data for u in w.neighbors()])
+
+    def test_edgesFromTwins(self):
+        dcel = _starredCycle(4)
+        adcel = ArrayDCEL.fromDCEL(dcel)
+        rebuilt = ArrayDCEL(adcel.dart_next, adcel.dart_twin, adcel.dart_origin,
+                            adcel.dart_face, adcel.vert_adart, adcel.face_adart)
+        self.assertEqual(rebuilt.numEdges, adcel.numEdges)
+        self.assertTrue((rebuilt.dart_prev == adcel.dart_prev).all())
+        self.assertTrue((rebuilt.dart_edge == rebuilt.dart_edge[rebuilt.dart_twin]).all())
+
+    def test_destWithoutTwins(self):
+        # One triangle with no twin darts: no dart has a destination through its twin
+        adcel = ArrayDCEL(dart_next = [1, 2, 0], dart_twin = [-1, -1, -1], dart_origin = [0, 1, 2],
+                          dart_face = [0, 0, 0], vert_adart = [0, 1, 2], face_adart = [0])
+        self.assertEqual(list(adcel.dart_dest), [-1, -1, -1])
+        self.assertEqual(adcel.edgeEndpoints().tolist(), [[0, -1], [1, -1], [2, -1]])
+        adcel = ArrayDCEL.fromDCEL(_starredCycle(5))
+        self.assertTrue((adcel.dart_dest == adcel.dart_origin[adcel.dart_next]).all())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,163 @@
 # Doubly-connected edge list data structure
 
+class ElementStore:
+    """A list-like container for the vertices, darts, edges or faces of a DCEL.
+    
+    Every element appended to the store gets an .idx field holding its slot in
+    the store. Removal uses that slot to leave a tombstone behind, so it takes
+    O(1) time instead of the linear scan of list.remove. Iteration and len() 
+    skip tombstones and preserve insertion order. 
+    
+    Positional access (store[i], slicing, index()) refers to the live elements
+    only. After removals it goes through a Fenwick tree over the live slots, 
+    built on first use and updated by later removals and appends, so it takes 
+    O(log n) time and never renumbers anything. 
+    
+    The .idx of an element only changes when compact() is called explicitly 
+    (directly or through DCEL.compact), which drops the tombstones and 
+    renumbers every .idx. Whenever the store is compact, store[elt.idx] is elt. 
+    """
+    
+    __slots__ = ["_slots", "_live", "_tree"]
+    
+    def __init__(self, elements = ()):
+        self._slots = []
+        self._live  = 0
+        self._tree  = None
+        for elt in elements:
+            self.append(elt)
+    
+    def append(self, elt):
+        elt.idx = len(self._slots)
+        self._slots.append(elt)
+        self._live += 1
+        if self._tree is not None:
+            # The new node n counts the live slots in (n - lowbit(n), n]
+            n = len(self._slots)
+            self._tree.append(self._prefix(n - 1) - self._prefix(n - (n & -n)) + 1)
+    
+    def extend(self, elements):
+        for elt in elements:
+            self.append(elt)
+    
+    def _slotOf(self, elt):
+        idx = getattr(elt, "idx", None)
+        if (isinstance(idx, int) and 0 <= idx < len(self._slots) 
+            and self._slots[idx] is elt):
+            return idx
+        # The .idx field is stale or was overwritten, fall back to a scan.
+        for i, other in enumerate(self._slots):
+            if other is elt:
+                return i
+        return None
+    
+    def remove(self, elt):
+        slot = self._slotOf(elt)
+        if slot == None:
+            raise ValueError("ElementStore.remove(x): x not in store")
+        self._slots[slot] = None
+        self._live -= 1
+        if self._tree is not None:
+            i = slot + 1
+            while i < len(self._tree):
+                self._tree[i] -= 1
+                i += i & -i
+    
+    def isCompact(self):
+        return self._live == len(self._slots)
+    
+    def compact(self):
+        if not self.isCompact():
+            self._slots = [elt for elt in self._slots if elt is not None]
+        self._tree = None
+        for i, elt in enumerate(self._slots):
+            elt.idx = i
+    
+    # Fenwick tree over the slots, 1 for a live slot and 0 for a tombstone
+    def _buildTree(self):
+        n = len(self._slots)
+        tree = [0] + [0 if elt is None else 1 for elt in self._slots]
+        for i in range(1, n + 1):
+            j = i + (i & -i)
+            if j <= n:
+                tree[j] += tree[i]
+        self._tree = tree
+    
+    def _prefix(self, n):
+        # The number of live elements in the first n slots
+        count = 0
+        while n > 0:
+            count += self._tree[n]
+            n -= n & -n
+        return count
+    
+    def _liveSlot(self, i):
+        # The slot of the i-th live element
+        if i < 0:
+            i += self._live
+        if not 0 <= i < self._live:
+            raise IndexError("ElementStore index out of range")
+        if self.isCompact():
+            return i
+        if self._tree is None:
+            self._buildTree()
+        pos, step = 0, 1 << len(self._slots).bit_length()
+        while step > 0:
+            if pos + step < len(self._tree) and self._tree[pos + step] <= i:
+                pos += step
+                i -= self._tree[pos]
+            step >>= 1
+        return pos
+    
+    def index(self, elt):
+        slot = self._slotOf(elt)
+        if slot == None:
+            raise ValueError("ElementStore.index(x): x not in store")
+        if self.isCompact():
+            return slot
+        if self._tree is None:
+            self._buildTree()
+        return self._prefix(slot)
+    
+    def __len__(self):
+        return self._live
+    
+    def __iter__(self):
+        for elt in self._slots:
+            if elt is not None:
+                yield elt
+    
+    def __reversed__(self):
+        for elt in reversed(self._slots):
+            if elt is not None:
+                yield elt
+    
+    def __contains__(self, elt):
+        return self._slotOf(elt) != None
+    
+    def __getitem__(self, i):
+        if self._live == len(self._slots):
+            return self._slots[i]
+        if isinstance(i, slice):
+            return list(self)[i]
+        return self._slots[self._liveSlot(i)]
+    
+    def __setitem__(self, i, elt):
+        slot = self._liveSlot(i)
+        self._slots[slot] = elt
+        elt.idx = slot
+    
+    def __add__(self, other):
+        return list(self) + list(other)
+    
+    def __radd__(self, other):
+        return list(other) + list(self)
+    
+    def __repr__(self):
+        return f"ElementStore({list(self)})"
+
+# END ElementStore
+
 class DCEL:
     
     def __init__(self, outerFaceData = None):
@@ -15,16 +173,29 @@ class DCEL:
         
         self.outerFace = (None if outerFaceData == None 
                                else self.Face(self, data = outerFaceData))
-
+    
+    # The element containers are ElementStores. Assigning any iterable of 
+    # elements (e.g. dcel.verts = reorderedList) wraps it in a new store. 
+    # They stay plain attributes so that reading them costs nothing extra. 
+    _STORES = frozenset(["verts", "darts", "edges", "faces"])
+    
+    def __setattr__(self, name, value):
+        if name in DCEL._STORES and not isinstance(value, ElementStore):
+            value = ElementStore(value)
+        object.__setattr__(self, name, value)
+    
+    # Drops the tombstones left by removals and renumbers the .idx field 
+    # of every vertex, dart, edge and face. 
+    def compact(self):
+        self.verts.compact()
+        self.darts.compact()
+        self.edges.compact()
+        self.faces.compact()
+    
+    # The .idx fields are maintained by the element stores, so this is
+    # now the same as compact(). Kept for older code. 
     def markIndices(self):
-        for vIdx in range(len(self.verts)):
-            self.verts[vIdx].idx = vIdx
-        for dIdx in range(len(self.darts)):
-            self.darts[dIdx].idx = dIdx
-        for eIdx in range(len(self.edges)):
-            self.edges[eIdx].idx = eIdx
-        for fIdx in range(len(self.faces)):
-            self.faces[fIdx].idx = fIdx
+        self.compact()
     
     def eulerCharacteristic(self):
         return len(self.verts) - (len(self.darts) / 2) + len(self.faces)
@@ -36,31 +207,32 @@ class DCEL:
         self.verts = bdryVerts + otherVerts
     
     def laplacian(self):
-        vertToIdx = dict((v, k) for k, v in enumerate(self.verts))
-        vertToDeg = [len(v.outDarts()) for v in self.verts]
-        mat = [[0 for _ in range(len(self.verts))] for _ in range(len(self.verts))]
-        for i in range(len(self.verts)):
-            u = self.verts[i]
-            neighbors = u.neighbors()
-            mat[i][i] = len(neighbors)
-            for v in neighbors:
-                mat[i][vertToIdx[v]] = -1
-        return mat
-    
-    def weightedLaplacian(self, weight):
-        vertToIdx = dict((v, k) for k, v in enumerate(self.verts))
-        vertToDeg = [len(v.outDarts()) for v in self.verts]
-        mat = [[0 for _ in range(len(self.verts))] for _ in range(len(self.verts))]
-        for i in range(len(self.verts)):
-            u = self.verts[i]
-            neighbors = u.neighbors()
-            theSum = 0
-            for v in neighbors:
-                w = weight(u, v)
-                theSum += w
-                mat[i][vertToIdx[v]] = -w
-            mat[i][i] = theSum
-        return mat
+        """The graph Laplacian as a scipy.sparse CSR matrix.
+        
+        Row and column i belong to self.verts[i]: the diagonal holds the vertex degrees and 
+        L[i, j] is -1 for neighbors (see laplacians.laplacianMatrix). 
+        """
+        # Imported here since laplacians builds on arrayDCEL, which builds on this module
+        from .laplacians import laplacianMatrix, UNIFORM
+        return laplacianMatrix(self, UNIFORM)
+    
+    def weightedLaplacian(self, weight, positions = None):
+        """The weighted graph Laplacian as a scipy.sparse CSR matrix. 
+        
+        Args:
+            weight: A function weight(u, v) giving the weight of the dart from u to v, an array 
+                of weights per dart or per edge, or one of the names laplacians.UNIFORM, 
+                COTANGENT and MEAN_VALUE for weights computed from the vertex coordinates. 
+            positions: The vertex coordinates for the named weights, None to use the .data 
+                of the vertices (see laplacians.vertexPositions). 
+        
+        Returns:
+            L with L[i, j] minus the weight of the dart from self.verts[i] to self.verts[j] and 
+            L[i, i] the sum of the weights of the darts leaving self.verts[i]. 
+        """
+        # Imported here since laplacians builds on arrayDCEL, which builds on this module
+        from .laplacians import laplacianMatrix
+        return laplacianMatrix(self, weight, positions)
     
     def boundaryVerts(self):
         if self.outerFace == None:
@@ -203,10 +375,11 @@ class Vertex:
             raise MalformedDCELException("Vertex.aDart is None")
         # Even worse there is no do-while loop. _sigh_
         i = 0
+        limit = len(self.dcel.darts)
         while True:
             darts.append(curr)
             curr = curr.prev.twin
-            if i > len(self.dcel.darts):
+            if i > limit:
                 raise MalformedDCELException("outDarts() collected more darts than should exist")
             i += 1
             if curr == self.aDart:
@@ -221,10 +394,11 @@ class Vertex:
         curr = self.aDart.twin
         # Even worse there is no do-while loop. _sigh_
         i = 0
+        limit = len(self.dcel.darts)
         while True:
             darts.append(curr)
             curr = curr.twin.prev
-            if i > len(self.dcel.darts):
+            if i > limit:
                 raise MalformedDCELException("inDarts() collected more darts than should exist")
             i += 1
             if curr == self.aDart.twin:
@@ -338,7 +512,7 @@ class Dart:
         if not newTwin == None:
             newTwin.twin = self
     
-    def makePrev(self, prev):
+    def makePrev(self, newPrev):
         self.prev = newPrev
         newPrev.next = self
         
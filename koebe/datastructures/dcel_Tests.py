@@ -0,0 +1,70 @@
+import unittest
+
+from .dcel import DCEL, ElementStore
+
+class _Elt:
+    pass
+
+class TestElementStore(unittest.TestCase):
+
+    def test_appendSetsIdx(self):
+        elts = [_Elt() for _ in range(4)]
+        store = ElementStore(elts)
+        self.assertEqual([e.idx for e in elts], [0, 1, 2, 3])
+        self.assertEqual(len(store), 4)
+
+    def test_removeKeepsOrder(self):
+        elts = [_Elt() for _ in range(5)]
+        store = ElementStore(elts)
+        store.remove(elts[1])
+        store.remove(elts[3])
+        self.assertEqual(len(store), 3)
+        self.assertEqual(list(store), [elts[0], elts[2], elts[4]])
+        self.assertEqual(list(reversed(store)), [elts[4], elts[2], elts[0]])
+        self.assertFalse(elts[1] in store)
+        self.assertEqual(store[-1], elts[4])
+        self.assertEqual(store[1], elts[2])
+        self.assertEqual(store.index(elts[4]), 2)
+        # Positional access does not renumber, only compact() does
+        self.assertEqual([e.idx for e in store], [0, 2, 4])
+        store.compact()
+        self.assertEqual([e.idx for e in store], [0, 1, 2])
+
+    def test_interleavedRemoveAndAccess(self):
+        elts = [_Elt() for _ in range(10)]
+        store = ElementStore(elts)
+        live = list(elts)
+        for k in [3, 0, 5, 2]:
+            store.remove(live.pop(k))
+            extra = _Elt()
+            store.append(extra)
+            live.append(extra)
+            self.assertEqual([store[i] for i in range(len(store))], live)
+        self.assertEqual([e.idx for e in elts if e in store], [1, 2, 5, 6, 8, 9])
+        store[0] = elts[0]
+        self.assertEqual(store[0], elts[0])
+        self.assertEqual(elts[0].idx, 1)
+
+    def test_staleIdx(self):
+        elts = [_Elt() for _ in range(3)]
+        store = ElementStore(elts)
+        elts[2].idx = 0
+        store.remove(elts[2])
+        self.assertEqual(list(store), elts[:2])
+        self.assertRaises(ValueError, store.remove, elts[2])
+
+    def test_vertexRemove(self):
+        dcel = DCEL.generateCycle(vdata = list(range(5)))
+        center = dcel.faces[1].starTriangulate(vdata = 5)[0].darts()[2].origin
+        dcel.outerFace = None
+        newFace = center.remove()
+        dcel.compact()
+        self.assertEqual(len(dcel.verts), 5)
+        self.assertEqual(len(dcel.darts), 10)
+        self.assertEqual(len(dcel.edges), 5)
+        self.assertEqual(len(newFace.vertices()), 5)
+        for i, v in enumerate(dcel.verts):
+            self.assertEqual(v.idx, i)
+
+if __name__ == '__main__':
+    unittest.main()
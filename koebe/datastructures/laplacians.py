@@ -0,0 +1,141 @@
+# Sparse graph Laplacians of DCELs
+#
+# The Laplacian L of a DCEL with dart weights w has L[i, j] = -(sum of w(d)
+# over the darts d from vertex i to vertex j) and L[i, i] = sum of w(d) over
+# the darts d leaving i, so that (L P)[i] = sum_d w(d) (P[i] - P[dest(d)]).
+# Symmetric weights give a symmetric matrix.
+#
+# Everything is computed from the flat dart arrays of an ArrayDCEL, so the
+# built-in weights below never loop over vertices in Python:
+#
+#   UNIFORM     w = 1 (the combinatorial Laplacian).
+#   COTANGENT   w = (cot a + cot b) / 2 with a and b the angles opposite the
+#               edge in its two triangles (the cotangent Laplacian).
+#   MEAN_VALUE  w = (tan(c / 2) + tan(e / 2)) / |P[j] - P[i]| with c and e the
+#               angles at i of the two triangles at the edge (Floater's mean
+#               value coordinates; not symmetric).
+#
+# The geometric weights need vertex coordinates, by default the .data of the
+# vertices (any iterable point such as a PointE2 or PointE3).
+
+import numpy as np
+from scipy.sparse import coo_matrix
+
+from .arrayDCEL import ArrayDCEL
+
+UNIFORM = "uniform"
+COTANGENT = "cotangent"
+MEAN_VALUE = "meanValue"
+WEIGHTS = (UNIFORM, COTANGENT, MEAN_VALUE)
+
+def vertexPositions(dcel, positions = None) -> np.ndarray:
+    """The coordinates of the vertices of dcel as an n by d array.
+
+    Args:
+        dcel: A DCEL.
+        positions: None to read the coordinates from v.data, a function from a vertex to its
+            coordinates, or an n by d array (returned as is).
+    """
+    if positions is None:
+        return np.array([list(v.data) for v in dcel.verts], dtype = float)
+    elif callable(positions):
+        return np.array([list(positions(v)) for v in dcel.verts], dtype = float)
+    return np.asarray(positions, dtype = float)
+
+def _cornerVectors(adcel: ArrayDCEL, P: np.ndarray):
+    # For every dart d = (i, j) in a triangle (i, j, k): the vectors j - i and k - i
+    # from its origin to the two other corners of its face.
+    origin, dest = adcel.dart_origin, adcel.dart_origin[adcel.dart_next]
+    third = adcel.dart_origin[adcel.dart_prev]
+    return P[dest] - P[origin], P[third] - P[origin]
+
+def _crossNorms(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    if a.shape[1] == 2:
+        return np.abs(a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0])
+    return np.linalg.norm(np.cross(a, b), axis = 1)
+
+def _innerDarts(adcel: ArrayDCEL) -> np.ndarray:
+    return adcel.dart_face != adcel.outer_face
+
+def _plusAcrossEdge(adcel: ArrayDCEL, values: np.ndarray, across: np.ndarray) -> np.ndarray:
+    # values[d] + values[across[d]], where across[d] is a dart of the other face at the edge
+    # of d. Darts without a twin have no other face and keep values[d].
+    total = values.copy()
+    hasTwin = adcel.dart_twin >= 0
+    total[hasTwin] += values[across[hasTwin]]
+    return total
+
+def cotangentWeights(adcel: ArrayDCEL, P: np.ndarray) -> np.ndarray:
+    """The cotangent weight of every dart of a triangulated ArrayDCEL with vertex coordinates P."""
+    # The angle opposite to dart d = (i, j) in its triangle is at k = origin(prev(d)).
+    third = adcel.dart_origin[adcel.dart_prev]
+    a = P[adcel.dart_origin] - P[third]
+    b = P[adcel.dart_origin[adcel.dart_next]] - P[third]
+    half = np.zeros(adcel.numDarts)
+    inner = _innerDarts(adcel)
+    half[inner] = 0.5 * np.sum(a[inner] * b[inner], axis = 1) / _crossNorms(a[inner], b[inner])
+    return _plusAcrossEdge(adcel, half, adcel.dart_twin)
+
+def meanValueWeights(adcel: ArrayDCEL, P: np.ndarray) -> np.ndarray:
+    """The mean value weight of every dart of a triangulated ArrayDCEL with vertex coordinates P."""
+    toDest, toThird = _cornerVectors(adcel, P)
+    lengths = np.linalg.norm(toDest, axis = 1)
+    # tan(angle / 2) = |a x b| / (|a| |b| + a . b) for the angle between a and b
+    tanHalf = np.zeros(adcel.numDarts)
+    inner = _innerDarts(adcel)
+    a, b = toDest[inner], toThird[inner]
+    tanHalf[inner] = _crossNorms(a, b) / (lengths[inner] * np.linalg.norm(b, axis = 1)
+                                          + np.sum(a * b, axis = 1))
+    # The other triangle at the edge of d, seen from origin(d), is that of next(twin(d))
+    return _plusAcrossEdge(adcel, tanHalf, adcel.dart_next[adcel.dart_twin]) / lengths
+
+def dartWeights(dcel, weight = UNIFORM, positions = None, adcel: ArrayDCEL = None) -> np.ndarray:
+    """The weight of every dart of dcel (in the order of dcel.darts).
+
+    Args:
+        dcel: A DCEL. COTANGENT and MEAN_VALUE need every inner face to be a triangle.
+        weight: UNIFORM, COTANGENT, MEAN_VALUE, a function weight(u, v) of the origin and
+            destination of a dart, or an array with a weight per dart (in the order of
+            dcel.darts) or per edge (in the order of dcel.edges, used for both darts).
+        positions: The vertex coordinates for COTANGENT and MEAN_VALUE (see vertexPositions).
+        adcel: ArrayDCEL.fromDCEL(dcel), if already at hand.
+
+    Raises:
+        ValueError if weight is an unknown name or an array of the wrong length.
+    """
+    if isinstance(weight, str):
+        if weight not in WEIGHTS:
+            raise ValueError(f"Unknown Laplacian weight {weight}.")
+        if adcel is None:
+            adcel = ArrayDCEL.fromDCEL(dcel)
+        if weight == UNIFORM:
+            return np.ones(adcel.numDarts)
+        P = vertexPositions(dcel, positions)
+        return cotangentWeights(adcel, P) if weight == COTANGENT else meanValueWeights(adcel, P)
+    elif callable(weight):
+        return np.array([weight(d.origin, d.dest) for d in dcel.darts], dtype = float)
+    weights = np.asarray(weight, dtype = float)
+    if len(weights) == len(dcel.darts):
+        return weights
+    elif len(weights) == len(dcel.edges):
+        if adcel is None:
+            adcel = ArrayDCEL.fromDCEL(dcel)
+        return weights[adcel.dart_edge]
+    raise ValueError(f"Expected {len(dcel.darts)} dart weights or {len(dcel.edges)} edge weights, "
+                     f"got {len(weights)}.")
+
+def laplacianMatrix(dcel, weight = UNIFORM, positions = None):
+    """The weighted Laplacian of dcel as a scipy.sparse CSR matrix (see dartWeights).
+
+    Row and column i belong to dcel.verts[i].
+    """
+    adcel = ArrayDCEL.fromDCEL(dcel)
+    weights = dartWeights(dcel, weight, positions, adcel)
+    n = adcel.numVerts
+    origin, dest = adcel.dart_origin, adcel.dart_dest
+    valid = adcel.dart_twin >= 0
+    rows = np.concatenate([origin[valid], np.arange(n)])
+    cols = np.concatenate([dest[valid], np.arange(n)])
+    degrees = np.bincount(origin[valid], weights[valid], minlength = n)
+    data = np.concatenate([-weights[valid], degrees])
+    return coo_matrix((data, (rows, cols)), shape = (n, n)).tocsr()
@@ -0,0 +1,82 @@
+import unittest
+import math
+
+import numpy as np
+
+from ..geometries.euclidean2 import PointE2
+from .dcel import DCEL
+from .arrayDCEL import ArrayDCEL
+from .laplacians import (UNIFORM, COTANGENT, MEAN_VALUE, vertexPositions,
+                         cotangentWeights, meanValueWeights)
+
+def _denseLaplacian(dcel, weight):
+    # The old list of lists construction
+    vertToIdx = dict((v, k) for k, v in enumerate(dcel.verts))
+    n = len(dcel.verts)
+    mat = np.zeros((n, n))
+    for i, u in enumerate(dcel.verts):
+        for v in u.neighbors():
+            mat[i][vertToIdx[v]] -= weight(u, v)
+            mat[i][i] += weight(u, v)
+    return mat
+
+def _fan(k, radius = 1.0):
+    # A wheel: one center vertex at the origin and k rim vertices on a circle.
+    dcel = DCEL.generateCycle(vdata = [PointE2(radius * math.cos(2 * math.pi * i / k),
+                                               radius * math.sin(2 * math.pi * i / k))
+                                       for i in range(k)])
+    center = dcel.faces[1].starTriangulate(vdata = PointE2(0.1, -0.05))[0].darts()[2].origin
+    dcel.outerFace = dcel.faces[0]
+    return dcel, center
+
+class TestLaplacians(unittest.TestCase):
+
+    def test_uniform(self):
+        dcel, _ = _fan(7)
+        L = dcel.laplacian()
+        self.assertEqual(L.format, "csr")
+        np.testing.assert_array_equal(L.toarray(), _denseLaplacian(dcel, lambda u, v : 1.0))
+        np.testing.assert_array_equal(dcel.weightedLaplacian(UNIFORM).toarray(), L.toarray())
+        weight = lambda u, v : 1.0 + 2 * u.idx + v.idx
+        np.testing.assert_allclose(dcel.weightedLaplacian(weight).toarray(), _denseLaplacian(dcel, weight))
+        with self.assertRaises(ValueError):
+            dcel.weightedLaplacian("harmonic")
+
+    def test_linearPrecision(self):
+        # The cotangent and mean value Laplacians vanish on linear functions at interior vertices
+        dcel, center = _fan(9)
+        P = vertexPositions(dcel)
+        for weight in (COTANGENT, MEAN_VALUE):
+            L = dcel.weightedLaplacian(weight)
+            np.testing.assert_allclose((L @ P)[center.idx], 0.0, atol = 1e-12)
+        # Mean value weights are positive, cotangent weights symmetric
+        Lmv = dcel.weightedLaplacian(MEAN_VALUE).toarray()
+        self.assertTrue(np.all(Lmv[center.idx][np.arange(len(P)) != center.idx] < 0))
+        Lcot = dcel.weightedLaplacian(COTANGENT).toarray()
+        np.testing.assert_allclose(Lcot, Lcot.T, atol = 1e-12)
+
+    def test_cotangentValues(self):
+        # In the right isosceles triangle (0, 0), (1, 0), (0, 1) the hypotenuse is opposite a
+        # right angle and each leg opposite a 45 degree angle.
+        dcel = DCEL.generateCycle(vdata = [PointE2(0.0, 0.0), PointE2(1.0, 0.0), PointE2(0.0, 1.0)])
+        dcel.outerFace = dcel.faces[0]
+        L = dcel.weightedLaplacian(COTANGENT).toarray()
+        self.assertAlmostEqual(L[1, 2], 0.0)
+        self.assertAlmostEqual(L[0, 1], -0.5)
+        self.assertAlmostEqual(L[0, 2], -0.5)
+        # Coordinates from an explicit array, in 3D
+        P = np.array([[0.0, 0.0, 0.0], [2.0, 0.0, 0.0], [0.0, 2.0, 0.0]])
+        np.testing.assert_allclose(dcel.weightedLaplacian(COTANGENT, P).toarray(), L)
+
+    def test_dartsWithoutTwins(self):
+        # A single triangle (0, 0), (1, 0), (0, 1) whose darts have no twins: each weight
+        # comes from that triangle alone.
+        adcel = ArrayDCEL(dart_next = [1, 2, 0], dart_twin = [-1, -1, -1], dart_origin = [0, 1, 2],
+                          dart_face = [0, 0, 0], vert_adart = [0, 1, 2], face_adart = [0])
+        P = np.array([[0.0, 0.0], [1.0, 0.0], [0.0, 1.0]])
+        np.testing.assert_allclose(cotangentWeights(adcel, P), [0.5, 0.0, 0.5], atol = 1e-12)
+        tan = math.tan(math.pi / 8)
+        np.testing.assert_allclose(meanValueWeights(adcel, P), [1.0, tan / math.sqrt(2), tan])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+#
+# Vectorized (batch) versions of the predicates in commonOps
+#
+# Each function takes NumPy arrays whose last axis holds coordinates and
+# broadcasts over all leading axes, so a single call can test one query point
+# against an array of facets, or many query points against one facet.
+#
+# The determinants are evaluated with the same cofactor expansions as the
+# scalar functions in commonOps (applied column-wise), so for float input a
+# batch predicate returns exactly the same values as calling the scalar
+# predicate in a loop.
+#
+
+import numpy as np
+
+from .commonOps import determinant2, determinant3, determinant4, Orientation
+from .robust import permanent4, robustDeterminant4, DETERMINANT4_BOUND
+
+# The same tolerance as commonOps.isZero
+ZERO_TOLERANCE = 1e-8
+
+def _columns(M, n):
+    return [M[..., i, j] for i in range(n) for j in range(n)]
+
+def determinant3Batch(M):
+    """Computes the determinants of an array of 3x3 matrices.
+
+    Args:
+        M: An array of shape (..., 3, 3).
+
+    Returns:
+        An array of shape (...) of the determinants.
+    """
+    return determinant3(*_columns(np.asarray(M, dtype=float), 3))
+
+def determinant4Batch(M):
+    """Computes the determinants of an array of 4x4 matrices.
+
+    Args:
+        M: An array of shape (..., 4, 4).
+
+    Returns:
+        An array of shape (...) of the determinants.
+    """
+    return determinant4(*_columns(np.asarray(M, dtype=float), 4))
+
+def orientation2Values(P1, P2, P3):
+    """The determinant used by commonOps.orientation2 for arrays of 2D points.
+
+    Args:
+        P1, P2, P3: Arrays of shape (..., 2) that broadcast against each other.
+
+    Returns:
+        An array of the determinants. It is positive where P1, P2, P3 is a left hand turn.
+    """
+    P1, P2, P3 = [np.asarray(P, dtype=float) for P in (P1, P2, P3)]
+    return determinant2(P1[..., 0] - P3[..., 0], P1[..., 1] - P3[..., 1],
+                        P2[..., 0] - P3[..., 0], P2[..., 1] - P3[..., 1])
+
+def orientation2Batch(P1, P2, P3):
+    """Batch version of commonOps.orientation2.
+
+    Args:
+        P1, P2, P3: Arrays of shape (..., 2) that broadcast against each other.
+
+    Returns:
+        An int8 array holding the Orientation values (-1, 0, 1) of each triple. As in
+        orientation2, determinants within ZERO_TOLERANCE of 0 are reported as 0.
+    """
+    val = orientation2Values(P1, P2, P3)
+    signs = np.sign(val).astype(np.int8)
+    signs[np.abs(val) < ZERO_TOLERANCE] = Orientation.ZERO.value
+    return signs
+
+def orientation4Batch(P1, P2, P3, P4):
+    """The 4x4 determinant with rows P1, P2, P3, P4 for arrays of homogeneous 3D points.
+
+    This is the batch version of incrementalConvexHull.orientationPointE3 (with w = 1),
+    orientationPointOP3 and orientationDiskS2 (with the dual points of the disks).
+
+    Args:
+        P1, P2, P3, P4: Arrays of shape (..., 4) that broadcast against each other.
+            For instance, P1, P2, P3 of shape (N, 4) holding the corners of N facets and
+            P4 of shape (4,) for one query point, or P1, P2, P3 of shape (4,) for a single
+            facet and P4 of shape (M, 4) for M query points.
+
+    Returns:
+        An array of the determinants.
+    """
+    P1, P2, P3, P4 = [np.asarray(P, dtype=float) for P in (P1, P2, P3, P4)]
+    return determinant4(P1[..., 0], P1[..., 1], P1[..., 2], P1[..., 3],
+                        P2[..., 0], P2[..., 1], P2[..., 2], P2[..., 3],
+                        P3[..., 0], P3[..., 1], P3[..., 2], P3[..., 3],
+                        P4[..., 0], P4[..., 1], P4[..., 2], P4[..., 3])
+
+def orientation4Signs(P1, P2, P3, P4):
+    """The exact signs of orientation4Batch, the batch version of robust.robustDeterminant4.
+
+    The float determinants are filtered with the same error bound as robustDeterminant4.
+    Only the entries the filter cannot certify are re-evaluated exactly, one at a time.
+
+    Args:
+        P1, P2, P3, P4: Arrays of shape (..., 4) that broadcast against each other.
+
+    Returns:
+        An int8 array of -1, 0, 1.
+    """
+    P1, P2, P3, P4 = np.broadcast_arrays(*[np.asarray(P, dtype=float) for P in (P1, P2, P3, P4)])
+    vals = orientation4Batch(P1, P2, P3, P4)
+    A1, A2, A3, A4 = [np.abs(P) for P in (P1, P2, P3, P4)]
+    permanent = permanent4(A1[..., 0], A1[..., 1], A1[..., 2], A1[..., 3],
+                           A2[..., 0], A2[..., 1], A2[..., 2], A2[..., 3],
+                           A3[..., 0], A3[..., 1], A3[..., 2], A3[..., 3],
+                           A4[..., 0], A4[..., 1], A4[..., 2], A4[..., 3])
+    signs = np.sign(vals).astype(np.int8)
+    for idx in zip(*np.nonzero(np.abs(vals) <= DETERMINANT4_BOUND * permanent)):
+        signs[idx] = robustDeterminant4(*np.concatenate([P1[idx], P2[idx], P3[idx], P4[idx]]).tolist())
+    return signs
+
+def isPlainFloat(x):
+    """Is x a plain (machine) real number that NumPy float arrays represent exactly?"""
+    return isinstance(x, (float, int, np.floating, np.integer)) and not isinstance(x, bool)
@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+
+from .commonOps import orientation2, determinant3, determinant4
+from .robust import robustDeterminant4
+from .batch import (determinant3Batch, determinant4Batch, orientation2Batch, 
+                    orientation4Batch, orientation4Signs, isPlainFloat)
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(5)
+
+    def test_determinants(self):
+        M3 = self.rng.normal(size = (20, 3, 3))
+        M4 = self.rng.normal(size = (20, 4, 4))
+        d3 = determinant3Batch(M3)
+        d4 = determinant4Batch(M4)
+        for k in range(20):
+            self.assertEqual(d3[k], determinant3(*M3[k].flatten().tolist()))
+            self.assertEqual(d4[k], determinant4(*M4[k].flatten().tolist()))
+
+    def test_orientation2(self):
+        P = self.rng.normal(size = (50, 3, 2))
+        P[0, 2] = (P[0, 0] + P[0, 1]) / 2 # collinear
+        signs = orientation2Batch(P[:, 0], P[:, 1], P[:, 2])
+        for k in range(50):
+            self.assertEqual(signs[k], orientation2(*P[k].flatten().tolist()).value)
+        self.assertEqual(signs[0], 0)
+
+    def test_orientation4Broadcasting(self):
+        facets = self.rng.normal(size = (30, 3, 4))
+        queries = self.rng.normal(size = (10, 4))
+        onePoint = orientation4Batch(facets[:, 0], facets[:, 1], facets[:, 2], queries[0])
+        oneFacet = orientation4Batch(facets[0, 0], facets[0, 1], facets[0, 2], queries)
+        self.assertEqual(onePoint.shape, (30,))
+        self.assertEqual(oneFacet.shape, (10,))
+        for k in range(30):
+            M = np.vstack([facets[k], queries[0]])
+            self.assertEqual(onePoint[k], determinant4(*M.flatten().tolist()))
+        for k in range(10):
+            M = np.vstack([facets[0], queries[k]])
+            self.assertEqual(oneFacet[k], determinant4(*M.flatten().tolist()))
+
+    def test_orientation4Signs(self):
+        facets = self.rng.integers(-3, 4, size = (200, 3, 4)).astype(float) / 10
+        query = np.array([0.1, 0.2, 0.3, 1.0])
+        # Facets through the query point have orientation 0 
+        facets[:20, 0] = query * 2
+        signs = orientation4Signs(facets[:, 0], facets[:, 1], facets[:, 2], query)
+        for k in range(200):
+            self.assertEqual(signs[k], robustDeterminant4(*facets[k].flatten().tolist(), *query))
+        self.assertTrue((signs == 0).any())
+
+    def test_isPlainFloat(self):
+        from fractions import Fraction
+        self.assertTrue(isPlainFloat(1.5))
+        self.assertTrue(isPlainFloat(np.float64(2)))
+        self.assertFalse(isPlainFloat(Fraction(1, 3)))
+        self.assertFalse(isPlainFloat(True))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+#
+# Robust (adaptive precision) versions of the predicates in commonOps
+#
+# Each predicate first evaluates its determinant in floating point together
+# with a bound on the rounding error of that evaluation (a constant times the
+# permanent of the absolute values of the entries). If the float value is
+# farther from 0 than the bound its sign is certain and is returned. Only when
+# this filter fails is the determinant re-evaluated exactly with
+# fractions.Fraction, so nearly all calls cost a plain float determinant plus
+# its permanent.
+#
+# Inputs that are not floats (int, Fraction, ...) are evaluated exactly
+# directly. The error bounds assume no underflow or overflow occurs.
+#
+# References:
+#     Shewchuk, J. R. "Adaptive Precision Floating-Point Arithmetic and Fast
+#         Robust Geometric Predicates." Discrete & Computational Geometry 18,
+#         pp. 305-363, 1997.
+#
+
+from fractions import Fraction
+
+from .commonOps import determinant2, determinant3, determinant4, Orientation
+
+# Half a unit in the last place of 1.0 (the unit roundoff of IEEE doubles)
+EPSILON = 2.0 ** -53
+
+# Error bound coefficients. A float determinant d is certain to have the sign of
+# the exact determinant when |d| > BOUND * permanent.
+#
+# orientation2 rounds the coordinate differences, a product and a difference
+# (Shewchuk's ccwerrboundA). determinant3 and determinant4 are evaluated by cofactor
+# expansion, which has at most 5 and 9 roundings along any path; the coefficients
+# are safe over-estimates of gamma_5 and gamma_9 (gamma_n = n * EPSILON / (1 - n * EPSILON)).
+ORIENTATION2_BOUND = (3.0 + 16.0 * EPSILON) * EPSILON
+DETERMINANT3_BOUND = (6.0 + 64.0 * EPSILON) * EPSILON
+DETERMINANT4_BOUND = (10.0 + 128.0 * EPSILON) * EPSILON
+
+def sign(x):
+    """Returns -1, 0, or 1 according to the sign of x."""
+    return 1 if x > 0 else -1 if x < 0 else 0
+
+def permanent2(a, b,
+               c, d):
+    return a * d + b * c
+
+def permanent3(a, b, c,
+               d, e, f,
+               g, h, i):
+    return (
+        + a * permanent2(e, f, h, i)
+        + b * permanent2(d, f, g, i)
+        + c * permanent2(d, e, g, h)
+    )
+
+def permanent4(a, b, c, d,
+               e, f, g, h,
+               i, j, k, l,
+               m, n, o, p):
+    return (
+        + a * permanent3(f, g, h, j, k, l, n, o, p)
+        + b * permanent3(e, g, h, i, k, l, m, o, p)
+        + c * permanent3(e, f, h, i, j, l, m, n, p)
+        + d * permanent3(e, f, g, i, j, k, m, n, o)
+    )
+
+def _exact(entries):
+    return [Fraction(x) if isinstance(x, float) else x for x in entries]
+
+def _filteredSign(det, permanent, bound, exactDet):
+    # Returns the sign of det if the filter certifies it, otherwise the sign of exactDet().
+    if isinstance(det, float):
+        if abs(det) > bound * permanent:
+            return sign(det)
+        return sign(exactDet())
+    # Exact input types are evaluated exactly already
+    return sign(det)
+
+def robustOrientation2(x1, y1, x2, y2, x3, y3):
+    """Exact version of commonOps.orientation2.
+
+    Unlike orientation2, ZERO is only returned when the three points are exactly collinear.
+
+    Returns:
+        The Orientation of the triangle (x1, y1), (x2, y2), (x3, y3).
+    """
+    detLeft  = (x1 - x3) * (y2 - y3)
+    detRight = (y1 - y3) * (x2 - x3)
+    det = detLeft - detRight
+    permanent = abs(detLeft) + abs(detRight)
+
+    def exactDet():
+        ex1, ey1, ex2, ey2, ex3, ey3 = _exact((x1, y1, x2, y2, x3, y3))
+        return determinant2(ex1 - ex3, ey1 - ey3, ex2 - ex3, ey2 - ey3)
+
+    s = _filteredSign(det, permanent, ORIENTATION2_BOUND, exactDet)
+    return Orientation(s)
+
+def robustDeterminant3(a, b, c,
+                       d, e, f,
+                       g, h, i):
+    """Returns the exact sign (-1, 0, or 1) of the 3x3 determinant."""
+    entries = (a, b, c, d, e, f, g, h, i)
+    det = determinant3(*entries)
+    if not isinstance(det, float):
+        return sign(det)
+    permanent = permanent3(*[abs(x) for x in entries])
+    return _filteredSign(det, permanent, DETERMINANT3_BOUND,
+                         lambda: determinant3(*_exact(entries)))
+
+def robustDeterminant4(a, b, c, d,
+                       e, f, g, h,
+                       i, j, k, l,
+                       m, n, o, p):
+    """Returns the exact sign (-1, 0, or 1) of the 4x4 determinant."""
+    # This is commonOps.determinant4 written out with the products of the last two rows
+    # shared between the cofactors, so the float value is the same. The permanent
+    # reuses the absolute values of those products. 
+    kp, lo, jp, ln, jo, kn = k * p, l * o, j * p, l * n, j * o, k * n
+    ip, lm, io, km, in_, jm = i * p, l * m, i * o, k * m, i * n, j * m
+    det = (
+        + a * (f * (kp - lo) - g * (jp - ln) + h * (jo - kn))
+        - b * (e * (kp - lo) - g * (ip - lm) + h * (io - km))
+        + c * (e * (jp - ln) - f * (ip - lm) + h * (in_ - jm))
+        - d * (e * (jo - kn) - f * (io - km) + g * (in_ - jm))
+    )
+    if not isinstance(det, float):
+        return sign(det)
+    akp, alo, ajp, aln, ajo, akn = abs(kp), abs(lo), abs(jp), abs(ln), abs(jo), abs(kn)
+    aip, alm, aio, akm, ain, ajm = abs(ip), abs(lm), abs(io), abs(km), abs(in_), abs(jm)
+    ae, af, ag, ah = abs(e), abs(f), abs(g), abs(h)
+    permanent = (
+        + abs(a) * (af * (akp + alo) + ag * (ajp + aln) + ah * (ajo + akn))
+        + abs(b) * (ae * (akp + alo) + ag * (aip + alm) + ah * (aio + akm))
+        + abs(c) * (ae * (ajp + aln) + af * (aip + alm) + ah * (ain + ajm))
+        + abs(d) * (ae * (ajo + akn) + af * (aio + akm) + ag * (ain + ajm))
+    )
+    if abs(det) > DETERMINANT4_BOUND * permanent:
+        return sign(det)
+    return sign(determinant4(*_exact((a, b, c, d, e, f, g, h, i, j, k, l, m, n, o, p))))
+
+def robustOrientationDiskS2(d1, d2, d3, d4):
+    """Exact orientation of four DiskS2s, i.e. of their dual points in OP3.
+
+    Returns:
+        -1, 0, or 1.
+    """
+    return robustDeterminant4(
+        -d1.a, -d1.b, -d1.c, d1.d,
+        -d2.a, -d2.b, -d2.c, d2.d,
+        -d3.a, -d3.b, -d3.c, d3.d,
+        -d4.a, -d4.b, -d4.c, d4.d
+    )
@@ -0,0 +1,46 @@
+import unittest
+import random
+from fractions import Fraction
+
+from .commonOps import Orientation, determinant4
+from .robust import (robustOrientation2, robustDeterminant3, robustDeterminant4, 
+                     robustOrientationDiskS2, sign)
+from .spherical2 import DiskS2
+
+class TestRobust(unittest.TestCase):
+
+    def test_orientation2Collinear(self):
+        # Nearly collinear points that the 1e-8 tolerance of orientation2 calls ZERO
+        self.assertEqual(robustOrientation2(0.0, 0.0, 1.0, 1.0, 2.0, 2.0), Orientation.ZERO)
+        self.assertEqual(robustOrientation2(0.0, 0.0, 1.0, 1e-12, 2.0, 0.0), Orientation.NEGATIVE)
+        self.assertEqual(robustOrientation2(0.0, 0.0, 1.0, 0.0, 2.0, 1e-12), Orientation.POSITIVE)
+
+    def test_orientation2Exact(self):
+        # Points on the line y = x through 0.1-spaced floats are not exactly collinear
+        rng = random.Random(1)
+        for _ in range(200):
+            xs = [rng.uniform(0, 1) for _ in range(3)]
+            args = (xs[0], xs[0] * 0.3, xs[1], xs[1] * 0.3, xs[2], xs[2] * 0.3)
+            exact = [Fraction(x) for x in args]
+            expected = sign((exact[0] - exact[4]) * (exact[3] - exact[5]) 
+                            - (exact[1] - exact[5]) * (exact[2] - exact[4]))
+            self.assertEqual(robustOrientation2(*args).value, expected)
+
+    def test_determinants(self):
+        rng = random.Random(2)
+        for _ in range(100):
+            M = [rng.choice([0.1, 0.2, 0.3, 1.0 / 3.0, 2.0]) for _ in range(16)]
+            self.assertEqual(robustDeterminant4(*M), sign(determinant4(*[Fraction(x) for x in M])))
+        self.assertEqual(robustDeterminant3(1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0), 0)
+        self.assertEqual(robustDeterminant3(1, 0, 0, 0, 1, 0, 0, 0, 1), 1)
+        self.assertEqual(robustDeterminant4(*[Fraction(1, k + 1) for k in range(16)]), 
+                         sign(determinant4(*[Fraction(1, k + 1) for k in range(16)])))
+
+    def test_diskS2(self):
+        disks = [DiskS2(0.0, 0.0, 1.0, 0.5), DiskS2(1.0, 0.0, 0.0, 0.5), 
+                 DiskS2(0.0, 1.0, 0.0, 0.5)]
+        self.assertEqual(robustOrientationDiskS2(*disks, DiskS2(0.0, 0.0, 1.0, 0.5)), 0)
+        self.assertNotEqual(robustOrientationDiskS2(*disks, DiskS2(0.0, 0.0, -1.0, 0.5)), 0)
+
+if __name__ == '__main__':
+    unittest.main()